@@ -0,0 +1,217 @@
+"""
+Indicator aggregation
+Detectors can report hundreds of near-identical indicators for one attack
+(one per frequency change, one per replay offset). cluster_indicators
+groups them by threat type, capture and time proximity into Incidents, and
+IncidentAggregator keeps recently reported incidents in a TTL cache so
+repeats fold into the open incident instead of producing new alerts. Only
+incidents are forwarded to the alert and notification sinks.
+"""
+
+import time
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from core.cyber_analysis import CyberThreatIndicator
+from core.threat_store import ThreatStore
+
+
+@dataclass
+class Incident:
+    """Consolidated run of indicators of one threat type"""
+    threat_type: str
+    count: int
+    peak_confidence: float
+    first_seen: float        # Indicator timestamps, in signal time
+    last_seen: float
+    recommendation: str
+    characteristics: Dict[str, float] = field(default_factory=dict)  # Of the peak indicator
+    capture_index: Optional[int] = None
+    reported_count: int = 0  # Count when the incident was last emitted
+
+    @property
+    def span(self) -> float:
+        return self.last_seen - self.first_seen
+
+    def merge(self, other: "Incident") -> None:
+        """Fold a later cluster of the same threat into this incident"""
+        self.count += other.count
+        self.first_seen = min(self.first_seen, other.first_seen)
+        self.last_seen = max(self.last_seen, other.last_seen)
+        if other.peak_confidence > self.peak_confidence:
+            self.peak_confidence = other.peak_confidence
+            self.characteristics = other.characteristics
+            self.recommendation = other.recommendation
+
+    def summary(self) -> str:
+        capture = "" if self.capture_index is None else f" in capture {self.capture_index}"
+        return (f"{self.threat_type}{capture}: {self.count} indicators over {self.span:.3f}s "
+                f"(t={self.first_seen:.3f}-{self.last_seen:.3f}), "
+                f"peak confidence {self.peak_confidence:.2f}. {self.recommendation}")
+
+
+Indicators = Union[ThreatStore, Sequence[CyberThreatIndicator]]
+
+
+def cluster_indicators(indicators: Indicators, gap: float = 1.0) -> List[Incident]:
+    """
+    Group indicators into incidents
+
+    Indicators of the same threat type and capture belong to one incident
+    while consecutive timestamps are at most `gap` seconds apart.
+    Incidents are ordered by first timestamp.
+    """
+    store = indicators if isinstance(indicators, ThreatStore) else ThreatStore.from_indicators(indicators)
+    if len(store) == 0:
+        return []
+    records = store.records
+    # Type ids that share a name (differing keys or recommendation) cluster together
+    _, name_codes = np.unique([name for name, _, _ in store.types], return_inverse=True)
+    code = name_codes[records['type_id']]
+    capture = records['capture_index']
+    timestamp = records['timestamp']
+    confidence = records['confidence']
+
+    order = np.lexsort((timestamp, capture, code))
+    code, capture, timestamp = code[order], capture[order], timestamp[order]
+    new_cluster = np.ones(len(order), dtype=bool)
+    new_cluster[1:] = (np.diff(code) != 0) | (np.diff(capture) != 0) | (np.diff(timestamp) > gap)
+    starts = np.flatnonzero(new_cluster)
+    cluster = np.cumsum(new_cluster) - 1
+    counts = np.diff(np.append(starts, len(order)))
+    ends = starts + counts - 1
+    # Most confident row of each cluster: first after sorting by (cluster, -confidence)
+    by_confidence = order[np.lexsort((-confidence[order], cluster))]
+    peaks = by_confidence[starts]
+
+    incidents = []
+    for start, end, count, peak in zip(starts, ends, counts, peaks):
+        indicator = store[int(peak)]
+        incidents.append(Incident(
+            threat_type=indicator.threat_type,
+            count=int(count),
+            peak_confidence=indicator.confidence,
+            first_seen=float(timestamp[start]),
+            last_seen=float(timestamp[end]),
+            recommendation=indicator.recommendation,
+            characteristics=indicator.characteristics,
+            capture_index=indicator.capture_index,
+        ))
+    incidents.sort(key=lambda incident: incident.first_seen)
+    return incidents
+
+
+class IncidentAggregator:
+    """
+    Deduplication stage between detectors and notification sinks
+
+    process() clusters a batch of indicators. A cluster whose threat type
+    and capture has no open incident opens one, which is emitted: returned
+    and passed to every sink. Otherwise it is merged into the open incident
+    and suppressed. An open incident expires `ttl` seconds (by `clock`)
+    after its last merge; if it absorbed indicators since it was emitted,
+    it is emitted once more with its final counts.
+
+    Parameters:
+    -----------
+    gap : float
+        Largest timestamp gap, in signal seconds, within one cluster
+    ttl : float
+        Suppression time in clock seconds
+    sinks : Sequence[Callable[[Incident], None]], optional
+        Called with every emitted incident, e.g.
+        lambda incident: send_encrypted_alert(incident.summary())
+    max_open : int
+        Open incidents kept; the oldest are expired early beyond it
+    """
+
+    def __init__(self, gap: float = 1.0, ttl: float = 300.0,
+                 sinks: Optional[Sequence[Callable[[Incident], None]]] = None,
+                 max_open: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.gap = gap
+        self.ttl = ttl
+        self.sinks = list(sinks or [])
+        self.max_open = max_open
+        self.clock = clock
+        # (threat type, capture) -> (expiry, incident), soonest expiry first
+        self._open: "OrderedDict[Tuple[str, Optional[int]], Tuple[float, Incident]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'indicators': 0, 'incidents': 0, 'suppressed': 0, 'emitted': 0}
+
+    def _expire(self, now: float) -> List[Incident]:
+        """Drop expired incidents; those that absorbed more indicators are returned"""
+        closed = []
+        while self._open:
+            key, (expiry, incident) = next(iter(self._open.items()))
+            if expiry > now and len(self._open) <= self.max_open:
+                break
+            del self._open[key]
+            if incident.count > incident.reported_count:
+                closed.append(incident)
+        return closed
+
+    def process(self, indicators: Indicators) -> List[Incident]:
+        """Aggregate a batch of indicators; returns the incidents emitted"""
+        clusters = cluster_indicators(indicators, self.gap)
+        with self._lock:
+            now = self.clock()
+            emitted = self._expire(now)
+            for cluster in clusters:
+                key = (cluster.threat_type, cluster.capture_index)
+                self.stats['indicators'] += cluster.count
+                if key in self._open:
+                    incident = self._open.pop(key)[1]
+                    incident.merge(cluster)
+                    self.stats['suppressed'] += cluster.count
+                else:
+                    incident = cluster
+                    emitted.append(incident)
+                    self.stats['incidents'] += 1
+                # Re-inserted at the end, keeping the cache ordered by expiry
+                self._open[key] = (now + self.ttl, incident)
+            # Incidents pushed out by max_open; new ones are already in emitted
+            new = {id(incident) for incident in emitted}
+            emitted.extend(i for i in self._expire(now) if id(i) not in new)
+            emitted = self._snapshot(emitted)
+        self._dispatch(emitted)
+        return emitted
+
+    def expire(self) -> List[Incident]:
+        """Emit the final state of incidents whose TTL has passed"""
+        with self._lock:
+            emitted = self._snapshot(self._expire(self.clock()))
+        self._dispatch(emitted)
+        return emitted
+
+    def flush(self) -> List[Incident]:
+        """Close every open incident, emitting those with unreported indicators"""
+        with self._lock:
+            emitted = self._snapshot([incident for _, incident in self._open.values()
+                                      if incident.count > incident.reported_count])
+            self._open.clear()
+        self._dispatch(emitted)
+        return emitted
+
+    def _snapshot(self, incidents: List[Incident]) -> List[Incident]:
+        """Mark incidents reported; callers get copies that later merges leave alone"""
+        for incident in incidents:
+            incident.reported_count = incident.count
+        self.stats['emitted'] += len(incidents)
+        return [replace(incident) for incident in incidents]
+
+    @property
+    def open_incidents(self) -> List[Incident]:
+        with self._lock:
+            return [incident for _, incident in self._open.values()]
+
+    def _dispatch(self, incidents: List[Incident]) -> None:
+        for incident in incidents:
+            for sink in self.sinks:
+                try:
+                    sink(incident)
+                except Exception as e:
+                    logging.error("Incident sink failed: %s", str(e))
@@ -0,0 +1,71 @@
+"""
+Shared spectral front-end for signal analysis
+Lazily computes and memoizes the intermediate representations that the
+threat detectors, PSD estimation and visualization all need
+"""
+
+import numpy as np
+from scipy import signal
+import threading
+from typing import Callable, Dict, Hashable, Tuple, Any, Union
+
+
+class AnalysisContext:
+    """
+    Memoized STFT and running-energy views of a single signal
+
+    Each representation is computed on first request and cached by its
+    parameters, so every consumer of the same signal shares one pass.
+    psd() averages a Hann-window STFT with 50% overlap, which is exactly
+    the Welch PSD estimate; consumers needing another window (the
+    frequency hopping detectors) get a separately cached STFT. Memoization is thread-safe, so
+    detectors running concurrently compute each representation once.
+
+    `data` may also be a 2-D (n_captures, n_samples) batch; every
+    representation is then computed along the last axis for all rows.
+    """
+
+    def __init__(self, data: np.ndarray, sampling_rate: float):
+        self.data = np.asarray(data)
+        self.n_samples = self.data.shape[-1]
+        self.sampling_rate = sampling_rate
+        self._cache: Dict[Hashable, Any] = {}
+        self._locks: Dict[Hashable, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _memoize(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key in self._cache:
+            return self._cache[key]
+        # One lock per representation: concurrent requests for the same key
+        # wait for a single computation, different keys proceed in parallel
+        with self._locks_guard:
+            lock = self._locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._cache:
+                self._cache[key] = compute()
+        return self._cache[key]
+
+    def spectrogram(self, nperseg: int = 256, noverlap: int = None,
+                    window: Union[str, Tuple] = 'hann') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Frequencies, segment times and PSD-scaled spectrogram for a scipy window spec"""
+        nperseg = min(nperseg, self.n_samples)
+        noverlap = nperseg // 2 if noverlap is None else noverlap
+        return self._memoize(('spectrogram', nperseg, noverlap, window), lambda: signal.spectrogram(
+            self.data, fs=self.sampling_rate, window=window,
+            nperseg=nperseg, noverlap=noverlap))
+
+    def psd(self, nperseg: int = 256) -> Tuple[np.ndarray, np.ndarray]:
+        """Welch power spectral density, derived from the shared spectrogram"""
+        def compute():
+            f, _, Sxx = self.spectrogram(nperseg)
+            return f, Sxx.mean(axis=-1)
+        return self._memoize(('psd', min(nperseg, self.n_samples)), compute)
+
+    def cumulative_energy(self) -> np.ndarray:
+        """Running sum of squared samples with a leading zero (length n + 1)"""
+        def compute():
+            csum = np.empty(self.data.shape[:-1] + (self.n_samples + 1,))
+            csum[..., 0] = 0.0
+            np.cumsum(np.square(self.data, dtype=float), axis=-1, out=csum[..., 1:])
+            return csum
+        return self._memoize('cumulative_energy', compute)
@@ -0,0 +1,237 @@
+"""
+Learned anomaly scoring
+An IsolationForest trained on FeatureBank windows of normal traffic scores
+new windows in batches. Trained scorers are cached in memory by file, so
+analyzers do not reload them per capture. While scoring, the scorer tracks
+how far the typical features of scored windows drift from the training
+baseline and retrains in a background thread once they drift too far;
+scoring keeps using the current model until the new one is ready.
+"""
+
+import os
+import copy
+import logging
+import threading
+import numpy as np
+import joblib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from sklearn.ensemble import IsolationForest
+
+from core.feature_bank import FeatureBank
+
+
+class AnomalyScorer:
+    """
+    IsolationForest scoring of signal windows
+
+    Scores are the IsolationForest anomaly score in (0, 1]: around 0.5 and
+    below for ordinary windows, approaching 1 for isolated ones. Windows
+    scoring above `threshold` are anomalous.
+
+    Drift is the largest shift, in training standard deviations, of an
+    exponentially weighted mean of the per-batch feature medians of all
+    scored windows; the median ignores short bursts but follows a shift
+    of the whole baseline, which the model flags entirely. Above
+    `drift_threshold`, the most recent `retrain_windows` typical windows
+    become the new training set: a fresh forest, or with
+    `warm_start_estimators` that many trees added to a copy of the current
+    forest, so the old baseline fades out more slowly. Typical windows
+    score at most `threshold`, or at most the batch median score when the
+    model flags most of the batch.
+    """
+
+    def __init__(self, feature_bank: Optional[FeatureBank] = None, n_estimators: int = 100,
+                 threshold: float = 0.6, n_jobs: Optional[int] = None,
+                 drift_threshold: float = 3.0, drift_alpha: float = 0.01,
+                 retrain_windows: int = 2048, warm_start_estimators: int = 0,
+                 random_state: int = 0):
+        self.feature_bank = feature_bank or FeatureBank()
+        self.n_estimators = n_estimators
+        self.threshold = threshold
+        self.n_jobs = n_jobs
+        self.drift_threshold = drift_threshold
+        self.drift_alpha = drift_alpha
+        self.retrain_windows = retrain_windows
+        self.warm_start_estimators = warm_start_estimators
+        self.random_state = random_state
+        self.model_path: Optional[str] = None  # Retrained models are saved here when set
+        self.generation = 0                    # Incremented by every retraining
+        self.model: Optional[IsolationForest] = None
+        self._baseline_mean: Optional[np.ndarray] = None
+        self._baseline_std: Optional[np.ndarray] = None
+        self._drift_mean: Optional[np.ndarray] = None
+        self._recent = np.empty((0, self.feature_bank.n_features), dtype=np.float32)
+        self._lock = threading.Lock()
+        self._retraining: Optional[Future] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __getstate__(self):
+        # Locks and the retraining thread cannot be pickled, e.g. for process pools
+        state = self.__dict__.copy()
+        for name in ('_lock', '_executor', '_retraining'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._retraining = None
+        self._executor = None
+
+    def fit(self, features: np.ndarray) -> "AnomalyScorer":
+        """Train on feature rows of normal traffic"""
+        model = IsolationForest(n_estimators=self.n_estimators, n_jobs=self.n_jobs,
+                                random_state=self.random_state).fit(features)
+        self._install(model, features)
+        return self
+
+    def fit_signal(self, data: np.ndarray) -> "AnomalyScorer":
+        """Train on the windows of a capture of normal traffic"""
+        return self.fit(self.feature_bank.transform(data))
+
+    def _install(self, model: IsolationForest, features: np.ndarray) -> None:
+        mean = features.mean(axis=0, dtype=float)
+        std = features.std(axis=0, dtype=float)
+        with self._lock:
+            self.model = model
+            self._baseline_mean = mean
+            # Features that were constant in training still drift on any change
+            self._baseline_std = np.where(std > 0, std, np.maximum(np.abs(mean), 1.0) * 1e-3)
+            self._drift_mean = mean.copy()
+
+    @property
+    def drift(self) -> float:
+        """Current drift in training standard deviations"""
+        with self._lock:
+            if self._drift_mean is None:
+                return 0.0
+            return float(np.max(np.abs(self._drift_mean - self._baseline_mean) / self._baseline_std))
+
+    @property
+    def retraining(self) -> bool:
+        return self._retraining is not None and not self._retraining.done()
+
+    def score(self, features: np.ndarray) -> np.ndarray:
+        """Anomaly scores of feature rows; also updates the drift statistics"""
+        with self._lock:
+            model = self.model
+        if model is None:
+            raise ValueError("AnomalyScorer is not trained")
+        if len(features) == 0:
+            return np.empty(0)
+        if self.n_jobs and len(features) > 1000:
+            # Tree scoring releases the GIL, so threads parallelize it
+            with joblib.parallel_config(backend="threading", n_jobs=self.n_jobs):
+                scores = -model.score_samples(features)
+        else:
+            scores = -model.score_samples(features)
+        self._observe(features, scores)
+        return scores
+
+    def score_signal(self, data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Window start indices and anomaly scores of a capture"""
+        return self.feature_bank.window_starts(len(data)), self.score(self.feature_bank.transform(data))
+
+    def _observe(self, features: np.ndarray, scores: np.ndarray) -> None:
+        center = np.median(features, axis=0)
+        typical = features[scores <= max(self.threshold, np.median(scores))]
+        with self._lock:
+            # Exponentially weighted mean over the batch's windows
+            weight = 1.0 - (1.0 - self.drift_alpha) ** len(features)
+            self._drift_mean += weight * (center - self._drift_mean)
+            self._recent = np.concatenate((self._recent, typical))[-self.retrain_windows:]
+            drift = float(np.max(np.abs(self._drift_mean - self._baseline_mean) / self._baseline_std))
+            if drift <= self.drift_threshold or self.retraining \
+                    or len(self._recent) < self.retrain_windows // 2:
+                return
+            # Decided and submitted under the lock, so concurrent scorers start one retraining
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="anomaly-retrain")
+            self._retraining = self._executor.submit(self._retrain, self.model, self._recent.copy())
+        logging.info("Feature drift %.2f exceeds %.2f; retraining anomaly model in the background",
+                     drift, self.drift_threshold)
+
+    def _retrain(self, current: IsolationForest, features: np.ndarray) -> None:
+        try:
+            if self.warm_start_estimators:
+                model = copy.deepcopy(current)
+                model.set_params(warm_start=True,
+                                 n_estimators=model.n_estimators + self.warm_start_estimators)
+                model.fit(features)
+            else:
+                model = IsolationForest(n_estimators=self.n_estimators, n_jobs=self.n_jobs,
+                                        random_state=self.random_state + self.generation + 1)
+                model.fit(features)
+            self._install(model, features)
+            with self._lock:
+                self._recent = self._recent[:0]
+                self.generation += 1
+            if self.model_path:
+                self.save(self.model_path)
+        except Exception as e:
+            logging.error("Anomaly model retraining failed: %s", str(e))
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until a running retraining has finished"""
+        if self._retraining is not None:
+            self._retraining.result(timeout)
+
+    def save(self, path: str) -> None:
+        """Store the trained scorer with joblib; only load files from trusted sources"""
+        with self._lock:
+            state = {
+                'model': self.model,
+                'baseline_mean': self._baseline_mean,
+                'baseline_std': self._baseline_std,
+                'generation': self.generation,
+                'settings': {name: getattr(self, name) for name in (
+                    'n_estimators', 'threshold', 'n_jobs', 'drift_threshold', 'drift_alpha',
+                    'retrain_windows', 'warm_start_estimators', 'random_state')},
+                'feature_bank': {name: getattr(self.feature_bank, name) for name in (
+                    'sampling_rate', 'window_size', 'hop', 'n_bands', 'wavelet',
+                    'wavelet_level', 'block_windows')},
+            }
+        # Write then rename, so readers never see a partial file
+        temporary = f"{path}.tmp"
+        joblib.dump(state, temporary)
+        os.replace(temporary, path)
+        with _SCORER_CACHE_LOCK:
+            # A model saved by a cached scorer must not evict that scorer
+            cached = _SCORER_CACHE.get(os.path.abspath(path))
+            if cached is not None and cached[1] is self:
+                _SCORER_CACHE[os.path.abspath(path)] = (os.path.getmtime(path), self)
+
+    @classmethod
+    def load(cls, path: str) -> "AnomalyScorer":
+        state = joblib.load(path)
+        scorer = cls(FeatureBank(**state['feature_bank']), **state['settings'])
+        scorer.model = state['model']
+        scorer._baseline_mean = state['baseline_mean']
+        scorer._baseline_std = state['baseline_std']
+        scorer._drift_mean = state['baseline_mean'].copy()
+        scorer.generation = state['generation']
+        scorer.model_path = path
+        return scorer
+
+
+_SCORER_CACHE: Dict[str, Tuple[float, AnomalyScorer]] = {}
+_SCORER_CACHE_LOCK = threading.Lock()
+
+
+def load_scorer(path: str) -> AnomalyScorer:
+    """
+    Trained scorer stored at `path`, cached in memory
+
+    The file is read again only when its modification time changes, e.g.
+    after a retraining elsewhere has saved a new model.
+    """
+    path = os.path.abspath(path)
+    mtime = os.path.getmtime(path)
+    with _SCORER_CACHE_LOCK:
+        cached = _SCORER_CACHE.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        scorer = AnomalyScorer.load(path)
+        _SCORER_CACHE[path] = (mtime, scorer)
+        return scorer
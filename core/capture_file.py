@@ -0,0 +1,203 @@
+"""
+Memory-mapped capture files
+Opens raw binary or NPY recordings with np.memmap and provides chunked
+versions of the analysis entry points, so recordings larger than RAM can
+be processed without loading them fully
+"""
+
+import os
+import numpy as np
+from scipy import signal
+from typing import Iterator, Optional, Tuple, Union
+
+# Samples read per chunk unless the caller asks otherwise
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+class UniformTimeAxis:
+    """
+    Time axis start + k * step that is indexed like an array but never materialized
+    """
+
+    def __init__(self, start: float, step: float, n_samples: int):
+        self.start = start
+        self.step = step
+        self.n_samples = n_samples
+
+    def __len__(self) -> int:
+        return self.n_samples
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # Only the requested samples are generated
+            return self.start + np.arange(*index.indices(self.n_samples)) * self.step
+        return self.start + np.asarray(index) * self.step
+
+
+class CaptureFile:
+    """
+    Single-channel recording backed by a read-only memory map
+
+    Files ending in .npy are opened through their header; anything else is
+    treated as headerless samples of `dtype` starting at byte `offset`.
+    """
+
+    def __init__(self, path: str, sampling_rate: float, dtype: Union[str, np.dtype] = np.float32,
+                 offset: int = 0, start_time: float = 0.0):
+        self.path = path
+        self.sampling_rate = sampling_rate
+        if path.endswith('.npy'):
+            self.data = np.load(path, mmap_mode='r')
+        else:
+            self.data = np.memmap(path, dtype=dtype, mode='r', offset=offset)
+        if self.data.ndim != 1:
+            raise ValueError(f"Capture must be one-dimensional, got shape {self.data.shape}")
+        self.time = UniformTimeAxis(start_time, 1.0 / sampling_rate, len(self.data))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def iter_chunks(self, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    overlap: int = 0) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield (start index, float64 samples) for consecutive chunks
+
+        Consecutive chunks share `overlap` samples, so windowed computations
+        can straddle chunk edges
+        """
+        if overlap >= chunk_size:
+            raise ValueError("overlap must be smaller than chunk_size")
+        step = chunk_size - overlap
+        for start in range(0, max(len(self.data) - overlap, 0), step):
+            yield start, np.asarray(self.data[start:start + chunk_size], dtype=float)
+
+
+def capture_statistics(capture: CaptureFile,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[float, float]:
+    """
+    Mean and (population) standard deviation, merged chunk by chunk
+    """
+    count, mean, m2 = 0, 0.0, 0.0
+    for _, chunk in capture.iter_chunks(chunk_size):
+        n = len(chunk)
+        chunk_mean = chunk.mean()
+        total = count + n
+        delta = chunk_mean - mean
+        m2 += np.sum((chunk - chunk_mean) ** 2) + delta ** 2 * count * n / total
+        mean += delta * n / total
+        count = total
+    return mean, np.sqrt(m2 / count)
+
+
+def preprocess_capture(capture: CaptureFile, out_path: Optional[str] = None,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE) -> CaptureFile:
+    """
+    Remove DC offset and normalize a capture into a new NPY file
+
+    Same result as preprocess_signal, written chunk by chunk; defaults to
+    <capture>.preprocessed.npy next to the source file
+    """
+    if out_path is None:
+        out_path = os.path.splitext(capture.path)[0] + '.preprocessed.npy'
+    mean, std = capture_statistics(capture, chunk_size)
+
+    out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float64, shape=(len(capture),))
+    # float64 chunks of a float64 capture are read-only views of its memmap
+    buffer = np.empty(min(chunk_size, len(capture)))
+    for start, chunk in capture.iter_chunks(chunk_size):
+        normalized = buffer[:len(chunk)]
+        np.subtract(chunk, mean, out=normalized)
+        normalized /= std
+        out[start:start + len(chunk)] = normalized
+    out.flush()
+    del out
+    return CaptureFile(out_path, capture.sampling_rate, start_time=capture.time.start)
+
+
+def capture_psd(capture: CaptureFile, nperseg: int = 256,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Welch PSD averaged over chunks
+
+    Chunks overlap by one segment overlap and start on the segment grid, so
+    the averaged periodograms are exactly those of a single Welch pass
+    """
+    nperseg = min(nperseg, len(capture))
+    step = nperseg - nperseg // 2
+    # Chunk starts must fall on the segment grid
+    chunk_size = max(nperseg, (chunk_size // step) * step + (nperseg - step))
+    total, n_segments = None, 0
+    frequencies = None
+    for _, chunk in capture.iter_chunks(chunk_size, overlap=nperseg - step):
+        if len(chunk) < nperseg:
+            continue
+        frequencies, _, Sxx = signal.spectrogram(chunk, fs=capture.sampling_rate, window='hann',
+                                                 nperseg=nperseg, noverlap=nperseg - step)
+        total = Sxx.sum(axis=-1) if total is None else total + Sxx.sum(axis=-1)
+        n_segments += Sxx.shape[-1]
+    return frequencies, total / n_segments
+
+
+def chunked_window_power(data: np.ndarray, window_size: int,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """
+    Mean power of consecutive non-overlapping windows of an array or memmap
+
+    Only one chunk is converted to float64 at a time
+    """
+    chunk_size = max(window_size, (chunk_size // window_size) * window_size)
+    powers = []
+    for start in range(0, len(data), chunk_size):
+        chunk = np.asarray(data[start:start + chunk_size], dtype=float)
+        n_windows = len(chunk) // window_size
+        if n_windows:
+            windows = chunk[:n_windows * window_size].reshape(n_windows, window_size)
+            powers.append(np.einsum('ij,ij->i', windows, windows) / window_size)
+    return np.concatenate(powers) if powers else np.empty(0)
+
+
+def capture_window_power(capture: CaptureFile, window_size: int,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """
+    Mean power of consecutive non-overlapping windows, read chunk by chunk
+    """
+    return chunked_window_power(capture.data, window_size, chunk_size)
+
+
+def capture_fluctuation_analysis(capture: CaptureFile, window_sizes: Optional[np.ndarray] = None,
+                                 order: int = 1,
+                                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Non-overlapping DFA over a capture, with the profile built chunk by chunk
+
+    Each scale carries its incomplete trailing window into the next chunk,
+    so the result equals compute_fluctuation_analysis on the whole signal
+    """
+    from core.signal_processing import _detrending_basis
+
+    n = len(capture)
+    if window_sizes is None:
+        window_sizes = np.logspace(1, np.log10(n/4), 20, dtype=int)
+    mean, _ = capture_statistics(capture, chunk_size)
+
+    sums = np.zeros(len(window_sizes))
+    counts = np.zeros(len(window_sizes))
+    leftovers = [np.empty(0) for _ in window_sizes]
+    bases = [_detrending_basis(int(w), order) for w in window_sizes]
+    offset = 0.0
+    for _, chunk in capture.iter_chunks(chunk_size):
+        profile = np.cumsum(chunk - mean) + offset
+        offset = profile[-1]
+        for i, window in enumerate(window_sizes):
+            window = int(window)
+            y = np.concatenate((leftovers[i], profile))
+            n_windows = len(y) // window
+            if n_windows:
+                segments = y[:n_windows * window].reshape(n_windows, window)
+                residuals = segments - (segments @ bases[i]) @ bases[i].T
+                sums[i] += np.sum(np.sqrt(np.mean(residuals ** 2, axis=1)))
+                counts[i] += n_windows
+            leftovers[i] = y[n_windows * window:]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return window_sizes, sums / counts
@@ -1,11 +1,25 @@
 import numpy as np
-from scipy import signal
-from typing import Dict, List, Tuple, Optional
+import functools
+from typing import Dict, List, Tuple, Optional, Sequence, TYPE_CHECKING
 from dataclasses import dataclass
-from sklearn.ensemble import IsolationForest
-import pywt
 import logging
 from src.utils.security_validator import SecurityValidator
+from core.replay_detection import ReplayMatch, detect_replays
+from core.analysis_context import AnalysisContext
+from core.peak_tracking import peak_frequencies, track_carriers
+from core.jamming_detection import JammingEpisode, JammingTracker, detect_jamming
+from core.injection_detection import InjectionInterval, InjectionStream, detect_injections
+from core.detector_registry import DEFAULT_REGISTRY, DetectorRegistry, DetectorSpec
+from core.metrics import METRICS, DETECTOR, STAGE
+from core.anomaly_scoring import AnomalyScorer, load_scorer
+
+if TYPE_CHECKING:
+    from core.capture_file import CaptureFile
+    from core.threat_store import ThreatStore
+
+# Window of the frequency hopping spectrogram: scipy.signal.spectrogram's
+# default, which the hopping thresholds were tuned against
+HOPPING_WINDOW = ('tukey', 0.25)
 
 @dataclass
 class CyberThreatIndicator:
@@ -14,68 +28,205 @@ class CyberThreatIndicator:
     timestamp: float
     characteristics: Dict[str, float]
     recommendation: str
+    capture_index: Optional[int] = None  # Set by batch analysis
 
 class CyberWarfareAnalyzer:
     """Advanced signal analysis for cyber warfare detection and countermeasures"""
 
-    def __init__(self, sampling_rate: float = 1000.0):
+    def __init__(self, sampling_rate: float = 1000.0,
+                 detectors: Optional[Sequence[str]] = None,
+                 registry: Optional[DetectorRegistry] = None):
+        """
+        Parameters:
+        -----------
+        sampling_rate : float
+            Sampling rate in Hz
+        detectors : Sequence[str], optional
+            Names of the registered detectors to enable (default: all)
+        registry : DetectorRegistry, optional
+            Detector registry (default: DEFAULT_REGISTRY, including plugins)
+        """
         self.sampling_rate = sampling_rate
         self.security_validator = SecurityValidator()
-        self.attack_patterns = {
-            'frequency_hopping': self._detect_frequency_hopping,
-            'signal_injection': self._detect_signal_injection,
-            'jamming': self._detect_jamming,
-            'replay_attack': self._detect_replay_attack
-        }
+        # Replay engine settings; None selects a default derived from the window size.
+        # Patterns start every replay_hop samples (default window // 8): replays at
+        # least window + hop - 1 samples long are always found, shorter ones only
+        # when a misaligned pattern still correlates above the threshold. Set it
+        # to 1 to catch those too, at hop times the cost
+        self.replay_hop: Optional[int] = None
+        self.replay_max_lag: Optional[int] = None
+        # Refine hopping peak bins to sub-bin frequencies
+        self.hopping_interpolation = False
+        # Jamming engine settings; None hop selects a quarter window
+        self.jamming_window = 1000
+        self.jamming_hop: Optional[int] = None
+        self.jamming_baseline = 'ewma'
+        # Injection engine settings: threshold in robust standard deviations,
+        # noise estimated over calibration segments of this many samples
+        self.injection_threshold = 5.0
+        self.injection_calibration = 4096
+        # Learned anomaly scoring: a trained AnomalyScorer, or a saved one
+        # loaded (and cached in memory) from anomaly_model_path
+        self.anomaly_scorer: Optional[AnomalyScorer] = None
+        self.anomaly_model_path: Optional[str] = None
+        # Skip detectors whose estimated runtime no longer fits (seconds per signal)
+        self.latency_budget: Optional[float] = None
+        self.registry = registry if registry is not None else DEFAULT_REGISTRY
+        names = self.registry.names() if detectors is None else list(detectors)
+        unknown = [name for name in names if name not in self.registry]
+        if unknown:
+            raise ValueError(f"Unknown detectors: {unknown}")
+        # Only enabled detectors are bound; entries may be replaced or added afterwards
+        self.attack_patterns = {name: functools.partial(self.registry.get(name).detect, self)
+                                for name in names}
+        self._registered = dict(self.attack_patterns)
         logging.info("CyberWarfareAnalyzer initialized with sampling rate: %f", sampling_rate)
 
     def analyze_threats(self, signal_data: np.ndarray, 
-                       time: np.ndarray) -> List[CyberThreatIndicator]:
+                       time: np.ndarray,
+                       context: Optional[AnalysisContext] = None) -> List[CyberThreatIndicator]:
         """
         Perform comprehensive cyber threat analysis with security validation
+
+        All detectors share one AnalysisContext, so the spectrogram and the
+        running energy are computed once per signal. Pass a
+        context to reuse it afterwards, e.g. for compute_psd or plotting.
+
+        Signals longer than security_validator.max_chunk_length are analyzed
+        incrementally in chunks of that size (assuming uniform sampling).
+        Results are materialized from analyze_threat_store. Per-detector
+        timings are recorded in core.metrics.METRICS while it is enabled.
+        """
+        return self.analyze_threat_store(signal_data, time, context=context).to_list()
+
+    def analyze_threat_store(self, signal_data: np.ndarray,
+                             time: np.ndarray,
+                             context: Optional[AnalysisContext] = None) -> "ThreatStore":
         """
+        Columnar variant of analyze_threats
+
+        Returns a ThreatStore sorted by confidence; detectors with a columnar
+        implementation fill it directly, the others are converted. Use
+        ThreatStore.top_k or iterate it to materialize indicators lazily.
+        """
+        from core.threat_store import ThreatStore
+
         try:
             # Validate input signal data
-            is_valid, error_msg = self.security_validator.validate_signal(signal_data, time)
+            with METRICS.measure(STAGE, 'validation', len(signal_data)):
+                is_valid, error_msg = self.security_validator.validate_signal(signal_data, time)
             if not is_valid:
                 logging.error("Signal validation failed: %s", error_msg)
-                return []
+                return ThreatStore()
+
+            if len(signal_data) > self.security_validator.max_chunk_length:
+                return ThreatStore.from_indicators(self._analyze_chunked(signal_data, float(time[0])))
+
+            if context is None:
+                context = AnalysisContext(signal_data, self.sampling_rate)
 
-            threats = []
-            # Analyze each potential attack pattern
-            for attack_type, detector in self.attack_patterns.items():
+            stores = {}
+            for attack_type in self.schedule_detectors(len(signal_data)):
+                detector = self.attack_patterns[attack_type]
+                spec = self.registry.get(attack_type)
                 try:
-                    detected_threats = detector(signal_data, time)
-                    threats.extend(detected_threats)
+                    with METRICS.measure(DETECTOR, attack_type, len(signal_data)) as measurement:
+                        if spec is not None and spec.columnar and detector is self._registered.get(attack_type):
+                            store = spec.columnar(self, signal_data, time, context=context)
+                        else:
+                            store = ThreatStore.from_indicators(detector(signal_data, time, context=context))
+                        measurement.indicators = len(store)
+                    stores[attack_type] = store
                 except Exception as e:
                     logging.error("Error in %s detection: %s", attack_type, str(e))
                     continue
 
-            return sorted(threats, key=lambda x: x.confidence, reverse=True)
+            # Merge in detector order so ties in confidence keep a stable order
+            return ThreatStore.concat([stores[name] for name in self.attack_patterns
+                                       if name in stores]).sort_by_confidence()
 
         except Exception as e:
             logging.error("Critical error in threat analysis: %s", str(e))
+            return ThreatStore()
+
+    def schedule_detectors(self, n_samples: int) -> List[str]:
+        """
+        Enabled detectors in execution order for a signal of n_samples
+
+        Registered detectors run cheapest first, sharing inputs; under a
+        latency budget the ones that no longer fit are skipped. Detectors
+        added to attack_patterns without a registry entry run last.
+        """
+        registered = [name for name in self.attack_patterns if name in self.registry]
+        order, skipped = self.registry.schedule(registered, n_samples, self.latency_budget)
+        for name in skipped:
+            logging.info("Skipping %s detection: estimated %.3fs exceeds the latency budget",
+                         name, self.registry.estimate(name, n_samples))
+        return order + [name for name in self.attack_patterns if name not in self.registry]
+
+    def analyze_capture(self, capture: "CaptureFile") -> List[CyberThreatIndicator]:
+        """
+        Perform cyber threat analysis on a memory-mapped capture file
+
+        The recording is read in chunks of security_validator.max_chunk_length
+        samples, so it never has to fit in memory
+        """
+        try:
+            is_valid, error_msg = self.security_validator.validate_uniform_signal(
+                capture.data, capture.time.start, capture.time.step)
+            if not is_valid:
+                logging.error("Capture validation failed: %s", error_msg)
+                return []
+            return self._analyze_chunked(capture.data, capture.time.start)
+
+        except Exception as e:
+            logging.error("Critical error in capture analysis: %s", str(e))
             return []
 
-    def _detect_frequency_hopping(self, data: np.ndarray, time: np.ndarray) -> List[CyberThreatIndicator]:
-        """Detect frequency hopping patterns indicating potential communication hijacking"""
+    def _analyze_chunked(self, data: np.ndarray, start_time: float) -> List[CyberThreatIndicator]:
+        """
+        Chunk-by-chunk analysis of a long in-memory or memory-mapped signal
+
+        All detectors run through the streaming analyzer, which is flushed
+        at the end so open jamming episodes are reported; those without
+        streaming support analyze each chunk on its own. Per-detector
+        timings are recorded in METRICS for every chunk
+        """
+        from core.streaming_analysis import StreamingCyberAnalyzer
+
+        chunk_size = self.security_validator.max_chunk_length
+        streaming = StreamingCyberAnalyzer(self, start_time=start_time,
+                                           detectors=list(self.attack_patterns),
+                                           batch_window=chunk_size)
+
         threats = []
+        for start in range(0, len(data), chunk_size):
+            threats.extend(streaming.push(np.asarray(data[start:start + chunk_size], dtype=float)))
+        threats.extend(streaming.flush())
+
+        return sorted(threats, key=lambda x: x.confidence, reverse=True)
+
+    def _detect_frequency_hopping(self, data: np.ndarray, time: np.ndarray,
+                                  context: Optional[AnalysisContext] = None) -> List[CyberThreatIndicator]:
+        """Detect frequency hopping patterns indicating potential communication hijacking"""
+        return self._frequency_hopping_store(data, time, context).to_list()
+
+    def _frequency_hopping_store(self, data: np.ndarray, time: np.ndarray,
+                                 context: Optional[AnalysisContext] = None) -> "ThreatStore":
+        """Frequency hopping detection filling a columnar ThreatStore without per-threat objects"""
+        from core.threat_store import ThreatStore
+
         window_size = min(256, len(data))
 
         try:
-            # Compute spectrogram with overlapping windows for better detection
-            f, t, Sxx = signal.spectrogram(data, fs=self.sampling_rate, 
-                                         nperseg=window_size,
-                                         noverlap=window_size//2)
-
-            # Get the dominant frequencies at each time point
-            peak_freqs = []
-            for i in range(Sxx.shape[1]):
-                # Get top 3 frequencies to improve detection
-                top_indices = np.argsort(Sxx[:, i])[-3:]
-                peak_freqs.append(np.mean(f[top_indices]))
-
-            peak_freqs = np.array(peak_freqs)
+            if context is None:
+                context = AnalysisContext(data, self.sampling_rate)
+            # Shared spectrogram with overlapping windows for better detection
+            f, t, Sxx = context.spectrogram(nperseg=window_size,
+                                            noverlap=window_size//2, window=HOPPING_WINDOW)
+
+            # Mean of the top 3 frequencies at each time point, for all frames at once
+            peak_freqs = peak_frequencies(f, Sxx, k=3, interpolate=self.hopping_interpolation)
             freq_changes = np.abs(np.diff(peak_freqs))
 
             # Calculate baseline variation using a more sensitive approach
@@ -83,102 +234,191 @@ class CyberWarfareAnalyzer:
             threshold = max(baseline_var * 0.5, 0.05)  # More sensitive threshold
             rapid_changes = np.where(freq_changes > threshold)[0]
 
-            if len(rapid_changes) > 0:
-                for i in range(len(rapid_changes)):
-                    change_magnitude = freq_changes[rapid_changes[i]]
-                    confidence = min(0.95, change_magnitude / baseline_var)
-
-                    metadata = {
-                        'frequency_change': float(freq_changes[rapid_changes[i]]),
-                        'duration': float(window_size / self.sampling_rate)
-                    }
-                    # Sanitize metadata before creating threat indicator
-                    safe_metadata = self.security_validator.sanitize_metadata(metadata)
-
-                    threats.append(CyberThreatIndicator(
-                        threat_type="Frequency Hopping",
-                        confidence=confidence,
-                        timestamp=float(t[rapid_changes[i]]),
-                        characteristics=safe_metadata,
-                        recommendation="Monitor frequency spectrum for unauthorized transmissions"
-                    ))
+            change_magnitude = freq_changes[rapid_changes]
+            with np.errstate(divide='ignore'):
+                confidence = np.minimum(0.95, change_magnitude / baseline_var)
+
+            # Metadata columns are numeric with fixed keys, so there is nothing to sanitize
+            return ThreatStore.from_columns(
+                threat_type="Frequency Hopping",
+                recommendation="Monitor frequency spectrum for unauthorized transmissions",
+                confidence=confidence,
+                timestamp=t[rapid_changes],
+                characteristics={
+                    'frequency_change': change_magnitude,
+                    'duration': float(window_size / self.sampling_rate)
+                })
 
         except Exception as e:
             logging.error("Error in frequency hopping detection: %s", str(e))
 
-        return threats
+        return ThreatStore()
+
+    def track_carriers(self, signal_data: np.ndarray, n_carriers: int = 3,
+                       context: Optional[AnalysisContext] = None
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per-carrier frequency sequences on the frequency hopping spectrogram
+
+        Returns frame times, carrier frequencies and carrier powers, the
+        latter two with shape (n_carriers, n_frames); use
+        peak_tracking.carrier_hops to extract each carrier's hops.
+        """
+        window_size = min(256, len(signal_data))
+        if context is None:
+            context = AnalysisContext(signal_data, self.sampling_rate)
+        f, t, Sxx = context.spectrogram(nperseg=window_size, noverlap=window_size//2,
+                                        window=HOPPING_WINDOW)
+        frequencies, powers = track_carriers(f, Sxx, n_carriers)
+        return t, frequencies, powers
 
     def _detect_signal_injection(self, data: np.ndarray, 
-                               time: np.ndarray) -> List[CyberThreatIndicator]:
-        """Detect potential signal injection attacks"""
+                               time: np.ndarray,
+                               context: Optional[AnalysisContext] = None) -> List[CyberThreatIndicator]:
+        """Detect potential signal injection attacks, one indicator per anomalous interval"""
         threats = []
         try:
-            # Decompose signal using wavelets
-            coeffs = pywt.wavedec(data, 'db4', level=3)
-
-            # Analyze detail coefficients for sudden changes
-            for level, detail in enumerate(coeffs[1:], 1):
-                threshold = np.std(detail) * 3
-                anomalies = np.where(np.abs(detail) > threshold)[0]
-
-                if len(anomalies) > 0:
-                    metadata = {
-                        'wavelet_level': float(level),
-                        'magnitude': float(np.max(np.abs(detail[anomalies])))
-                    }
-                    safe_metadata = self.security_validator.sanitize_metadata(metadata)
-
-                    threats.append(CyberThreatIndicator(
-                        threat_type="Signal Injection",
-                        confidence=min(0.85, len(anomalies) / len(detail)),
-                        timestamp=time[anomalies[0]],
-                        characteristics=safe_metadata,
-                        recommendation="Implement signal authentication mechanisms"
-                    ))
+            # Undecimated wavelet details against robust (MAD) noise thresholds;
+            # processed in bounded chunks, so the context is not needed
+            intervals = detect_injections(data, threshold=self.injection_threshold,
+                                          calibration=self.injection_calibration)
+            threats = [self._injection_indicator(interval, time[interval.start])
+                       for interval in intervals]
 
         except Exception as e:
             logging.error("Error in signal injection detection: %s", str(e))
 
         return threats
 
+    def _injection_stream(self) -> InjectionStream:
+        """Injection engine with the analyzer's settings, e.g. for streaming use"""
+        return InjectionStream(threshold=self.injection_threshold,
+                               calibration=self.injection_calibration)
+
+    def _injection_indicator(self, interval: InjectionInterval, timestamp: float) -> CyberThreatIndicator:
+        """Indicator for one injection interval starting at `timestamp`"""
+        duration = (interval.end - interval.start) / self.sampling_rate
+        metadata = {
+            'wavelet_level': float(interval.level),
+            'magnitude': float(interval.magnitude),
+            'score': float(interval.score),
+            'duration': float(duration),
+            'end_time': float(timestamp + duration)
+        }
+        safe_metadata = self.security_validator.sanitize_metadata(metadata)
+
+        return CyberThreatIndicator(
+            threat_type="Signal Injection",
+            # Confidence grows with how far the interval clears the threshold
+            confidence=float(min(0.85, 1.0 - self.injection_threshold / interval.score)),
+            timestamp=float(timestamp),
+            characteristics=safe_metadata,
+            recommendation="Implement signal authentication mechanisms"
+        )
+
     def _detect_jamming(self, data: np.ndarray, 
-                       time: np.ndarray) -> List[CyberThreatIndicator]:
-        """Detect potential jamming attacks"""
+                       time: np.ndarray,
+                       context: Optional[AnalysisContext] = None) -> List[CyberThreatIndicator]:
+        """Detect potential jamming attacks, one indicator per jamming episode"""
         threats = []
         try:
-            # Compute signal power in windows
-            window_size = min(1000, len(data))
-            n_windows = len(data) // window_size
-            powers = np.array([np.mean(data[i*window_size:(i+1)*window_size]**2) 
-                             for i in range(n_windows)])
+            if context is None:
+                context = AnalysisContext(data, self.sampling_rate)
+            # Sliding-window power against an online baseline
+            window_size = min(self.jamming_window, len(data))
+            episodes = detect_jamming(data, window_size, self.jamming_hop,
+                                      cumulative_energy=context.cumulative_energy(),
+                                      baseline=self.jamming_baseline)
+            threats = [self._jamming_indicator(episode, time[episode.start]) for episode in episodes]
 
-            # Detect sustained high power levels
-            threshold = np.mean(powers) + 2 * np.std(powers)
-            jamming_windows = np.where(powers > threshold)[0]
+        except Exception as e:
+            logging.error("Error in jamming detection: %s", str(e))
 
-            if len(jamming_windows) > 0:
-                metadata = {
-                    'power_level': float(np.mean(powers[jamming_windows])),
-                    'duration': float(len(jamming_windows) * window_size / self.sampling_rate)
-                }
-                safe_metadata = self.security_validator.sanitize_metadata(metadata)
+        return threats
 
-                threats.append(CyberThreatIndicator(
-                    threat_type="Signal Jamming",
-                    confidence=min(0.95, len(jamming_windows) / n_windows),
-                    timestamp=time[jamming_windows[0] * window_size],
-                    characteristics=safe_metadata,
-                    recommendation="Implement frequency hopping or spread spectrum techniques"
-                ))
+    def _jamming_tracker(self, window_size: Optional[int] = None) -> JammingTracker:
+        """Tracker with the analyzer's jamming settings, e.g. for streaming use"""
+        return JammingTracker(window_size or self.jamming_window, self.jamming_hop,
+                              baseline=self.jamming_baseline)
+
+    def _jamming_indicator(self, episode: JammingEpisode, timestamp: float) -> CyberThreatIndicator:
+        """Indicator for one jamming episode starting at `timestamp`"""
+        duration = (episode.end - episode.start) / self.sampling_rate
+        metadata = {
+            'power_level': float(episode.mean_power),
+            'peak_power': float(episode.peak_power),
+            'baseline_power': float(episode.baseline_power),
+            'duration': float(duration),
+            'end_time': float(timestamp + duration)
+        }
+        safe_metadata = self.security_validator.sanitize_metadata(metadata)
+
+        # Confidence grows with how far the episode rises above the baseline
+        confidence = 0.95
+        if episode.mean_power > 0:
+            confidence = min(0.95, 1.0 - episode.baseline_power / episode.mean_power)
+
+        return CyberThreatIndicator(
+            threat_type="Signal Jamming",
+            confidence=float(confidence),
+            timestamp=float(timestamp),
+            characteristics=safe_metadata,
+            recommendation="Implement frequency hopping or spread spectrum techniques"
+        )
+
+    def _detect_replay_attack(self, data: np.ndarray, 
+                            time: np.ndarray,
+                            context: Optional[AnalysisContext] = None) -> List[CyberThreatIndicator]:
+        """Detect potential replay attacks using FFT-based normalized cross-correlation"""
+        threats = []
+        try:
+            if context is None:
+                context = AnalysisContext(data, self.sampling_rate)
+            window_size = min(500, len(data) // 4)
+            hop = self.replay_hop or max(1, window_size // 8)
+            max_lag = self.replay_max_lag or 4 * window_size
+
+            matches = detect_replays(data, window_size, hop=hop,
+                                     min_lag=window_size, max_lag=max_lag,
+                                     cumulative_energy=context.cumulative_energy())
+
+            # One indicator per replayed segment
+            threats = [self._replay_indicator(match, window_size, time[match.start])
+                       for match in matches]
 
         except Exception as e:
-            logging.error("Error in jamming detection: %s", str(e))
+            logging.error("Error in replay attack detection: %s", str(e))
 
         return threats
 
-    def _detect_replay_attack(self, data: np.ndarray, 
-                            time: np.ndarray) -> List[CyberThreatIndicator]:
-        """Detect potential replay attacks through pattern matching"""
+    def _replay_indicator(self, match: ReplayMatch, window_size: int,
+                          timestamp: float) -> CyberThreatIndicator:
+        """Indicator for one replayed segment found with patterns of window_size samples"""
+        metadata = {
+            'pattern_length': float(window_size / self.sampling_rate),
+            'correlation': float(match.correlation),
+            'lag': float(match.lag / self.sampling_rate),
+            'segment_duration': float((match.end - match.start) / self.sampling_rate)
+        }
+        safe_metadata = self.security_validator.sanitize_metadata(metadata)
+
+        return CyberThreatIndicator(
+            threat_type="Replay Attack",
+            confidence=float(min(0.8, match.correlation)),
+            timestamp=float(timestamp),
+            characteristics=safe_metadata,
+            recommendation="Implement temporal signature verification"
+        )
+
+    def _detect_replay_attack_reference(self, data: np.ndarray, 
+                                        time: np.ndarray,
+                                        context: Optional[AnalysisContext] = None) -> List[CyberThreatIndicator]:
+        """
+        Reference replay detector: per-sample sliding correlation
+
+        Kept to validate the FFT engine used by _detect_replay_attack;
+        runs in O(n * window) and is unsuitable for long captures
+        """
         threats = []
         try:
             window_size = min(500, len(data) // 4)
@@ -211,6 +451,48 @@ class CyberWarfareAnalyzer:
 
         return threats
 
+    def _detect_anomalies(self, data: np.ndarray,
+                          time: np.ndarray,
+                          context: Optional[AnalysisContext] = None) -> List[CyberThreatIndicator]:
+        """Score windows with the trained IsolationForest, one indicator per run of anomalous windows"""
+        threats = []
+        try:
+            scorer = self.anomaly_scorer
+            if scorer is None and self.anomaly_model_path:
+                scorer = load_scorer(self.anomaly_model_path)
+            if scorer is None:
+                return threats
+
+            starts, scores = scorer.score_signal(data)
+            flagged = scores > scorer.threshold
+            window_size = scorer.feature_bank.window_size
+            # Runs of consecutive anomalous windows
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], flagged.view(np.int8), [0]))))
+            for first, last in zip(edges[::2], edges[1::2]):
+                start, end = int(starts[first]), int(starts[last - 1]) + window_size
+                duration = (end - start) / self.sampling_rate
+                metadata = {
+                    'anomaly_score': float(scores[first:last].max()),
+                    'mean_score': float(scores[first:last].mean()),
+                    'windows': float(last - first),
+                    'duration': float(duration),
+                    'end_time': float(time[start] + duration)
+                }
+                safe_metadata = self.security_validator.sanitize_metadata(metadata)
+
+                threats.append(CyberThreatIndicator(
+                    threat_type="Signal Anomaly",
+                    confidence=float(min(0.9, metadata['anomaly_score'])),
+                    timestamp=float(time[start]),
+                    characteristics=safe_metadata,
+                    recommendation="Inspect the interval; retrain the baseline if the change is legitimate"
+                ))
+
+        except Exception as e:
+            logging.error("Error in anomaly detection: %s", str(e))
+
+        return threats
+
     def generate_countermeasures(self, threats: List[CyberThreatIndicator]) -> Dict[str, List[str]]:
         """Generate countermeasures for detected threats"""
         try:
@@ -244,9 +526,32 @@ class CyberWarfareAnalyzer:
                         "Deploy challenge-response protocols",
                         "Monitor signal timing patterns"
                     ])
+                elif threat.threat_type == "Signal Anomaly":
+                    countermeasures[threat.threat_type].extend([
+                        "Correlate with other detectors for the same interval",
+                        "Review recent configuration or environment changes",
+                        "Retrain the anomaly baseline on verified normal traffic"
+                    ])
 
             return countermeasures
 
         except Exception as e:
             logging.error("Error generating countermeasures: %s", str(e))
-            return {}
\ No newline at end of file
+            return {}
+
+
+# Built-in detectors; costs are seconds per million samples excluding shared inputs
+for _spec in (
+    DetectorSpec('frequency_hopping', CyberWarfareAnalyzer._detect_frequency_hopping,
+                 requires=('stft',), cost=0.07, streaming=True,
+                 columnar=CyberWarfareAnalyzer._frequency_hopping_store),
+    DetectorSpec('signal_injection', CyberWarfareAnalyzer._detect_signal_injection,
+                 requires=('raw',), cost=0.16, streaming=True),
+    DetectorSpec('jamming', CyberWarfareAnalyzer._detect_jamming,
+                 requires=('power',), cost=0.01, streaming=True),
+    DetectorSpec('replay_attack', CyberWarfareAnalyzer._detect_replay_attack,
+                 requires=('power',), cost=1.6, streaming=True),
+    DetectorSpec('anomaly', CyberWarfareAnalyzer._detect_anomalies,
+                 requires=('raw',), cost=0.3),
+):
+    DEFAULT_REGISTRY.register(_spec, replace=True)
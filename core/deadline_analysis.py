@@ -0,0 +1,226 @@
+"""
+Deadline-aware cyber threat analysis
+Runs cheap screening passes over the whole capture first, then spends the
+remaining time budget on expensive detectors restricted to the regions the
+screen flagged, returning partial results with a completeness flag when
+the deadline is reached
+"""
+
+import numpy as np
+import logging
+import time as _time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+from core.cyber_analysis import HOPPING_WINDOW, CyberWarfareAnalyzer, CyberThreatIndicator
+from core.analysis_context import AnalysisContext
+from core.jamming_detection import sliding_power
+
+# Scale from MAD to standard deviation for normally distributed values
+_MAD_TO_STD = 1.4826
+
+
+@dataclass
+class AnalysisReport:
+    """Outcome of a deadline-bounded analysis"""
+    threats: List[CyberThreatIndicator]
+    complete: bool                 # False when work was skipped to meet the deadline
+    elapsed: float                 # Seconds spent
+    regions: List[Tuple[int, int]] = field(default_factory=list)   # Screened [start, end) sample ranges
+    skipped: List[str] = field(default_factory=list)               # Detectors or detector@region not run
+    error: Optional[str] = None    # Why the capture was not analyzed at all
+
+
+def _robust_outliers(values: np.ndarray, threshold: float) -> np.ndarray:
+    """Mask of values further than `threshold` robust standard deviations from the median"""
+    median = np.median(values)
+    spread = _MAD_TO_STD * np.median(np.abs(values - median))
+    if spread == 0:
+        return values != median
+    return np.abs(values - median) > threshold * spread
+
+
+def screen_regions(context: AnalysisContext, window_size: int = 1000, threshold: float = 4.0,
+                   margin: int = 2500) -> List[Tuple[int, int]]:
+    """
+    Sample ranges whose windowed energy or coarse spectrum stands out
+
+    Window log-power and the spectral flux between frames of the shared
+    hopping spectrogram are compared against their own median and MAD.
+    Flagged spans are widened by `margin` samples on each side (enough
+    look-back for replay search) and merged. Replays that leave energy and
+    spectrum unchanged are not flagged by design; run the full analysis
+    when such attacks must not be missed.
+    """
+    n = context.n_samples
+    window_size = min(window_size, n)
+    hop = max(1, window_size // 4)
+    flagged = []
+
+    powers = sliding_power(None, window_size, hop, context.cumulative_energy())
+    if len(powers) > 1:
+        log_power = np.log(np.maximum(powers, np.finfo(float).tiny))
+        for i in np.flatnonzero(_robust_outliers(log_power, threshold)).tolist():
+            flagged.append((i * hop, i * hop + window_size))
+
+    nperseg = min(256, n)
+    step = nperseg - nperseg // 2
+    _, _, Sxx = context.spectrogram(nperseg=nperseg, noverlap=nperseg // 2, window=HOPPING_WINDOW)
+    if Sxx.shape[1] > 2:
+        spectra = Sxx / np.maximum(Sxx.sum(axis=0, keepdims=True), np.finfo(float).tiny)
+        flux = np.abs(np.diff(spectra, axis=1)).sum(axis=0)
+        # Change between frames i and i + 1 lies in the samples they do not share
+        for i in np.flatnonzero(_robust_outliers(flux, threshold)).tolist():
+            flagged.append((i * step, (i + 1) * step + nperseg))
+
+    regions: List[Tuple[int, int]] = []
+    for start, end in sorted(flagged):
+        start, end = max(0, start - margin), min(n, end + margin)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    return regions
+
+
+class DeadlineCyberAnalyzer:
+    """
+    Deadline-bounded variant of CyberWarfareAnalyzer.analyze_threats
+
+    Detectors cheaper than `screen_cost` (seconds per million samples, from
+    the detector registry) run on the whole capture, cheapest first. The
+    others run only on screened regions. Before each unit of work the
+    registry cost estimate is checked against the time left; work that would
+    overrun is skipped and the report is marked incomplete. A detector that
+    has started is not interrupted, so estimates should be conservative;
+    ParallelCyberAnalyzer's detector_timeout gives hard preemption.
+
+    Captures longer than security_validator.max_chunk_length are analyzed
+    chunk by chunk through the streaming analyzer, as
+    CyberWarfareAnalyzer._analyze_chunked does, without screening. The
+    deadline is checked before each chunk against the time the previous
+    one took; once a chunk no longer fits, the rest of the capture is
+    skipped.
+    """
+
+    def __init__(self, analyzer: Optional[CyberWarfareAnalyzer] = None,
+                 sampling_rate: float = 1000.0,
+                 deadline: float = 1.0,
+                 screen_cost: float = 0.1,
+                 screen_window: int = 1000,
+                 screen_threshold: float = 4.0,
+                 margin: int = 2500):
+        self.analyzer = analyzer or CyberWarfareAnalyzer(sampling_rate=sampling_rate)
+        self.sampling_rate = self.analyzer.sampling_rate
+        self.deadline = deadline
+        self.screen_cost = screen_cost
+        self.screen_window = screen_window
+        self.screen_threshold = screen_threshold
+        self.margin = margin
+
+    def analyze(self, signal_data: np.ndarray, time: np.ndarray,
+                deadline: Optional[float] = None) -> AnalysisReport:
+        """
+        Analyze one capture within `deadline` seconds (default: self.deadline)
+
+        Returns:
+        --------
+        report : AnalysisReport
+            Threats sorted by confidence, with complete=False if any
+            detector or region was skipped for lack of time, or if the
+            capture failed validation (see error)
+        """
+        started = _time.monotonic()
+        deadline = self.deadline if deadline is None else deadline
+        registry = self.analyzer.registry
+
+        def elapsed() -> float:
+            return _time.monotonic() - started
+
+        def fits(name: str, n_samples: int, available=('raw',)) -> bool:
+            estimate = registry.estimate(name, n_samples, available) if name in registry else 0.0
+            return elapsed() + estimate <= deadline
+
+        try:
+            is_valid, error_msg = self.analyzer.security_validator.validate_signal(signal_data, time)
+            if not is_valid:
+                logging.error("Signal validation failed: %s", error_msg)
+                return AnalysisReport([], False, elapsed(), error=error_msg)
+
+            if len(signal_data) > self.analyzer.security_validator.max_chunk_length:
+                threats, skipped = self._analyze_chunks(signal_data, float(time[0]), deadline, elapsed)
+                if skipped:
+                    logging.info("Deadline of %.3fs reached; skipped %s", deadline, ", ".join(skipped))
+                return AnalysisReport(threats, not skipped, elapsed(), skipped=skipped)
+
+            context = AnalysisContext(signal_data, self.sampling_rate)
+            regions = screen_regions(context, self.screen_window, self.screen_threshold, self.margin)
+            # Inputs computed by the screen are free for the full-capture detectors
+            available = ('raw', 'power', 'stft')
+
+            order = self.analyzer.schedule_detectors(len(signal_data))
+            full = [name for name in order
+                    if name not in registry or registry.get(name).cost < self.screen_cost]
+            regional = [name for name in order if name not in full]
+
+            found = {}
+            skipped = []
+            for name in full:
+                if not fits(name, len(signal_data), available):
+                    skipped.append(name)
+                    continue
+                found[name] = self._run(name, signal_data, time, context)
+
+            for name in regional:
+                found[name] = []
+                for start, end in regions:
+                    if not fits(name, end - start):
+                        skipped.append(f"{name}@{start}:{end}")
+                        continue
+                    found[name].extend(self._run(name, signal_data[start:end], time[start:end]))
+
+            threats = [threat for name in self.analyzer.attack_patterns if name in found
+                       for threat in found[name]]
+            if skipped:
+                logging.info("Deadline of %.3fs reached; skipped %s", deadline, ", ".join(skipped))
+            return AnalysisReport(sorted(threats, key=lambda x: x.confidence, reverse=True),
+                                  not skipped, elapsed(), regions, skipped)
+
+        except Exception as e:
+            logging.error("Critical error in deadline analysis: %s", str(e))
+            return AnalysisReport([], False, elapsed(), error=str(e))
+
+    def _analyze_chunks(self, signal_data: np.ndarray, start_time: float, deadline: float,
+                        elapsed: Callable[[], float]) -> Tuple[List[CyberThreatIndicator], List[str]]:
+        """Chunked streaming analysis that stops before the chunk that would overrun"""
+        from core.streaming_analysis import StreamingCyberAnalyzer
+
+        chunk_size = self.analyzer.security_validator.max_chunk_length
+        registry = self.analyzer.registry
+        streaming = StreamingCyberAnalyzer(self.analyzer, start_time=start_time,
+                                           detectors=list(self.analyzer.attack_patterns),
+                                           batch_window=chunk_size)
+        # Registry estimate for the first chunk, then the time the last one took
+        estimate = sum(registry.estimate(name, chunk_size) for name in streaming.detectors
+                       if name in registry)
+        threats, skipped = [], []
+        for start in range(0, len(signal_data), chunk_size):
+            if elapsed() + estimate > deadline:
+                skipped = [f"{name}@{start}:{len(signal_data)}" for name in streaming.detectors]
+                break
+            chunk_started = elapsed()
+            threats.extend(streaming.push(np.asarray(signal_data[start:start + chunk_size], dtype=float)))
+            estimate = elapsed() - chunk_started
+        # Report what is pending up to where the analysis stopped
+        threats.extend(streaming.flush())
+        return sorted(threats, key=lambda x: x.confidence, reverse=True), skipped
+
+    def _run(self, name: str, data: np.ndarray, time: np.ndarray,
+             context: Optional[AnalysisContext] = None) -> List[CyberThreatIndicator]:
+        if context is None:
+            context = AnalysisContext(data, self.sampling_rate)
+        try:
+            return self.analyzer.attack_patterns[name](data, time, context=context)
+        except Exception as e:
+            logging.error("Error in %s detection: %s", name, str(e))
+            return []
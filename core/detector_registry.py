@@ -0,0 +1,140 @@
+"""
+Detector registry
+Describes the threat detectors available to CyberWarfareAnalyzer: the
+shared inputs each one needs, its expected cost and whether it can run on
+streams. The analyzer binds only the detectors a deployment enables and
+schedules them by cost, so unused or over-budget detectors cost nothing.
+Plugins register additional detectors into DEFAULT_REGISTRY.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Module logger: built-in detectors are registered at import time, before
+# scripts configure logging, and root-logger calls would configure it for them
+logger = logging.getLogger(__name__)
+
+# Shared inputs an AnalysisContext provides, with their expected cost in
+# seconds per million samples (raw samples are free)
+INPUT_COSTS: Dict[str, float] = {
+    'raw': 0.0,
+    'stft': 0.045,
+    'power': 0.008,
+}
+
+
+@dataclass
+class DetectorSpec:
+    """
+    Declaration of one detector
+
+    `detect(analyzer, data, time, context=None)` returns a list of
+    CyberThreatIndicator. `cost` is the detector's own expected runtime in
+    seconds per million samples, excluding its shared inputs. Streaming
+    support beyond the built-in detectors needs `stream_factory(analyzer,
+    start_time)` returning an object with push(block) and flush(). An
+    optional `columnar(analyzer, data, time, context=None)` returns a
+    ThreatStore directly.
+    """
+    name: str
+    detect: Callable
+    requires: Tuple[str, ...] = ('raw',)
+    cost: float = 0.1
+    streaming: bool = False
+    stream_factory: Optional[Callable] = None
+    columnar: Optional[Callable] = None
+
+    def __post_init__(self):
+        unknown = set(self.requires) - set(INPUT_COSTS)
+        if unknown:
+            raise ValueError(f"Unknown detector inputs for {self.name}: {sorted(unknown)}")
+        if self.cost < 0:
+            raise ValueError(f"Detector cost must be non-negative: {self.name}")
+
+
+class DetectorRegistry:
+    """Ordered collection of DetectorSpecs keyed by name"""
+
+    def __init__(self, specs: Iterable[DetectorSpec] = ()):
+        self._specs: Dict[str, DetectorSpec] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: DetectorSpec, replace: bool = False) -> DetectorSpec:
+        """Add a detector; re-registering a name requires replace=True"""
+        if spec.name in self._specs and not replace:
+            raise ValueError(f"Detector already registered: {spec.name}")
+        self._specs[spec.name] = spec
+        logger.debug("Registered detector: %s", spec.name)
+        return spec
+
+    def detector(self, name: str, requires: Sequence[str] = ('raw',), cost: float = 0.1,
+                 streaming: bool = False, stream_factory: Optional[Callable] = None):
+        """Decorator form of register for plain detector functions"""
+        def decorate(detect: Callable) -> Callable:
+            self.register(DetectorSpec(name, detect, tuple(requires), cost, streaming, stream_factory))
+            return detect
+        return decorate
+
+    def unregister(self, name: str) -> None:
+        self._specs.pop(name, None)
+
+    def get(self, name: str) -> Optional[DetectorSpec]:
+        return self._specs.get(name)
+
+    def names(self) -> List[str]:
+        """Detector names in registration order"""
+        return list(self._specs)
+
+    def copy(self) -> "DetectorRegistry":
+        return DetectorRegistry(self._specs.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def estimate(self, name: str, n_samples: int, available: Iterable[str] = ('raw',)) -> float:
+        """Expected seconds to run a detector given the inputs already computed"""
+        spec = self._specs[name]
+        missing = set(spec.requires) - set(available)
+        return (spec.cost + sum(INPUT_COSTS[i] for i in missing)) * n_samples / 1e6
+
+    def schedule(self, names: Sequence[str], n_samples: int,
+                 budget: Optional[float] = None) -> Tuple[List[str], List[str]]:
+        """
+        Order detectors cheapest first, counting shared inputs once
+
+        At each step the detector with the lowest marginal cost (its own cost
+        plus inputs not yet computed) runs next, so detectors sharing an
+        input run together after whichever of them is cheapest. With a
+        latency budget in seconds, detectors whose marginal cost no longer
+        fits are skipped.
+
+        Returns:
+        --------
+        order, skipped : List[str]
+        """
+        remaining = [name for name in names if name in self._specs]
+        available = {'raw'}
+        order, skipped = [], []
+        spent = 0.0
+        while remaining:
+            costs = [self.estimate(name, n_samples, available) for name in remaining]
+            # min keeps registration order among equal costs
+            index = min(range(len(remaining)), key=costs.__getitem__)
+            name = remaining.pop(index)
+            if budget is not None and spent + costs[index] > budget:
+                skipped.append(name)
+                continue
+            spent += costs[index]
+            available.update(self._specs[name].requires)
+            order.append(name)
+        return order, skipped
+
+
+# Registry used by analyzers unless they are given their own; the built-in
+# detectors are registered by core.cyber_analysis
+DEFAULT_REGISTRY = DetectorRegistry()
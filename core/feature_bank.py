@@ -0,0 +1,131 @@
+"""
+Windowed feature bank
+Turns a raw signal into one feature row per analysis window: band powers,
+spectral centroid and entropy, wavelet band energies, RMS, kurtosis and
+zero-crossing rate. All windows are taken from one strided view and each
+feature is computed for a block of windows at once, so there is no
+per-window Python loop. The float32 output feeds FeatureExtractor and the
+anomaly scorer directly.
+"""
+
+import numpy as np
+import pywt
+from typing import List, Optional
+
+from core.signal_processing import compute_psd
+
+
+class FeatureBank:
+    """
+    Feature extractor over sliding windows of a 1-D signal
+
+    Parameters:
+    -----------
+    sampling_rate : float
+        Sampling rate in Hz
+    window_size : int
+        Samples per window
+    hop : int, optional
+        Samples between window starts (default: window_size, no overlap)
+    n_bands : int
+        Equal-width frequency bands between 0 Hz and Nyquist
+    wavelet, wavelet_level : str, int
+        Decomposition used for the wavelet band energies
+    block_windows : int
+        Windows processed per vectorized block, bounding temporary memory
+    """
+
+    def __init__(self, sampling_rate: float = 1000.0, window_size: int = 1000,
+                 hop: Optional[int] = None, n_bands: int = 8, wavelet: str = 'db4',
+                 wavelet_level: int = 3, block_windows: int = 4096):
+        if window_size < 2:
+            raise ValueError("window_size must be at least 2")
+        self.sampling_rate = sampling_rate
+        self.window_size = window_size
+        self.hop = hop or window_size
+        self.n_bands = n_bands
+        self.wavelet = wavelet
+        self.wavelet_level = min(wavelet_level, pywt.dwt_max_level(window_size, wavelet)) or 1
+        self.block_windows = block_windows
+
+    @property
+    def feature_names(self) -> List[str]:
+        nyquist = self.sampling_rate / 2
+        edges = np.linspace(0.0, nyquist, self.n_bands + 1)
+        names = [f"band_power_{lo:g}_{hi:g}hz" for lo, hi in zip(edges[:-1], edges[1:])]
+        names += ["spectral_centroid", "spectral_entropy"]
+        names += [f"wavelet_energy_a{self.wavelet_level}"]
+        names += [f"wavelet_energy_d{level}" for level in range(self.wavelet_level, 0, -1)]
+        names += ["rms", "kurtosis", "zero_crossing_rate"]
+        return names
+
+    @property
+    def n_features(self) -> int:
+        return self.n_bands + 2 + (self.wavelet_level + 1) + 3
+
+    def window_starts(self, n_samples: int) -> np.ndarray:
+        """First sample index of each window"""
+        return np.arange(0, max(n_samples - self.window_size + 1, 0), self.hop)
+
+    def transform(self, data: np.ndarray) -> np.ndarray:
+        """
+        Features of every complete window of `data`
+
+        Returns:
+        --------
+        features : np.ndarray
+            C-contiguous float32 array of shape (n_windows, n_features),
+            columns as in feature_names
+        """
+        data = np.asarray(data, dtype=float)
+        if data.ndim != 1:
+            raise ValueError("FeatureBank expects a 1-D signal")
+        if len(data) < self.window_size:
+            return np.empty((0, self.n_features), dtype=np.float32)
+        windows = np.lib.stride_tricks.sliding_window_view(data, self.window_size)[::self.hop]
+        features = np.empty((len(windows), self.n_features), dtype=np.float32)
+        for start in range(0, len(windows), self.block_windows):
+            block = windows[start:start + self.block_windows]
+            features[start:start + len(block)] = self._block_features(block)
+        return features
+
+    def _block_features(self, windows: np.ndarray) -> np.ndarray:
+        columns = []
+
+        frequencies, psd = compute_psd(windows, self.sampling_rate)
+        df = frequencies[1] - frequencies[0]
+        # Each frequency bin belongs to exactly one band; Nyquist joins the last
+        band = np.minimum((frequencies / (self.sampling_rate / 2) * self.n_bands).astype(int),
+                          self.n_bands - 1)
+        membership = np.zeros((len(frequencies), self.n_bands))
+        membership[np.arange(len(frequencies)), band] = df
+        columns.append(psd @ membership)
+
+        total = psd.sum(axis=1, keepdims=True)
+        weights = psd / np.where(total > 0, total, 1.0)
+        columns.append((weights @ frequencies)[:, None])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entropy = -np.sum(np.where(weights > 0, weights * np.log(weights), 0.0), axis=1)
+        columns.append((entropy / np.log(len(frequencies)))[:, None])
+
+        coeffs = pywt.wavedec(windows, self.wavelet, level=self.wavelet_level, axis=-1)
+        columns.append(np.stack([np.mean(np.square(c), axis=-1) for c in coeffs], axis=1))
+
+        power = np.mean(np.square(windows), axis=1)
+        columns.append(np.sqrt(power)[:, None])
+        # Excess (Fisher) kurtosis; constant windows get 0
+        centered = windows - windows.mean(axis=1, keepdims=True)
+        m2 = np.mean(np.square(centered), axis=1)
+        m4 = np.mean(np.square(np.square(centered)), axis=1)
+        tiny = np.finfo(float).eps * np.maximum(power, np.finfo(float).tiny)
+        columns.append(np.where(m2 > tiny, m4 / np.maximum(m2, tiny) ** 2 - 3.0, 0.0)[:, None])
+        signs = np.signbit(windows)
+        columns.append(np.mean(signs[:, 1:] != signs[:, :-1], axis=1)[:, None])
+
+        return np.hstack(columns)
+
+
+def window_features(data: np.ndarray, sampling_rate: float = 1000.0,
+                    window_size: int = 1000, hop: Optional[int] = None, **kwargs) -> np.ndarray:
+    """Feature matrix of `data` from a FeatureBank with the given settings"""
+    return FeatureBank(sampling_rate, window_size, hop, **kwargs).transform(data)
@@ -1,9 +1,206 @@
 
-from sklearn.decomposition import PCA
+import os
+import logging
+import numpy as np
+from typing import Optional
+from sklearn.decomposition import PCA, IncrementalPCA
 from sklearn.preprocessing import StandardScaler
 
-def extract_features(data, n_components=2):
-    """ Apply PCA to reduce dimensions of the dataset."""
+# IncrementalPCA attributes saved so a loaded wide model can keep training
+_IPCA_STATE = ('components_', 'mean_', 'var_', 'singular_values_', 'explained_variance_',
+               'explained_variance_ratio_', 'noise_variance_', 'n_samples_seen_')
+
+
+class FeatureExtractor:
+    """
+    Standardization plus PCA that is fitted once and reused
+
+    Rows are observations and columns features, as for extract_features.
+    Chunks passed to partial_fit update running means and co-moments, so
+    the result equals a single PCA over all rows (up to component signs)
+    without holding them in memory. Wider matrices than
+    `max_covariance_features` use IncrementalPCA instead, whose chunks are
+    standardized with the statistics seen so far. Fitted models are saved
+    with save() and restored with FeatureExtractor.load().
+    """
+
+    def __init__(self, n_components: int = 2, max_covariance_features: int = 2048,
+                 chunk_size: int = 65_536):
+        self.n_components = n_components
+        self.max_covariance_features = max_covariance_features
+        self.chunk_size = chunk_size
+        self._reset()
+
+    def _reset(self) -> None:
+        self.n_samples_seen_ = 0
+        self.mean_: Optional[np.ndarray] = None
+        self._m2: Optional[np.ndarray] = None       # Co-moment matrix, or per-feature sums for wide data
+        self._ipca: Optional[IncrementalPCA] = None
+        self._components: Optional[np.ndarray] = None
+        self._explained_variance: Optional[np.ndarray] = None
+
+    @property
+    def wide(self) -> bool:
+        return self.mean_ is not None and len(self.mean_) > self.max_covariance_features
+
+    @property
+    def scale_(self) -> np.ndarray:
+        """Per-feature standard deviation, 1 for constant features (as StandardScaler)"""
+        variance = self._variance()
+        scale = np.sqrt(variance)
+        scale[variance < 10 * np.finfo(float).eps] = 1.0
+        return scale
+
+    @property
+    def components_(self) -> np.ndarray:
+        if self._components is None:
+            self._solve()
+        return self._components
+
+    @property
+    def explained_variance_(self) -> np.ndarray:
+        if self._explained_variance is None:
+            self._solve()
+        return self._explained_variance
+
+    def _variance(self) -> np.ndarray:
+        m2 = self._m2 if self._m2.ndim == 1 else np.diag(self._m2)
+        return np.maximum(m2 / self.n_samples_seen_, 0.0)
+
+    def _update_moments(self, chunk: np.ndarray) -> None:
+        """Chan et al. pairwise update of the running mean and co-moments"""
+        n_chunk = len(chunk)
+        chunk_mean = chunk.mean(axis=0)
+        centered = chunk - chunk_mean
+        if self.mean_ is None:
+            wide = chunk.shape[1] > self.max_covariance_features
+            self.mean_ = np.zeros(chunk.shape[1])
+            self._m2 = np.zeros(chunk.shape[1]) if wide else np.zeros((chunk.shape[1],) * 2)
+        elif chunk.shape[1] != len(self.mean_):
+            raise ValueError(f"Expected {len(self.mean_)} features, got {chunk.shape[1]}")
+
+        n_total = self.n_samples_seen_ + n_chunk
+        delta = chunk_mean - self.mean_
+        weight = self.n_samples_seen_ * n_chunk / n_total
+        if self._m2.ndim == 1:
+            self._m2 += np.einsum('ij,ij->j', centered, centered) + delta ** 2 * weight
+        else:
+            self._m2 += centered.T @ centered + np.outer(delta, delta) * weight
+        self.mean_ += delta * n_chunk / n_total
+        self.n_samples_seen_ = n_total
+
+    def partial_fit(self, X: np.ndarray) -> "FeatureExtractor":
+        """Update the model with a chunk of rows"""
+        X = np.asarray(X, dtype=float)
+        if X.ndim != 2 or len(X) == 0:
+            raise ValueError("Expected a non-empty 2D array of observations")
+        self._update_moments(X)
+        if self.wide:
+            if self._ipca is None:
+                self._ipca = IncrementalPCA(n_components=self.n_components)
+            # IncrementalPCA needs at least n_components rows per call
+            if len(X) >= self.n_components:
+                self._ipca.partial_fit((X - self.mean_) / self.scale_)
+        self._components = self._explained_variance = None
+        return self
+
+    def fit(self, X: np.ndarray) -> "FeatureExtractor":
+        """
+        Fit on all rows of X, reading it in chunks of chunk_size rows
+
+        Works on memory-mapped arrays. Wide data takes a second pass so
+        every IncrementalPCA chunk is standardized with the final statistics.
+        """
+        self._reset()
+        for start in range(0, len(X), self.chunk_size):
+            self._update_moments(np.asarray(X[start:start + self.chunk_size], dtype=float))
+        if self.wide:
+            self._ipca = IncrementalPCA(n_components=self.n_components)
+            mean, scale = self.mean_, self.scale_
+            for start in range(0, len(X), self.chunk_size):
+                chunk = np.asarray(X[start:start + self.chunk_size], dtype=float)
+                if len(chunk) >= self.n_components:
+                    self._ipca.partial_fit((chunk - mean) / scale)
+        return self
+
+    def _solve(self) -> None:
+        if self.n_samples_seen_ < 2:
+            raise ValueError("FeatureExtractor needs at least two fitted rows")
+        if self.wide:
+            self._components = self._ipca.components_
+            self._explained_variance = self._ipca.explained_variance_
+            return
+        # Covariance of the standardized data, as PCA would compute it
+        scale = self.scale_
+        covariance = self._m2 / (self.n_samples_seen_ - 1) / np.outer(scale, scale)
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        order = np.argsort(eigenvalues)[::-1][:self.n_components]
+        components = eigenvectors[:, order].T
+        # Deterministic signs: largest loading of each component positive
+        signs = np.sign(components[np.arange(len(components)), np.abs(components).argmax(axis=1)])
+        self._components = components * signs[:, None]
+        self._explained_variance = np.maximum(eigenvalues[order], 0.0)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """Project rows onto the fitted components"""
+        if self.mean_ is None:
+            raise ValueError("FeatureExtractor is not fitted")
+        scaled = (np.asarray(X, dtype=float) - self.mean_) / self.scale_
+        if self.wide:
+            scaled -= self._ipca.mean_
+        return scaled @ self.components_.T
+
+    def fit_transform(self, X: np.ndarray) -> np.ndarray:
+        return self.fit(X).transform(X)
+
+    def save(self, path: str) -> None:
+        """Store the fitted model as a NumPy .npz archive (no pickled objects)"""
+        state = {
+            'n_components': self.n_components,
+            'max_covariance_features': self.max_covariance_features,
+            'chunk_size': self.chunk_size,
+            'n_samples_seen': self.n_samples_seen_,
+            'mean': self.mean_,
+            'm2': self._m2,
+        }
+        if self._ipca is not None:
+            state.update({f'ipca_{name}': getattr(self._ipca, name) for name in _IPCA_STATE})
+        with open(path, 'wb') as f:
+            np.savez(f, **state)
+
+    @classmethod
+    def load(cls, path: str) -> "FeatureExtractor":
+        with np.load(path, allow_pickle=False) as archive:
+            extractor = cls(int(archive['n_components']), int(archive['max_covariance_features']),
+                            int(archive['chunk_size']))
+            extractor.n_samples_seen_ = int(archive['n_samples_seen'])
+            extractor.mean_ = archive['mean']
+            extractor._m2 = archive['m2']
+            if 'ipca_components_' in archive:
+                extractor._ipca = IncrementalPCA(n_components=extractor.n_components)
+                for name in _IPCA_STATE:
+                    value = archive[f'ipca_{name}']
+                    setattr(extractor._ipca, name, value if value.ndim else value.item())
+                extractor._ipca.n_components_ = extractor.n_components
+                extractor._ipca.n_features_in_ = len(extractor.mean_)
+        return extractor
+
+
+def extract_features(data, n_components=2, model_path=None):
+    """ Apply PCA to reduce dimensions of the dataset.
+
+    With model_path, a FeatureExtractor saved there is reused instead of
+    refitting; if none exists yet, one is fitted on data and saved.
+    """
+    if model_path is not None:
+        if os.path.exists(model_path):
+            extractor = FeatureExtractor.load(model_path)
+            if extractor.n_components == n_components:
+                return extractor.transform(data)
+            logging.info("Refitting feature model %s for %d components", model_path, n_components)
+        extractor = FeatureExtractor(n_components=n_components).fit(data)
+        extractor.save(model_path)
+        return extractor.transform(data)
     scaler = StandardScaler()
     scaled_data = scaler.fit_transform(data)
     pca = PCA(n_components=n_components)
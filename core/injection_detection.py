@@ -0,0 +1,232 @@
+"""
+Signal injection detection engine
+Undecimated (a trous) wavelet detail bands computed with causal filters,
+so they can be produced block by block with carried filter state, and
+thresholded against robust median-absolute-deviation noise estimates.
+Every anomalous interval is reported with sample positions, independent of
+how the signal is split into blocks.
+"""
+
+import numpy as np
+import pywt
+from scipy import signal
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# MAD of a standard normal; scales MAD to a standard deviation estimate
+_MAD_SCALE = 0.6745
+
+# Samples pushed at a time when detecting over a whole in-memory signal
+DEFAULT_CHUNK_SIZE = 65_536
+
+
+@dataclass
+class InjectionInterval:
+    """Run of anomalous wavelet detail coefficients, in sample indices"""
+    start: int         # First anomalous sample
+    end: int           # One past the last anomalous sample
+    level: int         # Detail level with the strongest response
+    magnitude: float   # Largest absolute detail coefficient at that level
+    score: float       # Largest coefficient relative to its level's noise estimate
+
+
+def detail_filters(wavelet: str = 'db4', level: int = 3) -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    Equivalent FIR filters of the undecimated detail bands 1..level
+
+    Level j applies the low-pass filter upsampled by 1, 2, ..., 2^(j-2) and
+    then the high-pass filter upsampled by 2^(j-1). Also returns each
+    filter's delay (centroid of its squared taps), which maps coefficient
+    indices back to sample positions.
+    """
+    w = pywt.Wavelet(wavelet)
+    lo, hi = np.asarray(w.dec_lo), np.asarray(w.dec_hi)
+    filters, delays = [], []
+    approx = np.array([1.0])
+    for j in range(level):
+        step = 2 ** j
+        hi_up = np.zeros((len(hi) - 1) * step + 1)
+        hi_up[::step] = hi
+        lo_up = np.zeros((len(lo) - 1) * step + 1)
+        lo_up[::step] = lo
+        band = np.convolve(approx, hi_up)
+        filters.append(band)
+        delays.append(np.sum(np.arange(len(band)) * band ** 2) / np.sum(band ** 2))
+        approx = np.convolve(approx, lo_up)
+    return filters, np.round(delays).astype(int)
+
+
+def robust_sigma(coefficients: np.ndarray) -> float:
+    """Noise standard deviation estimated from the median absolute coefficient"""
+    return float(np.median(np.abs(coefficients)) / _MAD_SCALE)
+
+
+def quietest_sigma(coefficients: np.ndarray, parts: int = 8) -> float:
+    """
+    Noise estimate that tolerates an anomaly covering most of the input
+
+    The lower quartile of the MAD estimates of `parts` equal slices, so up
+    to three quarters of the slices may be contaminated.
+    """
+    slices = np.array_split(coefficients, min(parts, max(len(coefficients), 1)))
+    return float(np.percentile([robust_sigma(part) for part in slices], 25))
+
+
+class InjectionStream:
+    """
+    Incremental injection detector
+
+    Detail coefficients are thresholded in calibration segments aligned to
+    absolute sample indices, against `threshold` times a noise estimate
+    carried from earlier segments: the median of the MAD estimates of the
+    last `history` segments, each computed from that segment's unflagged
+    coefficients. A segment whose coefficients are mostly flagged does not
+    update the estimate, so a sustained injection cannot raise its own
+    threshold. The first segment has no history and is thresholded against
+    quietest_sigma of itself. Anomalies closer than the longest filter
+    length are merged into one interval; intervals that may still grow are
+    held until the next segment. State is bounded by one segment of
+    coefficients per level plus filter memory.
+
+    Parameters:
+    -----------
+    wavelet : str
+        Wavelet family
+    level : int
+        Number of detail bands
+    threshold : float
+        Anomaly threshold in robust standard deviations
+    calibration : int
+        Segment length for the noise estimate, in samples
+    history : int
+        Segments whose noise estimates are combined
+    """
+
+    def __init__(self, wavelet: str = 'db4', level: int = 3,
+                 threshold: float = 5.0, calibration: int = 4096, history: int = 8):
+        self.filters, self.delays = detail_filters(wavelet, level)
+        self.threshold = threshold
+        self.calibration = calibration
+        self.history = history
+        self.merge_gap = max(len(f) for f in self.filters)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget filter memory, noise estimates and held intervals"""
+        self.zi: Optional[List[np.ndarray]] = None
+        self.pending = [np.empty(0) for _ in self.filters]
+        self.pending_start = 0            # Coefficient index of pending[...][0]
+        self.sigma: Optional[np.ndarray] = None
+        self.noise_history: deque = deque(maxlen=self.history)  # Per-segment clean estimates
+        self.held: List[InjectionInterval] = []  # Intervals later anomalies may still extend
+
+    def push(self, block: np.ndarray) -> List[InjectionInterval]:
+        """Filter the next block and return intervals that can no longer grow"""
+        block = np.asarray(block, dtype=float)
+        if len(block) == 0:
+            return []
+        if self.zi is None:
+            # Start as if the first sample had always been present, avoiding a start-up transient
+            self.zi = [signal.lfilter_zi(f, 1.0) * block[0] for f in self.filters]
+        for j, f in enumerate(self.filters):
+            details, self.zi[j] = signal.lfilter(f, 1.0, block, zi=self.zi[j])
+            self.pending[j] = np.concatenate((self.pending[j], details))
+
+        closed = []
+        while len(self.pending[0]) >= self.calibration:
+            segment = [p[:self.calibration] for p in self.pending]
+            self.pending = [p[self.calibration:] for p in self.pending]
+            closed.extend(self._evaluate(segment))
+        return closed
+
+    def flush(self) -> List[InjectionInterval]:
+        """Evaluate the trailing partial segment and close all held intervals"""
+        closed = []
+        if len(self.pending[0]):
+            closed.extend(self._evaluate(self.pending))
+            self.pending = [np.empty(0) for _ in self.filters]
+        closed.extend(self.held)
+        self.held = []
+        return closed
+
+    def _update_noise(self, segment: List[np.ndarray], flagged: List[np.ndarray]) -> None:
+        """Add the segment's estimate from unflagged coefficients, unless most are flagged"""
+        if len(segment[0]) < self.calibration or any(2 * np.count_nonzero(f) > len(f) for f in flagged):
+            return
+        self.noise_history.append([robust_sigma(details[~f]) for details, f in zip(segment, flagged)])
+        self.sigma = np.median(np.array(self.noise_history), axis=0)
+
+    def _evaluate(self, segment: List[np.ndarray]) -> List[InjectionInterval]:
+        first = self.pending_start
+        self.pending_start += len(segment[0])
+        if self.sigma is None:
+            self.sigma = np.array([quietest_sigma(details) for details in segment])
+
+        positions, levels, magnitudes, scores, flagged = [], [], [], [], []
+        for j, details in enumerate(segment):
+            magnitude = np.abs(details)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                score = magnitude / self.sigma[j]
+            flagged.append(score > self.threshold)
+            hits = np.flatnonzero(flagged[-1])
+            positions.append(np.maximum(first + hits - self.delays[j], 0))
+            levels.append(np.full(len(hits), j + 1))
+            magnitudes.append(magnitude[hits])
+            scores.append(score[hits])
+        positions = np.concatenate(positions)
+        self._update_noise(segment, flagged)
+
+        intervals = list(self.held)
+        if len(positions):
+            order = np.argsort(positions, kind='stable')
+            positions = positions[order]
+            levels = np.concatenate(levels)[order]
+            magnitudes = np.concatenate(magnitudes)[order]
+            scores = np.concatenate(scores)[order]
+            # Split wherever consecutive anomalies are further apart than the merge gap
+            breaks = np.flatnonzero(np.diff(positions) > self.merge_gap) + 1
+            for run in np.split(np.arange(len(positions)), breaks):
+                strongest = run[np.argmax(scores[run])]
+                intervals.append(InjectionInterval(start=int(positions[run[0]]),
+                                                   end=int(positions[run[-1]]) + 1,
+                                                   level=int(levels[strongest]),
+                                                   magnitude=float(magnitudes[strongest]),
+                                                   score=float(scores[strongest])))
+        intervals = self._merge_nearby(intervals)
+
+        # Later coefficients map to positions of at least this, so earlier intervals are final
+        settled = self.pending_start - int(max(self.delays))
+        closed = [i for i in intervals if i.end - 1 + self.merge_gap < settled]
+        self.held = [i for i in intervals if i.end - 1 + self.merge_gap >= settled]
+        return closed
+
+    def _merge_nearby(self, intervals: List[InjectionInterval]) -> List[InjectionInterval]:
+        merged: List[InjectionInterval] = []
+        for interval in sorted(intervals, key=lambda i: i.start):
+            if merged and interval.start - (merged[-1].end - 1) <= self.merge_gap:
+                last = merged[-1]
+                strongest = last if last.score >= interval.score else interval
+                merged[-1] = InjectionInterval(start=last.start, end=max(last.end, interval.end),
+                                               level=strongest.level,
+                                               magnitude=strongest.magnitude,
+                                               score=strongest.score)
+            else:
+                merged.append(interval)
+        return merged
+
+
+def detect_injections(data: np.ndarray, wavelet: str = 'db4', level: int = 3,
+                      threshold: float = 5.0, calibration: int = 4096,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[InjectionInterval]:
+    """
+    Injection intervals of a whole signal or memmap
+
+    The signal is pushed through an InjectionStream in chunks, so memory
+    stays bounded and the result is the one any streaming split would give.
+    """
+    stream = InjectionStream(wavelet, level, threshold, calibration)
+    intervals = []
+    for start in range(0, len(data), chunk_size):
+        intervals.extend(stream.push(np.asarray(data[start:start + chunk_size], dtype=float)))
+    return intervals + stream.flush()
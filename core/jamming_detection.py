@@ -0,0 +1,235 @@
+"""
+Jamming detection engine
+Sliding-window power from running sums of squared samples, compared against
+an online baseline (exponentially weighted mean or rolling median), with
+jamming reported as start/end episodes. The same tracker serves whole
+captures and continuous streams.
+"""
+
+import bisect
+import numpy as np
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional
+
+BASELINES = ('ewma', 'median')
+
+
+@dataclass
+class JammingEpisode:
+    """Contiguous run of jammed windows, in sample indices"""
+    start: int             # First jammed sample (see JammingTracker for the narrowing)
+    end: int               # One past the last jammed sample
+    mean_power: float
+    peak_power: float
+    baseline_power: float  # Baseline when the episode began
+
+
+def sliding_power(data: np.ndarray, window_size: int, hop: int = 1,
+                  cumulative_energy: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Mean power of windows starting at 0, hop, 2 * hop, ...
+
+    Each window is the difference of two running sums, so any window and
+    hop cost O(1) per step. Works along the last axis, e.g. of a batch;
+    `cumulative_energy` may supply the running sum of squares with a
+    leading zero (see AnalysisContext.cumulative_energy).
+    """
+    csum = cumulative_energy
+    if csum is None:
+        data = np.asarray(data, dtype=float)
+        csum = np.zeros(data.shape[:-1] + (data.shape[-1] + 1,))
+        np.cumsum(np.square(data), axis=-1, out=csum[..., 1:])
+    n_samples = csum.shape[-1] - 1
+    starts = np.arange(0, max(n_samples - window_size + 1, 0), hop)
+    power = (csum[..., starts + window_size] - csum[..., starts]) / window_size
+    # Running sums can dip marginally below zero through cancellation
+    return np.maximum(power, 0.0)
+
+
+class JammingTracker:
+    """
+    Online baseline and episode state over consecutive window powers
+
+    The windows covering the first `warmup` window lengths seed the baseline
+    with their median and are then checked against it, so jamming that is
+    already present early on is still reported. After that a window is
+    jammed when its power exceeds `power_ratio` times the baseline; only
+    clean windows update the baseline, so a long jamming episode does not
+    absorb itself into it.
+
+    Episode bounds are narrowed to the hop in which power rose and fell:
+    the onset lies in the last hop of the first jammed window, the end in
+    the first hop of the last one. A burst jamming too few windows for that
+    (shorter than about a window) is bounded by the span all its jammed
+    windows share instead, so an episode always covers at least one hop.
+
+    Parameters:
+    -----------
+    window_size : int
+        Window length in samples
+    hop : int, optional
+        Window step in samples (default: a quarter window)
+    baseline : str
+        'ewma' (exponentially weighted mean with weight `alpha`) or
+        'median' (median of the last `median_length` clean windows)
+    power_ratio : float
+        Power over baseline that marks a window as jammed
+    warmup : int
+        Window lengths of data used to seed the baseline
+    """
+
+    def __init__(self, window_size: int, hop: Optional[int] = None,
+                 baseline: str = 'ewma', alpha: float = 0.05,
+                 median_length: int = 32, power_ratio: float = 3.0,
+                 warmup: int = 5):
+        if baseline not in BASELINES:
+            raise ValueError(f"Unknown jamming baseline: {baseline}")
+        self.window_size = window_size
+        self.hop = hop or max(1, window_size // 4)
+        if self.hop > window_size:
+            raise ValueError("Jamming hop must not exceed the window size")
+        self.baseline_method = baseline
+        self.alpha = alpha
+        self.median_length = median_length
+        self.power_ratio = power_ratio
+        self.warmup_windows = -(-warmup * window_size // self.hop)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the baseline and any open episode"""
+        self.windows_seen = 0
+        self.baseline = np.nan
+        self._warm: List[float] = []
+        self._recent: deque = deque()
+        self._recent_sorted: List[float] = []
+        self._episode: Optional[List[float]] = None  # first start, last start, sum, count, peak, baseline
+
+    @property
+    def seeded(self) -> bool:
+        return not np.isnan(self.baseline)
+
+    def update(self, powers: np.ndarray) -> List[JammingEpisode]:
+        """Consume the next window powers and return the episodes they closed"""
+        closed = []
+        for power in np.asarray(powers, dtype=float).tolist():
+            self.windows_seen += 1
+            if self.seeded:
+                closed.extend(self._step((self.windows_seen - 1) * self.hop, power))
+                continue
+            self._warm.append(power)
+            if len(self._warm) == self.warmup_windows:
+                closed.extend(self._seed())
+        return closed
+
+    def flush(self) -> List[JammingEpisode]:
+        """Close an episode still open at the end of the data"""
+        # Data shorter than the warm-up is judged against its own median
+        closed = self._seed() if not self.seeded and self._warm else []
+        if self._episode is not None:
+            closed.append(self._close())
+        return closed
+
+    def _seed(self) -> List[JammingEpisode]:
+        self.baseline = float(np.median(self._warm))
+        closed = []
+        clean = []
+        for index, power in enumerate(self._warm):
+            closed.extend(self._step(index * self.hop, power, learn=False))
+            if self._episode is None:
+                clean.append(power)
+        if self.baseline_method == 'median':
+            for power in clean[-self.median_length:]:
+                self._push_recent(power)
+        self._warm = []
+        return closed
+
+    def _step(self, start: int, power: float, learn: bool = True) -> List[JammingEpisode]:
+        if power > self.power_ratio * self.baseline:
+            if self._episode is None:
+                self._episode = [start, start, 0.0, 0, power, self.baseline]
+            episode = self._episode
+            episode[1] = start
+            episode[2] += power
+            episode[3] += 1
+            episode[4] = max(episode[4], power)
+            return []
+
+        closed = [self._close()] if self._episode is not None else []
+        if learn:
+            self._update_baseline(power)
+        return closed
+
+    def _close(self) -> JammingEpisode:
+        first_start, last_start, total, count, peak, baseline = self._episode
+        self._episode = None
+        start, end = int(first_start) + self.window_size - self.hop, int(last_start) + self.hop
+        if end <= start:
+            start, end = int(last_start), int(first_start) + self.window_size
+        return JammingEpisode(start=start, end=end,
+                              mean_power=total / count, peak_power=peak,
+                              baseline_power=baseline)
+
+    def _update_baseline(self, power: float) -> None:
+        if self.baseline_method == 'ewma':
+            self.baseline += self.alpha * (power - self.baseline)
+            return
+        self._push_recent(power)
+        n = len(self._recent_sorted)
+        middle = self._recent_sorted[n // 2]
+        self.baseline = middle if n % 2 else 0.5 * (middle + self._recent_sorted[n // 2 - 1])
+
+    def _push_recent(self, power: float) -> None:
+        if len(self._recent) == self.median_length:
+            oldest = self._recent.popleft()
+            del self._recent_sorted[bisect.bisect_left(self._recent_sorted, oldest)]
+        self._recent.append(power)
+        bisect.insort(self._recent_sorted, power)
+
+
+class JammingStream:
+    """
+    Sliding-window power over arriving blocks feeding a JammingTracker
+
+    Samples not yet covered by a complete window are carried to the next
+    block, so windows straddle block boundaries exactly as in one pass.
+    """
+
+    def __init__(self, tracker: JammingTracker):
+        self.tracker = tracker
+        self.pending = np.empty(0)   # Samples from the next window start onwards
+
+    def push(self, block: np.ndarray) -> List[JammingEpisode]:
+        buffer = np.concatenate((self.pending, block))
+        powers = sliding_power(buffer, self.tracker.window_size, self.tracker.hop)
+        self.pending = buffer[len(powers) * self.tracker.hop:]
+        return self.tracker.update(powers)
+
+    def flush(self) -> List[JammingEpisode]:
+        return self.tracker.flush()
+
+
+def detect_jamming(data: np.ndarray, window_size: int, hop: Optional[int] = None,
+                   cumulative_energy: Optional[np.ndarray] = None,
+                   **tracker_kwargs) -> List[JammingEpisode]:
+    """
+    Jamming episodes of a whole signal
+
+    Parameters:
+    -----------
+    data : np.ndarray
+        Input signal
+    window_size, hop : int
+        Power window and step in samples (default hop: a quarter window)
+    cumulative_energy : np.ndarray, optional
+        Precomputed running energy of `data` (length n + 1)
+    **tracker_kwargs
+        Baseline settings passed to JammingTracker
+
+    Returns:
+    --------
+    episodes : List[JammingEpisode]
+    """
+    tracker = JammingTracker(window_size, hop, **tracker_kwargs)
+    powers = sliding_power(data, window_size, tracker.hop, cumulative_energy)
+    return tracker.update(powers) + tracker.flush()
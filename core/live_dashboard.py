@@ -2,6 +2,7 @@ import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
 from utils.data_streaming import DataStreamSimulator, RealTimeAnalyzer
+from core.metrics import METRICS
 import time
 
 def create_live_plot() -> tuple:
@@ -20,6 +21,24 @@ def create_live_plot() -> tuple:
     
     return fig, st.empty()
 
+def render_analysis_metrics(container) -> None:
+    """Show per-detector and per-stage analysis timings collected in METRICS"""
+    snapshot = METRICS.snapshot()
+    rows = [
+        {"Kind": kind, "Name": name, "Calls": stats["calls"],
+         "Mean (ms)": 1000.0 * stats["seconds"] / stats["calls"],
+         "Max (ms)": 1000.0 * stats["max_seconds"],
+         "Samples": stats["samples"], "Indicators": stats["indicators"],
+         "Peak alloc (MiB)": stats["peak_bytes"] / 2**20}
+        for kind, entries in snapshot.items() for name, stats in entries.items()
+    ]
+    with container:
+        st.subheader("Analysis Profiling")
+        if rows:
+            st.dataframe(rows, use_container_width=True)
+        else:
+            st.caption("No analysis calls recorded yet")
+
 def main():
     st.set_page_config(page_title="Live FES Analysis", layout="wide")
     st.title("Real-time FES Analysis Dashboard")
@@ -44,6 +63,9 @@ def main():
                                   value=1000,
                                   step=100)
     
+    profiling = st.sidebar.checkbox("Profile Analysis", value=METRICS.enabled)
+    METRICS.enabled = profiling
+    
     # Initialize components
     if 'stream_active' not in st.session_state:
         st.session_state.stream_active = False
@@ -61,6 +83,10 @@ def main():
     
     with metrics_col:
         metrics_container = st.container()
+        profiling_container = st.container()
+    
+    if profiling:
+        render_analysis_metrics(profiling_container)
         
     # Initialize streaming components
     simulator = DataStreamSimulator(
@@ -0,0 +1,236 @@
+"""
+Analysis metrics
+Optional instrumentation of the analysis hot paths: per-detector wall time,
+input size, allocation peaks and indicator counts for every analyze_threats
+call and streamed block (which also covers chunked capture analysis), plus
+timings of compute_psd, DFA and signal validation. Collection is
+off by default, in which case instrumented code only checks one flag.
+Results are exported as Prometheus text or JSON, and serve_metrics exposes
+them for scraping.
+"""
+
+import os
+import json
+import logging
+import threading
+import functools
+import tracemalloc
+import time as _time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Kinds of measurement: detectors run by analyze_threats and other stages
+DETECTOR = 'detector'
+STAGE = 'stage'
+
+
+@dataclass
+class TimingStats:
+    """Accumulated measurements of one detector or stage"""
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    samples: int = 0
+    indicators: int = 0
+    peak_bytes: int = 0  # Largest allocation peak of a single call (track_allocations only)
+
+
+class Measurement:
+    """Handle yielded by MetricsRegistry.measure; set `indicators` to record a count"""
+    __slots__ = ('indicators',)
+
+    def __init__(self):
+        self.indicators = 0
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of TimingStats keyed by (kind, name)
+
+    Allocation peaks come from tracemalloc, which is process-wide: with
+    several threads measuring at once they include the other threads'
+    allocations.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.track_allocations = False
+        self._stats: Dict[Tuple[str, str], TimingStats] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def record(self, kind: str, name: str, seconds: float, samples: int = 0,
+               indicators: int = 0, peak_bytes: int = 0) -> None:
+        with self._lock:
+            stats = self._stats.setdefault((kind, name), TimingStats())
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.samples += samples
+            stats.indicators += indicators
+            stats.peak_bytes = max(stats.peak_bytes, peak_bytes)
+
+    @contextmanager
+    def measure(self, kind: str, name: str, samples: int = 0) -> Iterator[Measurement]:
+        """Time the enclosed block, also when it raises; nothing is recorded while disabled"""
+        measurement = Measurement()
+        if not self.enabled:
+            yield measurement
+            return
+        frame = self._enter_allocations() if self.track_allocations else None
+        started = _time.perf_counter()
+        try:
+            yield measurement
+        finally:
+            seconds = _time.perf_counter() - started
+            peak_bytes = self._exit_allocations(frame) if frame is not None else 0
+            self.record(kind, name, seconds, samples, measurement.indicators, peak_bytes)
+
+    def _enter_allocations(self) -> Optional[List[int]]:
+        if not tracemalloc.is_tracing():
+            return None
+        stack = self._local.__dict__.setdefault('stack', [])
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            # Keep the enclosing measurement's peak before resetting it for ours
+            stack[-1][1] = max(stack[-1][1], peak)
+        tracemalloc.reset_peak()
+        frame = [current, current]
+        stack.append(frame)
+        return frame
+
+    def _exit_allocations(self, frame: List[int]) -> int:
+        stack = self._local.stack
+        peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+        stack.remove(frame)
+        if stack:
+            stack[-1][1] = max(stack[-1][1], peak)
+        return peak - frame[0]
+
+    def timed(self, kind: str, name: str) -> Callable:
+        """Decorator measuring every call; the first argument's length counts as samples"""
+        def decorate(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                samples = len(args[0]) if args and hasattr(args[0], '__len__') else 0
+                with self.measure(kind, name, samples):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Copy of all statistics as {kind: {name: {field: value}}}"""
+        with self._lock:
+            result: Dict[str, Dict[str, Dict[str, float]]] = {}
+            for (kind, name), stats in sorted(self._stats.items()):
+                result.setdefault(kind, {})[name] = asdict(stats)
+            return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), sort_keys=True)
+
+    def to_prometheus(self) -> str:
+        """Statistics in the Prometheus text exposition format"""
+        families = [
+            ('fes_analysis_calls_total', 'counter', 'calls', 'Number of measured calls'),
+            ('fes_analysis_seconds_total', 'counter', 'seconds', 'Wall time spent in seconds'),
+            ('fes_analysis_max_seconds', 'gauge', 'max_seconds', 'Slowest single call in seconds'),
+            ('fes_analysis_samples_total', 'counter', 'samples', 'Input samples processed'),
+            ('fes_analysis_indicators_total', 'counter', 'indicators', 'Threat indicators reported'),
+            ('fes_analysis_peak_bytes', 'gauge', 'peak_bytes', 'Largest allocation peak of a call'),
+        ]
+        snapshot = self.snapshot()
+        lines = []
+        for metric, metric_type, field, help_text in families:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for kind, entries in snapshot.items():
+                for name, stats in entries.items():
+                    label = name.replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'{metric}{{kind="{kind}",name="{label}"}} {stats[field]!r}')
+        return "\n".join(lines) + "\n"
+
+
+# Registry used by the instrumented analysis code
+METRICS = MetricsRegistry()
+
+
+@contextmanager
+def collecting(registry: Optional[MetricsRegistry] = None, track_allocations: bool = False,
+               reset: bool = True) -> Iterator[MetricsRegistry]:
+    """
+    Enable metrics collection for the enclosed block
+
+    Example:
+        with collecting() as metrics:
+            analyzer.analyze_threats(data, time)
+        print(metrics.to_prometheus())
+
+    With track_allocations, tracemalloc is started for the block (if it is
+    not running already); this slows allocation-heavy code noticeably.
+    """
+    registry = registry or METRICS
+    previous = registry.enabled, registry.track_allocations
+    started_tracing = track_allocations and not tracemalloc.is_tracing()
+    if reset:
+        registry.reset()
+    if started_tracing:
+        tracemalloc.start()
+    registry.enabled, registry.track_allocations = True, track_allocations
+    try:
+        yield registry
+    finally:
+        registry.enabled, registry.track_allocations = previous
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def serve_metrics(port: int = 9108, host: Optional[str] = None,
+                  registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    """
+    Serve /metrics (Prometheus) and /metrics.json from a daemon thread
+
+    Enables collection on the registry. Call shutdown() on the returned
+    server to stop it.
+
+    Parameters:
+    -----------
+    host : str, optional
+        Bind address; defaults to $FES_METRICS_HOST, else 127.0.0.1. Set it
+        to 0.0.0.0 where Prometheus scrapes from another pod
+    """
+    registry = registry or METRICS
+    host = host or os.environ.get('FES_METRICS_HOST', '127.0.0.1')
+    registry.enabled = True
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/metrics':
+                body, content_type = registry.to_prometheus(), 'text/plain; version=0.0.4'
+            elif self.path == '/metrics.json':
+                body, content_type = registry.to_json(), 'application/json'
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logging.debug("Metrics request: " + format, *args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info("Serving analysis metrics on %s:%d", host, server.server_address[1])
+    return server
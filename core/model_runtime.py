@@ -0,0 +1,410 @@
+"""
+Offline model runtime
+Keeps deserialized models in memory between inferences instead of loading
+them from disk per call. Models are cached by file and modification time in
+an LRU bounded by their parameter memory, TorchScript models are frozen and
+optimized for inference on load, and a micro-batching queue coalesces
+concurrent small requests into one forward pass.
+
+prepare_variants writes int8 (dynamically quantized) and ONNX versions of a
+model next to it, checks them against the fp32 output and records the
+fastest accepted one in a manifest that ModelRuntime.run follows.
+"""
+
+import os
+import time
+import logging
+import threading
+import itertools
+import json
+import statistics
+from collections import OrderedDict
+from concurrent.futures import Future
+from queue import Empty, Queue
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import torch
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "models")
+
+# File suffix of TorchScript exports written by ModelRuntime.export_torchscript
+TORCHSCRIPT_SUFFIX = ".ts"
+# Files written by prepare_variants next to `<stem>.pt`
+VARIANT_SUFFIXES = {'int8': ".int8.ts", 'onnx': ".onnx"}
+MANIFEST_SUFFIX = ".variants.json"
+
+
+def model_bytes(model: torch.nn.Module) -> int:
+    """Memory held by a model's parameters and buffers"""
+    return sum(t.numel() * t.element_size()
+               for t in itertools.chain(model.parameters(), model.buffers()))
+
+
+class OnnxModel:
+    """ONNX Runtime session with the tensor-in, tensor-out interface of a torch model"""
+
+    def __init__(self, path: str, num_threads: Optional[int] = None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, input_tensor: torch.Tensor) -> torch.Tensor:
+        outputs = self.session.run(None, {self.input_name: input_tensor.detach().cpu().numpy()})
+        return torch.from_numpy(outputs[0])
+
+    def eval(self) -> "OnnxModel":
+        return self
+
+
+def _stem(name: str) -> str:
+    return os.path.splitext(name)[0]
+
+
+class ModelRuntime:
+    """
+    LRU cache of loaded models with inference helpers
+
+    Parameters:
+    -----------
+    model_dir : str
+        Directory model names are resolved against
+    max_bytes : int
+        Memory cap for cached models; least recently used ones are evicted
+        first, but the model just requested is always kept
+    num_threads : int, optional
+        Intra-op threads for inference (torch.set_num_threads, process-wide)
+    optimize : bool
+        Freeze and optimize TorchScript models for inference on load
+    prefer_variants : bool
+        Let run() use the fastest variant recorded by prepare_variants
+    """
+
+    def __init__(self, model_dir: str = MODEL_DIR, max_bytes: int = 512 * 2**20,
+                 num_threads: Optional[int] = None, optimize: bool = True,
+                 prefer_variants: bool = True):
+        self.model_dir = model_dir
+        self.max_bytes = max_bytes
+        self.optimize = optimize
+        self.prefer_variants = prefer_variants
+        self.num_threads = num_threads
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        # (path, mtime) -> (model, bytes), most recently used last
+        self._cache: "OrderedDict[Tuple[str, float], Tuple[torch.nn.Module, int]]" = OrderedDict()
+        self._manifests: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.model_dir, name)
+
+    @property
+    def cached_bytes(self) -> int:
+        with self._lock:
+            return sum(size for _, size in self._cache.values())
+
+    def get(self, name: str) -> torch.nn.Module:
+        """
+        Loaded model for `name`, from the cache unless the file changed
+
+        Raises FileNotFoundError if the model does not exist.
+        """
+        path = os.path.abspath(self.path(name))
+        key = (path, os.path.getmtime(path))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key][0]
+
+        model, size = self._load(path)
+        with self._lock:
+            # Older versions of the same file can no longer be requested
+            for stale in [k for k in self._cache if k[0] == path and k != key]:
+                del self._cache[stale]
+            self._cache[key] = (model, size)
+            total = sum(entry[1] for entry in self._cache.values())
+            while total > self.max_bytes and len(self._cache) > 1:
+                evicted, (_, evicted_size) = self._cache.popitem(last=False)
+                total -= evicted_size
+                logging.info("Evicted model %s from the runtime cache", evicted[0])
+        return model
+
+    def _load(self, path: str) -> Tuple[torch.nn.Module, int]:
+        started = time.perf_counter()
+        if path.endswith(VARIANT_SUFFIXES['onnx']):
+            logging.info("Loaded model %s in %.3fs", path, time.perf_counter() - started)
+            return OnnxModel(path, self.num_threads), os.path.getsize(path)
+        try:
+            model = torch.jit.load(path, map_location='cpu')
+            scripted = True
+        except RuntimeError:
+            # Pickled eager module; the model directory is a trusted local store
+            model = torch.load(path, map_location=torch.device('cpu'), weights_only=False)
+            scripted = False
+        model.eval()
+        size = model_bytes(model) or os.path.getsize(path)
+        if scripted and self.optimize:
+            model = torch.jit.optimize_for_inference(model)
+        logging.info("Loaded model %s in %.3fs", path, time.perf_counter() - started)
+        return model, size
+
+    def evict(self, name: Optional[str] = None) -> None:
+        """Drop one model (all versions) or, without a name, the whole cache"""
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+                return
+            path = os.path.abspath(self.path(name))
+            for key in [k for k in self._cache if k[0] == path]:
+                del self._cache[key]
+
+    def resolve(self, name: str) -> str:
+        """
+        Fastest prepared variant of `name`, or `name` itself
+
+        Variants are taken from the manifest written by prepare_variants,
+        unless the model file changed after it was written.
+        """
+        manifest_path = self.path(_stem(name) + MANIFEST_SUFFIX)
+        try:
+            manifest_mtime = os.path.getmtime(manifest_path)
+        except OSError:
+            return name
+        with self._lock:
+            cached = self._manifests.get(manifest_path)
+        if cached is None or cached[0] != manifest_mtime:
+            try:
+                with open(manifest_path) as f:
+                    fastest = json.load(f).get('fastest')
+            except (OSError, ValueError) as e:
+                logging.error("Unreadable model manifest %s: %s", manifest_path, str(e))
+                fastest = None
+            cached = (manifest_mtime, fastest)
+            with self._lock:
+                self._manifests[manifest_path] = cached
+        fastest = cached[1]
+        if not fastest or not os.path.exists(self.path(fastest)) \
+                or os.path.getmtime(self.path(name)) > manifest_mtime:
+            return name
+        return fastest
+
+    def run(self, name: str, input_tensor: torch.Tensor) -> torch.Tensor:
+        """Forward pass of a cached model (or its fastest variant) without autograd bookkeeping"""
+        model = self.get(self.resolve(name) if self.prefer_variants else name)
+        with torch.inference_mode():
+            return model(input_tensor)
+
+    def export_torchscript(self, name: str, example_input: Optional[torch.Tensor] = None,
+                           out_name: Optional[str] = None) -> str:
+        """
+        Save a TorchScript version of model `name` next to it
+
+        The model is scripted, or traced when `example_input` is given (for
+        models scripting cannot handle). Returns the path of the export,
+        `<stem>.ts` by default, which get() then loads and optimizes.
+        """
+        model = self.get(name)
+        if isinstance(model, torch.jit.ScriptModule):
+            scripted = model
+        elif example_input is not None:
+            with torch.inference_mode():
+                scripted = torch.jit.trace(model, example_input)
+        else:
+            scripted = torch.jit.script(model)
+        out_name = out_name or os.path.splitext(name)[0] + TORCHSCRIPT_SUFFIX
+        out_path = self.path(out_name)
+        torch.jit.save(scripted, out_path)
+        return out_path
+
+
+def _latency(model, example_input: torch.Tensor, repeats: int) -> float:
+    """Median seconds per forward pass after one warm-up call"""
+    timings = []
+    with torch.inference_mode():
+        model(example_input)
+        for _ in range(repeats):
+            started = time.perf_counter()
+            model(example_input)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def prepare_variants(runtime: ModelRuntime, name: str, example_input: torch.Tensor,
+                     variants: Sequence[str] = ('int8', 'onnx'), tolerance: float = 0.05,
+                     repeats: int = 50) -> Dict:
+    """
+    Write CPU inference variants of model `name` and record the fastest
+
+    'int8' dynamically quantizes Linear and recurrent layers and saves the
+    result as TorchScript; 'onnx' exports the fp32 model for ONNX Runtime.
+    Each variant's output on `example_input` must stay within `tolerance`
+    of the fp32 output, relative to its largest magnitude; variants that do
+    not are deleted. Latencies are measured on `example_input` and the
+    manifest `<stem>.variants.json` names the fastest accepted file.
+
+    Returns:
+    --------
+    manifest : Dict
+        {'source', 'fastest', 'variants': {variant: {'file', 'latency_ms',
+        'relative_error', 'accepted', 'error'}}}
+    """
+    model = runtime.get(name)
+    with torch.inference_mode():
+        reference = model(example_input)
+    scale = max(float(reference.abs().max()), torch.finfo(reference.dtype).tiny)
+    stem = _stem(name)
+    report = {'fp32': {'file': name, 'latency_ms': 1e3 * _latency(model, example_input, repeats),
+                       'relative_error': 0.0, 'accepted': True}}
+
+    for variant in variants:
+        if variant not in VARIANT_SUFFIXES:
+            raise ValueError(f"Unknown model variant: {variant}")
+        file = stem + VARIANT_SUFFIXES[variant]
+        path = runtime.path(file)
+        entry = {'file': file, 'accepted': False}
+        report[variant] = entry
+        try:
+            if variant == 'int8':
+                if isinstance(model, torch.jit.ScriptModule):
+                    raise ValueError("dynamic quantization needs the eager model, not TorchScript")
+                quantized = torch.ao.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear, torch.nn.LSTM, torch.nn.GRU}, dtype=torch.qint8)
+                with torch.inference_mode():
+                    torch.jit.save(torch.jit.trace(quantized, example_input), path)
+            else:
+                torch.onnx.export(model, (example_input,), path, input_names=['input'],
+                                  output_names=['output'],
+                                  dynamic_axes={'input': {0: 'batch'}, 'output': {0: 'batch'}})
+
+            runtime.evict(file)
+            candidate = runtime.get(file)
+            with torch.inference_mode():
+                output = candidate(example_input)
+            entry['relative_error'] = float((output - reference).abs().max()) / scale
+            if entry['relative_error'] > tolerance:
+                raise ValueError(f"relative error {entry['relative_error']:.4f} exceeds {tolerance}")
+            entry['latency_ms'] = 1e3 * _latency(candidate, example_input, repeats)
+            entry['accepted'] = True
+        except Exception as e:
+            logging.error("Model variant %s of %s rejected: %s", variant, name, str(e))
+            entry['error'] = str(e)
+            runtime.evict(file)
+            if os.path.exists(path):
+                os.remove(path)
+
+    accepted = {variant: entry for variant, entry in report.items() if entry['accepted']}
+    fastest = min(accepted, key=lambda variant: accepted[variant]['latency_ms'])
+    manifest = {'source': name, 'fastest': report[fastest]['file'], 'variants': report}
+    with open(runtime.path(stem + MANIFEST_SUFFIX), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+class _Request:
+    __slots__ = ('tensor', 'future')
+
+    def __init__(self, tensor: torch.Tensor):
+        self.tensor = tensor
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent inference requests into batched forward passes
+
+    Each request is a tensor with a leading batch dimension. A worker
+    thread takes the first waiting request, collects more for up to
+    `max_wait` seconds or until `max_batch_size` rows, concatenates them
+    into one forward pass and splits the output back per request. Requests
+    whose other dimensions differ are run in separate passes.
+    """
+
+    def __init__(self, runtime: ModelRuntime, model_name: str, max_batch_size: int = 64,
+                 max_wait: float = 0.002):
+        self.runtime = runtime
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue: "Queue[Optional[_Request]]" = Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._serve, daemon=True,
+                                        name=f"micro-batcher-{model_name}")
+        self._worker.start()
+
+    def submit(self, input_tensor: torch.Tensor) -> Future:
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        if getattr(input_tensor, 'ndim', 0) == 0:
+            raise ValueError("MicroBatcher requests need a leading batch dimension")
+        request = _Request(input_tensor)
+        self._queue.put(request)
+        return request.future
+
+    def infer(self, input_tensor: torch.Tensor, timeout: Optional[float] = None) -> torch.Tensor:
+        return self.submit(input_tensor).result(timeout)
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        batch, rows = [first], len(first.tensor)
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except Empty:
+                break
+            if request is None:
+                self._queue.put(None)  # Let the serve loop see the shutdown
+                break
+            batch.append(request)
+            rows += len(request.tensor)
+        return batch
+
+    def _serve(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            try:
+                batch = self._collect(first)
+                groups = {}
+                for request in batch:
+                    groups.setdefault((tuple(request.tensor.shape[1:]), request.tensor.dtype),
+                                      []).append(request)
+                for requests in groups.values():
+                    self._run(requests)
+            except Exception as e:
+                # Fail the affected requests; the worker keeps serving the others
+                logging.error("Batching failed: %s", str(e))
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+    def _run(self, requests: List[_Request]) -> None:
+        try:
+            inputs = torch.cat([r.tensor for r in requests]) if len(requests) > 1 else requests[0].tensor
+            outputs = self.runtime.run(self.model_name, inputs)
+            for request, output in zip(requests, torch.split(outputs, [len(r.tensor) for r in requests])):
+                request.future.set_result(output)
+        except Exception as e:
+            logging.error("Batched inference failed: %s", str(e))
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+
+    def close(self) -> None:
+        """Finish queued requests and stop the worker"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
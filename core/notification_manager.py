@@ -1,19 +1,256 @@
+"""
+Email notifications
+NotificationService keeps one SMTP connection open across sends and
+reconnects it when the server drops it. Notifications are queued and sent
+by a background thread, so callers in the detection path never wait on
+SMTP. Notifications arriving within a digest window are grouped into one
+email per recipient, and a token bucket caps how many emails go out per
+minute; while it is empty, new notifications join the next digest.
+"""
 
-import yagmail
 import os
+import ssl
+import time
+import logging
+import smtplib
+import threading
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Tuple
+
+
+class SMTPConnection:
+    """
+    Reusable, reconnecting SMTP session
+
+    The session is opened on first use and kept until it has been idle for
+    `max_idle` seconds. A send that fails because the server closed the
+    session is retried once on a new one.
+
+    Parameters:
+    -----------
+    use_ssl : bool
+        Implicit TLS (port 465); otherwise STARTTLS when `starttls` is set
+    """
+
+    def __init__(self, host: str = "smtp.gmail.com", port: int = 465, user: Optional[str] = None,
+                 password: Optional[str] = None, use_ssl: bool = True, starttls: bool = False,
+                 timeout: float = 30.0, max_idle: float = 300.0):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.connects = 0  # Sessions opened so far
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout,
+                                    context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                smtp.starttls(context=ssl.create_default_context())
+        if self.user and self.password:
+            smtp.login(self.user, self.password)
+        self.connects += 1
+        return smtp
+
+    def send(self, message: EmailMessage) -> None:
+        with self._lock:
+            if self._smtp is not None and time.monotonic() - self._last_used > self.max_idle:
+                self._close()
+            for attempt in range(2):
+                if self._smtp is None:
+                    self._smtp = self._connect()
+                try:
+                    self._smtp.send_message(message)
+                    break
+                except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                    self._close()
+                    if attempt:
+                        raise
+                    logging.info("SMTP session lost (%s); reconnecting", str(e))
+            self._last_used = time.monotonic()
+
+    def _close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+class NotificationService:
+    """
+    Queued, digested and rate-limited email notifications
+
+    Parameters:
+    -----------
+    connection : SMTPConnection
+        Session used for every email
+    sender : str
+        From address
+    default_to : str, optional
+        Recipient when notify() gets none (default: sender)
+    digest_window : float
+        Seconds the worker waits after a notification for more to group
+        with it; 0 sends whatever is queued right away
+    max_per_minute : float
+        Email rate limit (token bucket, bursts up to the same number)
+    max_queue : int
+        Queued notifications beyond which notify() drops and returns False
+    """
+
+    def __init__(self, connection: SMTPConnection, sender: str, default_to: Optional[str] = None,
+                 digest_window: float = 60.0, max_per_minute: float = 10.0, max_queue: int = 10_000):
+        self.connection = connection
+        self.sender = sender
+        self.default_to = default_to or sender
+        self.digest_window = digest_window
+        self.max_per_minute = max_per_minute
+        self.max_queue = max_queue
+        self._queue: List[Tuple[str, str, str]] = []  # (to, subject, body)
+        self._tokens = float(max_per_minute)
+        self._refilled = time.monotonic()
+        self._sending = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._stats = {'queued': 0, 'dropped': 0, 'emails': 0, 'notifications': 0, 'failed': 0}
+        self._worker = threading.Thread(target=self._serve, daemon=True, name="notification-service")
+        self._worker.start()
+
+    def notify(self, subject: str, body: str, to: Optional[str] = None) -> bool:
+        """Queue a notification; False if the queue is full"""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("NotificationService is closed")
+            if len(self._queue) >= self.max_queue:
+                self._stats['dropped'] += 1
+                logging.error("Notification queue full; dropped: %s", subject)
+                return False
+            self._queue.append((to or self.default_to, subject, body))
+            self._stats['queued'] += 1
+            self._condition.notify_all()
+            return True
+
+    def _wait_for_token(self) -> None:
+        """Block (holding the condition) until an email may be sent; close() skips the wait"""
+        while True:
+            now = time.monotonic()
+            self._tokens = min(float(self.max_per_minute),
+                               self._tokens + (now - self._refilled) * self.max_per_minute / 60.0)
+            self._refilled = now
+            if self._closed:
+                return
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return
+            self._condition.wait((1.0 - self._tokens) * 60.0 / self.max_per_minute)
+
+    def _take_digest(self) -> List[Tuple[str, str, str]]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._queue or self._closed)
+            if not self._queue:
+                return []
+            if self.digest_window > 0:
+                self._condition.wait_for(lambda: self._closed, self.digest_window)
+            self._wait_for_token()
+            batch, self._queue = self._queue, []
+            # One email per recipient; extra ones are paid for by later digests
+            self._tokens -= len({to for to, _, _ in batch}) - 1
+            self._sending = True
+            return batch
+
+    def _serve(self) -> None:
+        while True:
+            batch = self._take_digest()
+            if not batch:
+                return
+            by_recipient: Dict[str, List[Tuple[str, str]]] = {}
+            for to, subject, body in batch:
+                by_recipient.setdefault(to, []).append((subject, body))
+            emails = notifications = failed = 0
+            for to, items in by_recipient.items():
+                try:
+                    self.connection.send(self._compose(to, items))
+                    emails += 1
+                    notifications += len(items)
+                except Exception as e:
+                    logging.error("Failed to send email: %s", str(e))
+                    failed += len(items)
+            with self._condition:
+                self._stats['emails'] += emails
+                self._stats['notifications'] += notifications
+                self._stats['failed'] += failed
+                self._sending = False
+                self._condition.notify_all()
+
+    def _compose(self, to: str, items: List[Tuple[str, str]]) -> EmailMessage:
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = to
+        if len(items) == 1:
+            message['Subject'], body = items[0]
+        else:
+            message['Subject'] = f"{len(items)} notifications: {items[0][0]}"
+            body = "\n\n".join(f"== {subject} ==\n{body}" for subject, body in items)
+        message.set_content(body)
+        return message
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued notification has been handed to SMTP"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._sending, timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return dict(self._stats, pending=len(self._queue))
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Send what is queued right away, stop the worker and close the session"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout)
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
 
 class NotificationManager:
-    def __init__(self):
+    def __init__(self, service: Optional[NotificationService] = None):
         self.email = os.environ.get('EMAIL_USER')
         self.password = os.environ.get('EMAIL_PASS')
-        self.yag = yagmail.SMTP(self.email, self.password)
+        # The session is opened by the first send, not here
+        self.service = service or NotificationService(
+            SMTPConnection(os.environ.get('SMTP_HOST', "smtp.gmail.com"),
+                           int(os.environ.get('SMTP_PORT', "465")), self.email, self.password),
+            sender=self.email)
 
     def send_email_notification(self, subject, body, to=None):
         if to is None:
             to = self.email
         try:
-            self.yag.send(to=to, subject=subject, contents=body)
-            return True
+            return self.service.notify(subject, body, to)
         except Exception as e:
             print(f"Failed to send email: {e}")
             return False
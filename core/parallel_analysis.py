@@ -0,0 +1,249 @@
+"""
+Parallel cyber threat analysis
+Runs the CyberWarfareAnalyzer detectors concurrently on a thread pool, or on
+a process pool reading the capture from shared memory
+"""
+
+import numpy as np
+import logging
+import time as _time
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, wait
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from core.cyber_analysis import CyberWarfareAnalyzer, CyberThreatIndicator
+from core.analysis_context import AnalysisContext
+
+
+# Analyzer of a process-pool worker, set once by _init_worker
+_WORKER_ANALYZER: Optional[CyberWarfareAnalyzer] = None
+
+
+def _init_worker(analyzer: CyberWarfareAnalyzer) -> None:
+    """Process-pool initializer: keep the analyzer so tasks do not pickle it again"""
+    global _WORKER_ANALYZER
+    _WORKER_ANALYZER = analyzer
+
+
+def _detect_in_buffer(analyzer: CyberWarfareAnalyzer, attack_type: str,
+                      buf: memoryview, n_samples: int) -> List[CyberThreatIndicator]:
+    """Run one detector on a (2, n_samples) float64 buffer holding signal and time"""
+    capture = np.ndarray((2, n_samples), dtype=np.float64, buffer=buf)
+    data, time = capture[0], capture[1]
+    context = AnalysisContext(data, analyzer.sampling_rate)
+    return analyzer.attack_patterns[attack_type](data, time, context=context)
+
+
+def _run_detector_shared(attack_type: str, shm_name: str,
+                         n_samples: int) -> List[CyberThreatIndicator]:
+    """
+    Process-pool entry point: attach to the shared capture and run one detector
+
+    Views on the shared block only live inside _detect_in_buffer, so the
+    segment can be closed as soon as the detector returns
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        return _detect_in_buffer(_WORKER_ANALYZER, attack_type, shm.buf, n_samples)
+    finally:
+        shm.close()
+
+
+def _analyze_chunked_in_buffer(buf: memoryview, n_samples: int,
+                               start_time: float) -> List[CyberThreatIndicator]:
+    """Chunked analysis of n_samples float64 samples in a buffer"""
+    data = np.ndarray((n_samples,), dtype=np.float64, buffer=buf)
+    return _WORKER_ANALYZER._analyze_chunked(data, start_time)
+
+
+def _analyze_chunked_shared(shm_name: str, n_samples: int,
+                            start_time: float) -> List[CyberThreatIndicator]:
+    """Process-pool entry point for signals longer than max_chunk_length"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        return _analyze_chunked_in_buffer(shm.buf, n_samples, start_time)
+    finally:
+        shm.close()
+
+
+class ParallelCyberAnalyzer:
+    """
+    Executor-backed variant of CyberWarfareAnalyzer.analyze_threats
+
+    Detectors for one capture run concurrently, and analyze_many fans out
+    detectors of many captures over the same pool. A detector that does not
+    finish within `detector_timeout` seconds is skipped and logged; the
+    report is built from the others. Results are merged in detector order
+    before the stable confidence sort, so output is deterministic.
+
+    Signals longer than security_validator.max_chunk_length are analyzed
+    like analyze_threats does, chunk by chunk in one task; the detector
+    timeout does not apply to them.
+
+    A running detector cannot be cancelled: after a timeout it is abandoned
+    and keeps its worker busy until it returns, so later analyses have
+    fewer workers. `abandoned` counts those still running, and a warning is
+    logged when a timeout leaves any behind. Process workers receive the analyzer once, when
+    the pool starts; changes made to it afterwards are not seen by them.
+    """
+
+    def __init__(self, analyzer: Optional[CyberWarfareAnalyzer] = None,
+                 sampling_rate: float = 1000.0,
+                 executor: str = 'thread',
+                 max_workers: Optional[int] = None,
+                 detector_timeout: Optional[float] = None):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor: {executor}")
+        self.analyzer = analyzer or CyberWarfareAnalyzer(sampling_rate=sampling_rate)
+        self.executor_type = executor
+        self.detector_timeout = detector_timeout
+        self._abandoned: Set[Future] = set()
+        if executor == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                                 initargs=(self.analyzer,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def abandoned(self) -> int:
+        """Timed-out detectors still occupying a worker"""
+        self._abandoned = {future for future in self._abandoned if not future.done()}
+        return len(self._abandoned)
+
+    def close(self) -> None:
+        """Shut down the worker pool without waiting for timed-out detectors"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def analyze_threats(self, signal_data: np.ndarray,
+                        time: np.ndarray) -> List[CyberThreatIndicator]:
+        """
+        Perform cyber threat analysis with the detectors running concurrently
+        """
+        return self.analyze_many([(signal_data, time)])[0]
+
+    def analyze_many(self, captures: Sequence[Tuple[np.ndarray, np.ndarray]]
+                     ) -> List[List[CyberThreatIndicator]]:
+        """
+        Analyze independent captures, returning one threat list per capture in input order
+        """
+        # Per-detector futures, one future for a chunked signal, or None if invalid
+        pending: List[Union[None, Future, Dict[str, Future]]] = []
+        shared: List[shared_memory.SharedMemory] = []
+        try:
+            for signal_data, time in captures:
+                is_valid, error_msg = self.analyzer.security_validator.validate_signal(signal_data, time)
+                if not is_valid:
+                    logging.error("Signal validation failed: %s", error_msg)
+                    pending.append(None)
+                    continue
+                if len(signal_data) > self.analyzer.security_validator.max_chunk_length:
+                    pending.append(self._submit_chunked(signal_data, float(time[0]), shared))
+                else:
+                    pending.append(self._submit(signal_data, time, shared))
+
+            timed_out = self._wait(
+                [f for futures in pending if isinstance(futures, dict) for f in futures.values()])
+            wait([futures for futures in pending if isinstance(futures, Future)])
+            self._abandoned |= timed_out
+            if timed_out and self.abandoned:
+                logging.warning("%d timed-out detectors are still occupying pool workers",
+                                self.abandoned)
+            return [self._collect(futures, timed_out) if futures is not None else []
+                    for futures in pending]
+        finally:
+            for shm in shared:
+                shm.close()
+                shm.unlink()
+
+    def _submit(self, signal_data: np.ndarray, time: np.ndarray,
+                shared: List[shared_memory.SharedMemory]) -> Dict[str, Future]:
+        # Cheapest detectors are submitted first; over-budget ones are skipped
+        scheduled = self.analyzer.schedule_detectors(len(signal_data))
+        if self.executor_type == 'thread':
+            context = AnalysisContext(signal_data, self.analyzer.sampling_rate)
+            return {attack_type: self._executor.submit(self.analyzer.attack_patterns[attack_type],
+                                                       signal_data, time, context=context)
+                    for attack_type in scheduled}
+
+        n_samples = len(signal_data)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, 2 * n_samples * 8))
+        shared.append(shm)
+        buffer = np.ndarray((2, n_samples), dtype=np.float64, buffer=shm.buf)
+        buffer[0] = signal_data
+        buffer[1] = time
+        del buffer
+        return {attack_type: self._executor.submit(_run_detector_shared, attack_type,
+                                                   shm.name, n_samples)
+                for attack_type in scheduled}
+
+    def _submit_chunked(self, signal_data: np.ndarray, start_time: float,
+                        shared: List[shared_memory.SharedMemory]) -> Future:
+        if self.executor_type == 'thread':
+            return self._executor.submit(self.analyzer._analyze_chunked, signal_data, start_time)
+
+        n_samples = len(signal_data)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, n_samples * 8))
+        shared.append(shm)
+        buffer = np.ndarray((n_samples,), dtype=np.float64, buffer=shm.buf)
+        buffer[:] = signal_data
+        del buffer
+        return self._executor.submit(_analyze_chunked_shared, shm.name, n_samples, start_time)
+
+    def _wait(self, futures: List[Future]) -> Set[Future]:
+        """
+        Wait for all futures, abandoning any that run longer than the timeout
+
+        Each detector's clock starts when a worker picks it up, so captures
+        queued behind others are not penalized. Returns the abandoned futures.
+        """
+        if self.detector_timeout is None:
+            wait(futures)
+            return set()
+
+        tick = min(0.05, self.detector_timeout / 10)
+        started: Dict[Future, float] = {}
+        timed_out: Set[Future] = set()
+        outstanding = set(futures)
+        while outstanding:
+            done, _ = wait(outstanding, timeout=tick, return_when=FIRST_COMPLETED)
+            outstanding -= done
+            now = _time.monotonic()
+            for future in list(outstanding):
+                if future not in started:
+                    if future.running():
+                        started[future] = now
+                elif now - started[future] > self.detector_timeout:
+                    future.cancel()
+                    timed_out.add(future)
+                    outstanding.discard(future)
+        return timed_out
+
+    def _collect(self, futures: Union[Future, Dict[str, Future]],
+                 timed_out: Set[Future]) -> List[CyberThreatIndicator]:
+        if isinstance(futures, Future):
+            try:
+                return futures.result()
+            except Exception as e:
+                logging.error("Error in chunked analysis: %s", str(e))
+                return []
+        threats = []
+        for attack_type in self.analyzer.attack_patterns:
+            future = futures.get(attack_type)
+            if future is None:
+                continue
+            if future in timed_out:
+                logging.error("%s detection timed out after %.3fs", attack_type, self.detector_timeout)
+                continue
+            try:
+                threats.extend(future.result())
+            except Exception as e:
+                logging.error("Error in %s detection: %s", attack_type, str(e))
+
+        return sorted(threats, key=lambda x: x.confidence, reverse=True)
@@ -0,0 +1,165 @@
+"""
+Spectral peak tracking
+Vectorized top-k peak selection over whole spectrograms, sub-bin frequency
+interpolation and a multi-carrier tracker that follows individual carriers
+across frames
+"""
+
+import itertools
+import numpy as np
+from typing import List, Tuple
+
+# Floor applied before taking logs of spectrogram power
+_POWER_FLOOR = 1e-300
+
+
+def top_k_bins(Sxx: np.ndarray, k: int = 3) -> np.ndarray:
+    """
+    Indices of the k strongest frequency bins of every frame, in no particular order
+
+    Sxx has shape (..., n_freqs, n_frames); the result has shape (..., k, n_frames).
+    Uses a partial partition instead of a full sort of each column.
+    """
+    n_freqs = Sxx.shape[-2]
+    k = min(k, n_freqs)
+    return np.argpartition(Sxx, n_freqs - k, axis=-2)[..., n_freqs - k:, :]
+
+
+def interpolate_bins(f: np.ndarray, Sxx: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Sub-bin frequencies of spectrogram bins by parabolic interpolation of log power
+
+    Each bin is refined using its two neighbours; bins on the spectrum edges
+    keep their bin frequency. indices follows Sxx's layout (..., k, n_frames).
+    """
+    n_freqs = Sxx.shape[-2]
+    if n_freqs < 3:
+        return f[indices]
+    log_power = np.log(np.maximum(Sxx, _POWER_FLOOR))
+    centre = np.clip(indices, 1, n_freqs - 2)
+    below = np.take_along_axis(log_power, centre - 1, axis=-2)
+    peak = np.take_along_axis(log_power, centre, axis=-2)
+    above = np.take_along_axis(log_power, centre + 1, axis=-2)
+
+    curvature = below - 2 * peak + above
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta = np.where(curvature < 0, 0.5 * (below - above) / curvature, 0.0)
+    delta = np.where(centre == indices, np.clip(delta, -0.5, 0.5), 0.0)
+    return f[indices] + delta * (f[1] - f[0])
+
+
+def peak_frequencies(f: np.ndarray, Sxx: np.ndarray, k: int = 3,
+                     interpolate: bool = False) -> np.ndarray:
+    """
+    Mean frequency of the k strongest bins of every frame
+
+    Parameters:
+    -----------
+    f : np.ndarray
+        Bin frequencies (n_freqs,)
+    Sxx : np.ndarray
+        Spectrogram power (..., n_freqs, n_frames), e.g. a batch of spectrograms
+    k : int
+        Number of bins averaged per frame
+    interpolate : bool
+        Refine each bin to a sub-bin frequency before averaging
+
+    Returns:
+    --------
+    peak_freqs : np.ndarray
+        Shape (..., n_frames)
+    """
+    indices = top_k_bins(Sxx, k)
+    if interpolate:
+        return interpolate_bins(f, Sxx, indices).mean(axis=-2)
+    return f[indices].mean(axis=-2)
+
+
+def spectral_peaks(f: np.ndarray, Sxx: np.ndarray, n_peaks: int,
+                   interpolate: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The n_peaks strongest local maxima of every frame, strongest first
+
+    Frames with fewer local maxima are padded with nan frequency and zero power.
+
+    Returns:
+    --------
+    frequencies, powers : np.ndarray
+        Shape (n_peaks, n_frames)
+    """
+    n_freqs = Sxx.shape[0]
+    padded = np.pad(Sxx, ((1, 1), (0, 0)), constant_values=-np.inf)
+    is_peak = (Sxx >= padded[:-2]) & (Sxx > padded[2:])
+    candidates = np.where(is_peak, Sxx, -np.inf)
+
+    n_peaks_found = min(n_peaks, n_freqs)
+    indices = top_k_bins(candidates, n_peaks_found)
+    strongest_first = np.argsort(-np.take_along_axis(candidates, indices, axis=0), axis=0)
+    indices = np.take_along_axis(indices, strongest_first, axis=0)
+    found = np.isfinite(np.take_along_axis(candidates, indices, axis=0))
+    frequencies = interpolate_bins(f, Sxx, indices) if interpolate else f[indices]
+    powers = np.take_along_axis(Sxx, indices, axis=0)
+
+    shape = (n_peaks, Sxx.shape[1])
+    out_freqs = np.full(shape, np.nan)
+    out_powers = np.zeros(shape)
+    out_freqs[:n_peaks_found] = np.where(found, frequencies, np.nan)
+    out_powers[:n_peaks_found] = np.where(found, powers, 0.0)
+    return out_freqs, out_powers
+
+
+def track_carriers(f: np.ndarray, Sxx: np.ndarray, n_carriers: int = 3,
+                   interpolate: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Follow individual carriers across spectrogram frames
+
+    Each frame's strongest peaks are assigned to the carrier tracks so that
+    the total frequency movement from the previous frame is smallest; a
+    carrier that hops therefore keeps its track while the others stay put.
+    Tracks with no peak in a frame hold nan for that frame and resume at
+    their last known frequency. Assignments are scored over all
+    permutations, which suits the handful of carriers a receiver follows.
+
+    Returns:
+    --------
+    frequencies, powers : np.ndarray
+        Per-carrier sequences, shape (n_carriers, n_frames)
+    """
+    peak_freqs, peak_powers = spectral_peaks(f, Sxx, n_carriers, interpolate)
+    n_frames = Sxx.shape[1]
+    frequencies = np.full((n_carriers, n_frames), np.nan)
+    powers = np.zeros((n_carriers, n_frames))
+    if n_frames == 0:
+        return frequencies, powers
+
+    # Every assignment of peaks to tracks, scored per frame in one step
+    permutations = np.array(list(itertools.permutations(range(n_carriers))))
+    last = np.sort(peak_freqs[:, 0])
+    order = np.argsort(peak_freqs[:, 0])
+    frequencies[:, 0] = peak_freqs[order, 0]
+    powers[:, 0] = peak_powers[order, 0]
+    for frame in range(1, n_frames):
+        current = peak_freqs[:, frame]
+        candidates = current[permutations]
+        # Missing peaks or tracks without history cost nothing to (re)assign
+        cost = np.where(np.isnan(candidates) | np.isnan(last), 0.0, np.abs(candidates - last))
+        best = permutations[np.argmin(cost.sum(axis=1))]
+        frequencies[:, frame] = current[best]
+        powers[:, frame] = peak_powers[best, frame]
+        last = np.where(np.isnan(frequencies[:, frame]), last, frequencies[:, frame])
+    return frequencies, powers
+
+
+def carrier_hops(frequencies: np.ndarray, threshold: float) -> List[np.ndarray]:
+    """
+    Frame indices at which each tracked carrier hops by more than threshold
+
+    A hop at index i is the change between frames i and i + 1, matching the
+    frame stamps used by frequency hopping detection
+    """
+    hops = []
+    for track in frequencies:
+        present = np.flatnonzero(~np.isnan(track))
+        jumps = np.abs(np.diff(track[present]))
+        hops.append(present[:-1][jumps > threshold])
+    return hops
@@ -1,20 +1,41 @@
-
 # plugin_loader.py - Secure Plugin Loader for FES
 import os
+import importlib.machinery
 import importlib.util
+from typing import List, Optional
+
+from core.detector_registry import DEFAULT_REGISTRY, DetectorRegistry
 
 PLUGIN_DIR = os.path.join(os.path.dirname(__file__), "..", "plugins")
 
-def load_plugins():
+def load_plugins(registry: Optional[DetectorRegistry] = None,
+                 plugin_dir: str = PLUGIN_DIR) -> List[str]:
+    """
+    Execute every .fesmod plugin in plugin_dir
+
+    A plugin that defines register(registry) is called with the detector
+    registry (DEFAULT_REGISTRY unless given) so it can add detectors.
+    Returns the names of the plugins that loaded.
+    """
+    registry = registry if registry is not None else DEFAULT_REGISTRY
+    loaded = []
     print("[+] Scanning for plugins...")
-    for file in os.listdir(PLUGIN_DIR):
+    if not os.path.isdir(plugin_dir):
+        return loaded
+    for file in sorted(os.listdir(plugin_dir)):
         if file.endswith(".fesmod"):
-            plugin_path = os.path.join(PLUGIN_DIR, file)
-            spec = importlib.util.spec_from_file_location(file[:-7], plugin_path)
+            plugin_path = os.path.join(plugin_dir, file)
+            # The .fesmod suffix is not a Python source suffix, so name the loader explicitly
+            loader = importlib.machinery.SourceFileLoader(file[:-7], plugin_path)
+            spec = importlib.util.spec_from_file_location(file[:-7], plugin_path, loader=loader)
             if spec:
                 module = importlib.util.module_from_spec(spec)
                 try:
                     spec.loader.exec_module(module)
+                    if callable(getattr(module, "register", None)):
+                        module.register(registry)
+                    loaded.append(file[:-7])
                     print(f"[+] Loaded plugin: {file}")
                 except Exception as e:
                     print(f"[-] Failed to load plugin {file}: {e}")
+    return loaded
@@ -0,0 +1,193 @@
+"""
+Replay detection engine
+Computes the normalized cross-correlation of each pattern against every
+candidate lag at once: one real FFT per pattern and its search region,
+batched over patterns, with running-sum energy normalization
+"""
+
+import numpy as np
+from scipy import fft as sp_fft
+from scipy import ndimage
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Upper bound on the number of FFT samples held in memory per batch
+_MAX_BATCH_SAMPLES = 1 << 22
+
+
+@dataclass
+class ReplayMatch:
+    start: int            # First sample of the original segment
+    end: int              # One past the last sample of the original segment
+    lag: int              # Distance in samples between original and replay
+    correlation: float    # Peak absolute normalized correlation in the segment
+
+
+def sliding_energy(data: np.ndarray, window_size: int,
+                   cumulative_energy: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Energy of every length-`window_size` window, computed from a running sum
+
+    `cumulative_energy` may supply a precomputed running sum of squares with
+    a leading zero (see AnalysisContext.cumulative_energy).
+    Returns an array of length len(data) - window_size + 1
+    """
+    csum = cumulative_energy
+    if csum is None:
+        csum = np.empty(len(data) + 1)
+        csum[0] = 0.0
+        np.cumsum(np.square(data, dtype=float), out=csum[1:])
+    energy = csum[window_size:] - csum[:-window_size]
+    # Running sums can dip marginally below zero through cancellation
+    return np.maximum(energy, 0.0)
+
+
+def find_replay_hits(data: np.ndarray, window_size: int, hop: int = 1,
+                     min_lag: Optional[int] = None, max_lag: Optional[int] = None,
+                     threshold: float = 0.95,
+                     cumulative_energy: Optional[np.ndarray] = None,
+                     first_start: int = 0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find every (pattern start, lag) pair whose normalized correlation exceeds threshold
+
+    Parameters:
+    -----------
+    data : np.ndarray
+        Input signal
+    window_size : int
+        Length of the pattern compared against later parts of the signal
+    hop : int
+        Distance in samples between consecutive pattern starts. Every lag is
+        searched, but a copied segment is only certain to contain a whole
+        pattern when it is at least window_size + hop - 1 samples long
+    min_lag, max_lag : Optional[int]
+        Inclusive range of lags searched; defaults to [window_size, 4 * window_size]
+    threshold : float
+        Minimum absolute normalized correlation for a hit
+    cumulative_energy : Optional[np.ndarray]
+        Precomputed running sum of squares with a leading zero
+    first_start : int
+        Skip patterns starting before this index (rounded up to the hop grid)
+
+    Returns:
+    --------
+    starts, lags, correlations : np.ndarray
+        Pattern start index, lag and absolute correlation of each hit
+    """
+    data = np.asarray(data, dtype=float)
+    n = len(data)
+    min_lag = window_size if min_lag is None else int(min_lag)
+    max_lag = 4 * window_size if max_lag is None else int(max_lag)
+    hop = max(1, int(hop))
+
+    empty = (np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0))
+    if window_size < 1 or min_lag < 1 or max_lag < min_lag or n < min_lag + window_size:
+        return empty
+
+    n_lags = max_lag - min_lag + 1
+    region_len = n_lags - 1 + window_size
+    nfft = sp_fft.next_fast_len(region_len, real=True)
+
+    # Zero padding lets patterns near the end search a truncated lag range;
+    # padded positions have zero energy and can never produce a hit
+    pad = max_lag + window_size
+    padded = np.concatenate((data, np.zeros(pad)))
+    if cumulative_energy is not None:
+        cumulative_energy = np.concatenate((cumulative_energy, np.full(pad, cumulative_energy[-1])))
+    energy = sliding_energy(padded, window_size, cumulative_energy)
+    patterns = np.lib.stride_tricks.sliding_window_view(padded, window_size)
+    regions = np.lib.stride_tricks.sliding_window_view(padded, region_len)
+
+    first_start = -(-max(0, int(first_start)) // hop) * hop
+    starts = np.arange(first_start, n - min_lag - window_size + 1, hop)
+    batch = max(1, _MAX_BATCH_SAMPLES // nfft)
+    lag_offsets = np.arange(n_lags)
+
+    hit_starts, hit_lags, hit_corr = [], [], []
+    for b in range(0, len(starts), batch):
+        s = starts[b:b + batch]
+        spec_p = sp_fft.rfft(patterns[s], n=nfft, axis=-1)
+        spec_r = sp_fft.rfft(regions[s + min_lag], n=nfft, axis=-1)
+        corr = sp_fft.irfft(spec_r * np.conj(spec_p), n=nfft, axis=-1)[:, :n_lags]
+
+        denom = np.sqrt(energy[s][:, None] * energy[s[:, None] + min_lag + lag_offsets])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ncc = np.where(denom > 0, np.abs(corr) / denom, 0.0)
+
+        rows, cols = np.nonzero(ncc >= threshold)
+        if len(rows):
+            hit_starts.append(s[rows])
+            hit_lags.append(cols + min_lag)
+            hit_corr.append(np.minimum(ncc[rows, cols], 1.0))
+
+    if not hit_starts:
+        return empty
+    return np.concatenate(hit_starts), np.concatenate(hit_lags), np.concatenate(hit_corr)
+
+
+def label_replay_hits(starts: np.ndarray, lags: np.ndarray,
+                      hop: int = 1) -> Tuple[np.ndarray, int]:
+    """
+    Assign each hit to a cluster of neighbouring hits
+
+    Hits are neighbours when their pattern starts are one hop apart and their
+    lags differ by at most one sample. Returns the cluster id of every hit
+    and the number of clusters.
+    """
+    if len(starts) == 0:
+        return np.empty(0, dtype=int), 0
+
+    hop = max(1, int(hop))
+    rows = (starts - starts.min()) // hop
+    cols = lags - lags.min()
+    mask = np.zeros((rows.max() + 1, cols.max() + 1), dtype=bool)
+    mask[rows, cols] = True
+    labels, n_segments = ndimage.label(mask, structure=np.ones((3, 3), dtype=int))
+    return labels[rows, cols] - 1, n_segments
+
+
+def merge_replay_hits(starts: np.ndarray, lags: np.ndarray, correlations: np.ndarray,
+                      window_size: int, hop: int = 1) -> List[ReplayMatch]:
+    """
+    Merge neighbouring hits into one match per replayed segment
+
+    Each connected cluster in the (start, lag) plane (see label_replay_hits)
+    becomes a single ReplayMatch
+    """
+    segment, n_segments = label_replay_hits(starts, lags, hop)
+    if n_segments == 0:
+        return []
+
+    seg_start = np.full(n_segments, np.iinfo(np.int64).max)
+    seg_last = np.full(n_segments, -1)
+    np.minimum.at(seg_start, segment, starts)
+    np.maximum.at(seg_last, segment, starts)
+
+    # Peak hit of each segment: sort by (segment, correlation) and take the last
+    order = np.lexsort((correlations, segment))
+    last = np.r_[segment[order][1:] != segment[order][:-1], True]
+    peak = order[last]
+
+    matches = [ReplayMatch(start=int(seg_start[k]),
+                           end=int(seg_last[k]) + window_size,
+                           lag=int(lags[peak[k]]),
+                           correlation=float(correlations[peak[k]]))
+               for k in range(n_segments)]
+    return sorted(matches, key=lambda m: (m.start, m.lag))
+
+
+def detect_replays(data: np.ndarray, window_size: int, hop: int = 1,
+                   min_lag: Optional[int] = None, max_lag: Optional[int] = None,
+                   threshold: float = 0.95,
+                   cumulative_energy: Optional[np.ndarray] = None) -> List[ReplayMatch]:
+    """
+    Detect replayed segments in a signal
+
+    Combines find_replay_hits and merge_replay_hits; see find_replay_hits
+    for the meaning of the parameters
+    """
+    starts, lags, correlations = find_replay_hits(data, window_size, hop=hop,
+                                                  min_lag=min_lag, max_lag=max_lag,
+                                                  threshold=threshold,
+                                                  cumulative_energy=cumulative_energy)
+    return merge_replay_hits(starts, lags, correlations, window_size, hop=hop)
@@ -1,21 +1,261 @@
 
 # secure_alert.py
 # This module sends local GPG-encrypted alerts via Mosquitto (MQTT)
+#
+# Alerts go through an AlertDispatcher: callers only enqueue, and a worker
+# thread encrypts and publishes them in batches over one MQTT connection.
 
+import atexit
+import logging
 import subprocess
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
 
-def send_encrypted_alert(message: str, recipient_key: str = "52BCCD17AD95D0A64ADBB73F2AC31B2120605AA5"):
+DEFAULT_RECIPIENT = "52BCCD17AD95D0A64ADBB73F2AC31B2120605AA5"
+ALERT_TOPIC = "fes/alert"
+
+
+class GpgEncryptor:
+    """
+    Public-key encryption through gpg, streamed over stdin/stdout
+
+    No plaintext touches the disk. The dispatcher encrypts one payload per
+    batch, so a burst of alerts costs one gpg call rather than one each.
+
+    gpg's own key validation applies: the recipient key must be valid in
+    the keyring's trust model, otherwise encryption fails. `trust_all_keys`
+    passes --trust-model always, which encrypts to any key matching the
+    recipient, including unvalidated or spoofed ones. Leave it off unless
+    the keyring holds only keys checked out of band.
+    """
+
+    def __init__(self, recipient_key: str = DEFAULT_RECIPIENT, gpg: str = "gpg",
+                 timeout: float = 30.0, trust_all_keys: bool = False):
+        self.command = [gpg, "--batch", "--yes"]
+        if trust_all_keys:
+            self.command += ["--trust-model", "always"]
+        self.command += ["--encrypt", "--recipient", recipient_key]
+        self.timeout = timeout
+
+    def __call__(self, payload: bytes) -> bytes:
+        result = subprocess.run(self.command, input=payload, capture_output=True,
+                                timeout=self.timeout, check=True)
+        return result.stdout
+
+
+class MqttPublisher:
+    """
+    Persistent MQTT connection (paho-mqtt)
+
+    The client connects once, reconnects in the background with backoff and
+    waits for broker acknowledgement of QoS 1/2 messages.
+    """
+
+    def __init__(self, host: str = "localhost", port: int = 1883, client_id: str = "fes-alerts",
+                 keepalive: int = 60, ack_timeout: float = 10.0):
+        import paho.mqtt.client as mqtt
+
+        try:
+            self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id)
+        except AttributeError:  # paho-mqtt 1.x
+            self.client = mqtt.Client(client_id=client_id)
+        self.ack_timeout = ack_timeout
+        self.client.reconnect_delay_set(min_delay=1, max_delay=30)
+        self.client.connect_async(host, port, keepalive)
+        self.client.loop_start()
+
+    def publish(self, topic: str, payload: bytes, qos: int = 1) -> None:
+        info = self.client.publish(topic, payload, qos=qos)
+        if qos:
+            info.wait_for_publish(self.ack_timeout)
+            if not info.is_published():
+                raise TimeoutError(f"MQTT broker did not acknowledge message {info.mid}")
+
+    def close(self) -> None:
+        self.client.loop_stop()
+        self.client.disconnect()
+
+
+class MosquittoPubPublisher:
+    """Fallback without paho-mqtt: one mosquitto_pub call per batch, payload on stdin"""
+
+    def __init__(self, host: str = "localhost", port: int = 1883):
+        self.host = host
+        self.port = port
+
+    def publish(self, topic: str, payload: bytes, qos: int = 1) -> None:
+        subprocess.run(["mosquitto_pub", "-h", self.host, "-p", str(self.port), "-t", topic,
+                        "-q", str(qos), "-s"], input=payload, check=True, timeout=30)
+
+    def close(self) -> None:
+        pass
+
+
+def default_publisher(host: str = "localhost", port: int = 1883):
+    try:
+        return MqttPublisher(host, port)
+    except ImportError:
+        logging.info("paho-mqtt is not installed; publishing alerts with mosquitto_pub")
+        return MosquittoPubPublisher(host, port)
+
+
+class AlertDispatcher:
+    """
+    Bounded, coalescing alert queue drained by a background worker
+
+    submit() only enqueues. An alert identical to one still waiting is
+    merged into it and sent once with a repeat count. The worker takes up
+    to `batch_size` alerts, waiting at most `max_wait` seconds for a batch
+    to fill, joins them into one newline-separated payload, encrypts it and
+    publishes it with the given QoS.
+
+    With `max_pending` distinct alerts waiting, submit() blocks for up to
+    `timeout` seconds (forever for None) and then drops the alert,
+    returning False. The counts are in stats().
+
+    Parameters:
+    -----------
+    encrypt : Callable[[bytes], bytes], optional
+        Payload encryption (default: GpgEncryptor())
+    publisher : object, optional
+        Anything with publish(topic, payload, qos) and close()
+        (default: default_publisher())
+    """
+
+    def __init__(self, encrypt: Optional[Callable[[bytes], bytes]] = None, publisher=None,
+                 topic: str = ALERT_TOPIC, qos: int = 1, max_pending: int = 1000,
+                 batch_size: int = 50, max_wait: float = 0.05):
+        self.encrypt = encrypt or GpgEncryptor()
+        self.publisher = publisher or default_publisher()
+        self.topic = topic
+        self.qos = qos
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending: "OrderedDict[str, int]" = OrderedDict()  # Alert -> repeat count
+        self._in_flight = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._stats = {'submitted': 0, 'coalesced': 0, 'dropped': 0,
+                       'sent': 0, 'batches': 0, 'failed': 0}
+        self._worker = threading.Thread(target=self._serve, daemon=True, name="alert-dispatcher")
+        self._worker.start()
+
+    def submit(self, message: str, timeout: Optional[float] = 1.0) -> bool:
+        """Queue an alert; False if it was dropped because the queue stayed full"""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("AlertDispatcher is closed")
+            self._stats['submitted'] += 1
+            if message in self._pending:
+                self._pending[message] += 1
+                self._stats['coalesced'] += 1
+                return True
+            if not self._condition.wait_for(lambda: len(self._pending) < self.max_pending
+                                            or self._closed, timeout):
+                self._stats['dropped'] += 1
+                logging.error("Alert queue full; dropped alert: %s", message)
+                return False
+            if self._closed:
+                raise RuntimeError("AlertDispatcher is closed")
+            if message in self._pending:  # Queued by another caller while waiting
+                self._pending[message] += 1
+                self._stats['coalesced'] += 1
+            else:
+                self._pending[message] = 1
+            self._condition.notify_all()
+            return True
+
+    def _take_batch(self) -> List[tuple]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending or self._closed)
+            if not self._pending:
+                return []
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    break
+            batch = []
+            while self._pending and len(batch) < self.batch_size:
+                batch.append(self._pending.popitem(last=False))
+            self._in_flight = len(batch)
+            self._condition.notify_all()  # Room for blocked submitters
+            return batch
+
+    def _serve(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            lines = [message if count == 1 else f"[x{count}] {message}" for message, count in batch]
+            try:
+                self.publisher.publish(self.topic, self.encrypt("\n".join(lines).encode()), self.qos)
+                outcome = {'sent': len(batch), 'batches': 1}
+            except Exception as e:
+                logging.error("Secure alert failed: %s", str(e))
+                outcome = {'failed': len(batch)}
+            with self._condition:
+                for key, value in outcome.items():
+                    self._stats[key] += value
+                self._in_flight = 0
+                self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued alert has been published (or failed)"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return dict(self._stats, pending=len(self._pending))
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Publish what is queued, stop the worker and close the connection"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout)
+        try:
+            self.publisher.close()
+        except Exception as e:
+            logging.error("Closing alert publisher failed: %s", str(e))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+_DISPATCHERS: Dict[str, AlertDispatcher] = {}
+_DISPATCHERS_LOCK = threading.Lock()
+
+
+def get_dispatcher(recipient_key: str = DEFAULT_RECIPIENT) -> AlertDispatcher:
+    """Shared dispatcher per recipient, closed (and drained) at interpreter exit"""
+    with _DISPATCHERS_LOCK:
+        dispatcher = _DISPATCHERS.get(recipient_key)
+        if dispatcher is None:
+            dispatcher = AlertDispatcher(encrypt=GpgEncryptor(recipient_key))
+            _DISPATCHERS[recipient_key] = dispatcher
+            atexit.register(dispatcher.close, 10.0)
+        return dispatcher
+
+
+def send_encrypted_alert(message: str, recipient_key: str = DEFAULT_RECIPIENT):
     """
     Encrypts the message with GPG and publishes it locally to MQTT.
+
+    Returns once the alert is queued; see AlertDispatcher.
     """
     try:
-        # Encrypt message
-        with open("/tmp/fes_alert.txt", "w") as f:
-            f.write(message)
-        subprocess.run(["gpg", "--yes", "--encrypt", "--recipient", recipient_key, "/tmp/fes_alert.txt"])
-        
-        # Publish to local Mosquitto
-        subprocess.run(["mosquitto_pub", "-t", "fes/alert", "-f", "/tmp/fes_alert.txt.gpg"])
-        print("[+] Encrypted alert sent via MQTT.")
+        if get_dispatcher(recipient_key).submit(message):
+            print("[+] Encrypted alert queued for MQTT.")
     except Exception as e:
         print("[-] Secure alert failed:", e)
@@ -4,18 +4,23 @@ Implements secure input validation and sanitization
 """
 
 import numpy as np
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, List
 import logging
 
 class SecurityValidator:
     def __init__(self):
-        self.max_signal_length = 1_000_000  # Maximum allowed signal length
+        self.max_signal_length: Optional[int] = None  # Optional hard cap on signal length
+        self.max_chunk_length = 1_000_000  # Longer signals are analyzed in chunks of this size
         self.max_amplitude = 1000.0  # Maximum allowed signal amplitude
+        self.chunk_size = 65_536  # Samples checked per pass; keeps temporaries cache-sized
         
     def validate_signal(self, signal_data: np.ndarray, time: np.ndarray) -> Tuple[bool, str]:
         """
         Validate signal data for security concerns
         
+        Finiteness, amplitude bounds and time monotonicity are checked together
+        in one chunked pass, so no full-size temporaries are allocated
+        
         Args:
             signal_data: Input signal array
             time: Time array
@@ -24,35 +29,147 @@ class SecurityValidator:
             Tuple of (is_valid, error_message)
         """
         try:
-            # Check for null or empty data
-            if signal_data is None or len(signal_data) == 0:
-                return False, "Signal data cannot be empty"
-                
-            # Check signal length
-            if len(signal_data) > self.max_signal_length:
-                return False, f"Signal length exceeds maximum allowed ({self.max_signal_length})"
-                
-            # Validate signal properties
-            if not np.isfinite(signal_data).all():
-                return False, "Signal contains invalid values (inf/nan)"
-                
-            # Check amplitude bounds
-            if np.abs(signal_data).max() > self.max_amplitude:
-                return False, f"Signal amplitude exceeds maximum allowed ({self.max_amplitude})"
+            is_valid, error_msg = self._check_length(signal_data)
+            if not is_valid:
+                return is_valid, error_msg
                 
             # Validate time array
             if len(time) != len(signal_data):
+                is_valid, error_msg = self._scan(signal_data, None)
+                if not is_valid:
+                    return is_valid, error_msg
                 return False, "Time and signal arrays must have same length"
                 
-            if not np.all(np.diff(time) > 0):
+            return self._scan(signal_data, time)
+            
+        except Exception as e:
+            logging.error(f"Signal validation error: {str(e)}")
+            return False, f"Validation error: {str(e)}"
+            
+    def validate_uniform_signal(self, signal_data: np.ndarray, start: float,
+                                step: float) -> Tuple[bool, str]:
+        """
+        Validate a uniformly sampled signal whose time axis is start + k * step
+        
+        The time axis is validated from start and step alone, without
+        materializing it or its differences
+        
+        Args:
+            signal_data: Input signal array
+            start: Time of the first sample
+            step: Sampling interval
+            
+        Returns:
+            Tuple of (is_valid, error_message)
+        """
+        try:
+            is_valid, error_msg = self._check_length(signal_data)
+            if not is_valid:
+                return is_valid, error_msg
+                
+            if not (np.isfinite(start) and np.isfinite(step) and step > 0):
                 return False, "Time values must be strictly increasing"
                 
-            return True, ""
+            return self._scan(signal_data, None)
             
         except Exception as e:
             logging.error(f"Signal validation error: {str(e)}")
             return False, f"Validation error: {str(e)}"
             
+    def _check_length(self, signal_data: np.ndarray) -> Tuple[bool, str]:
+        # Check for null or empty data
+        if signal_data is None or len(signal_data) == 0:
+            return False, "Signal data cannot be empty"
+            
+        # Check signal length
+        if self.max_signal_length is not None and len(signal_data) > self.max_signal_length:
+            return False, f"Signal length exceeds maximum allowed ({self.max_signal_length})"
+            
+        return True, ""
+        
+    def _scan(self, signal_data: np.ndarray, time: Optional[np.ndarray]) -> Tuple[bool, str]:
+        """
+        Fused chunked pass over signal values and (optionally) time values
+        
+        Errors are reported with the same precedence as separate full passes:
+        invalid values, then amplitude, then time ordering
+        """
+        signal_data = np.asarray(signal_data)
+        n = len(signal_data)
+        amplitude_exceeded = False
+        time_decreasing = False
+        
+        for start in range(0, n, self.chunk_size):
+            chunk = signal_data[start:start + self.chunk_size]
+            # min/max reductions propagate nan and inf without allocating
+            low, high = chunk.min(), chunk.max()
+            if not (np.isfinite(low) and np.isfinite(high)):
+                return False, "Signal contains invalid values (inf/nan)"
+            if max(-low, high) > self.max_amplitude:
+                amplitude_exceeded = True
+                
+            if time is not None and not time_decreasing:
+                # Overlap by one sample so pairs across chunk edges are compared
+                # Sliced before converting, so list and memmap time axes are read per chunk
+                t = np.asarray(time[start:start + self.chunk_size + 1], dtype=float)
+                if not np.all(t[1:] > t[:-1]):
+                    time_decreasing = True
+                    
+        if amplitude_exceeded:
+            return False, f"Signal amplitude exceeds maximum allowed ({self.max_amplitude})"
+        if time_decreasing:
+            return False, "Time values must be strictly increasing"
+        return True, ""
+        
+    def validate_batch(self, signals: np.ndarray, time: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+        """
+        Validate a batch of equal-length captures in one vectorized pass
+        
+        Args:
+            signals: Array of shape (n_captures, n_samples)
+            time: Shared time array (n_samples,) or per-capture (n_captures, n_samples)
+            
+        Returns:
+            Tuple of (boolean validity mask per capture, error message per capture)
+        """
+        try:
+            signals = np.asarray(signals)
+            time = np.asarray(time)
+            if signals.ndim != 2:
+                raise ValueError("Batch must be a 2-D array (n_captures, n_samples)")
+            n_captures, n_samples = signals.shape
+            errors = [""] * n_captures
+            
+            if n_samples == 0:
+                return np.zeros(n_captures, dtype=bool), ["Signal data cannot be empty"] * n_captures
+            if self.max_signal_length is not None and n_samples > self.max_signal_length:
+                message = f"Signal length exceeds maximum allowed ({self.max_signal_length})"
+                return np.zeros(n_captures, dtype=bool), [message] * n_captures
+            if time.shape[-1] != n_samples:
+                return np.zeros(n_captures, dtype=bool), ["Time and signal arrays must have same length"] * n_captures
+                
+            finite = np.isfinite(signals).all(axis=1)
+            # Non-finite rows would poison the amplitude check, so mask them out
+            amplitude = np.abs(np.where(finite[:, None], signals, 0.0)).max(axis=1)
+            in_bounds = amplitude <= self.max_amplitude
+            increasing = np.all(np.diff(time, axis=-1) > 0, axis=-1)
+            increasing = np.broadcast_to(increasing, (n_captures,))
+            
+            for i in range(n_captures):
+                if not finite[i]:
+                    errors[i] = "Signal contains invalid values (inf/nan)"
+                elif not in_bounds[i]:
+                    errors[i] = f"Signal amplitude exceeds maximum allowed ({self.max_amplitude})"
+                elif not increasing[i]:
+                    errors[i] = "Time values must be strictly increasing"
+                    
+            return finite & in_bounds & increasing, errors
+            
+        except Exception as e:
+            logging.error(f"Batch validation error: {str(e)}")
+            n_captures = len(signals) if hasattr(signals, '__len__') else 0
+            return np.zeros(n_captures, dtype=bool), [f"Validation error: {str(e)}"] * n_captures
+            
     def sanitize_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
         Sanitize metadata to prevent injection attacks
@@ -1,52 +1,194 @@
 import numpy as np
 from scipy import signal
 from scipy.fft import fft, fftfreq
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, TYPE_CHECKING
+from core.metrics import METRICS, STAGE
+
+if TYPE_CHECKING:
+    from core.analysis_context import AnalysisContext
+
+def _is_capture(data) -> bool:
+    """True for memory-mapped CaptureFile inputs, which are processed in chunks"""
+    from core.capture_file import CaptureFile
+    return isinstance(data, CaptureFile)
 
 def preprocess_signal(data: np.ndarray, sampling_rate: float) -> np.ndarray:
     """
     Preprocess the input signal by removing DC offset and normalizing
+
+    A CaptureFile is processed chunk by chunk into a new memory-mapped
+    capture (see core.capture_file.preprocess_capture)
     """
-    # Remove DC offset
-    data = data - np.mean(data)
+    if _is_capture(data):
+        from core.capture_file import preprocess_capture
+        return preprocess_capture(data)
+    # Remove DC offset (single output allocation, normalized in place)
+    data = np.subtract(data, np.mean(data), dtype=float)
     # Normalize
-    return data / np.std(data)
+    data /= np.std(data)
+    return data
 
-def compute_psd(data: np.ndarray, sampling_rate: float) -> Tuple[np.ndarray, np.ndarray]:
+@METRICS.timed(STAGE, 'compute_psd')
+def compute_psd(data: np.ndarray, sampling_rate: float,
+                context: Optional["AnalysisContext"] = None) -> Tuple[np.ndarray, np.ndarray]:
     """
     Compute Power Spectral Density using Welch's method
+
+    When an AnalysisContext for the same signal is given, the estimate is
+    taken from its shared spectrogram instead of a separate Welch pass.
+    The context's signal is used: `data` must have its shape and
+    `sampling_rate` its rate (ValueError otherwise), but the samples
+    themselves are not compared. A 2-D array gives one PSD per row.
     """
-    frequencies, psd = signal.welch(data, fs=sampling_rate, nperseg=min(len(data), 256))
+    if context is not None:
+        if np.shape(data) != context.data.shape or sampling_rate != context.sampling_rate:
+            raise ValueError("compute_psd: data and sampling_rate must match the AnalysisContext")
+        return context.psd(nperseg=256)
+    if _is_capture(data):
+        from core.capture_file import capture_psd
+        return capture_psd(data, nperseg=256)
+    frequencies, psd = signal.welch(data, fs=sampling_rate, nperseg=min(np.shape(data)[-1], 256))
     return frequencies, psd
 
-def compute_correlation_matrix(signals: List[np.ndarray]) -> np.ndarray:
+def _stack_signals(signals, length_mode: str = 'raise') -> np.ndarray:
+    """
+    Stack signals into a (n_signals, n_samples) float array
+
+    length_mode controls unequal lengths: 'raise' rejects them and
+    'truncate' keeps the leading samples common to every signal
+    """
+    if isinstance(signals, np.ndarray) and signals.ndim == 2:
+        return signals.astype(float, copy=False)
+
+    lengths = {len(s) for s in signals}
+    if len(lengths) > 1:
+        if length_mode == 'truncate':
+            n_samples = min(lengths)
+            return np.stack([np.asarray(s[:n_samples], dtype=float) for s in signals])
+        if length_mode == 'raise':
+            raise ValueError(f"Signals have unequal lengths {sorted(lengths)}; "
+                             "use length_mode='truncate' to align them")
+        raise ValueError(f"Unknown length_mode: {length_mode}")
+    return np.stack([np.asarray(s, dtype=float) for s in signals])
+
+def _covariance_to_correlation(covariance: np.ndarray) -> np.ndarray:
+    """Normalize a covariance matrix to correlation coefficients"""
+    std = np.sqrt(np.diag(covariance))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correlation = covariance / np.outer(std, std)
+    # Rounding can push coefficients marginally outside [-1, 1]
+    return np.clip(correlation, -1.0, 1.0)
+
+def compute_correlation_matrix(signals: List[np.ndarray],
+                               length_mode: str = 'raise') -> np.ndarray:
     """
     Compute correlation matrix between multiple signals
 
+    The signals are stacked into one 2-D array and standardized once, so the
+    full matrix comes from a single matrix product
+
     Parameters:
     -----------
     signals : List[np.ndarray]
-        List of signals to compute correlations between
+        List of signals (or a 2-D array with one signal per row)
+    length_mode : str
+        'raise' rejects signals of unequal length, 'truncate' trims them to
+        the shortest one
 
     Returns:
     --------
     correlation_matrix : np.ndarray
         Matrix of correlation coefficients
     """
-    n_signals = len(signals)
-    correlation_matrix = np.zeros((n_signals, n_signals))
+    stacked = _stack_signals(signals, length_mode)
+    centered = stacked - stacked.mean(axis=1, keepdims=True)
+    covariance = centered @ centered.T
+    return _covariance_to_correlation(covariance)
+
+class RunningCorrelation:
+    """
+    Online correlation matrix over streamed blocks of multichannel data
+
+    Keeps the running mean and co-moment matrix and merges each new block
+    with the pairwise (Chan/Welford) update, so history is never rescanned
+    """
 
-    for i in range(n_signals):
-        for j in range(n_signals):
-            correlation_matrix[i, j] = np.corrcoef(signals[i], signals[j])[0, 1]
+    def __init__(self, n_signals: int):
+        self.n_signals = n_signals
+        self.count = 0
+        self.mean = np.zeros(n_signals)
+        self.comoment = np.zeros((n_signals, n_signals))
 
-    return correlation_matrix
+    def update(self, block: np.ndarray) -> None:
+        """
+        Add a block of shape (n_signals, n_samples)
+        """
+        block = np.asarray(block, dtype=float)
+        if block.ndim != 2 or block.shape[0] != self.n_signals:
+            raise ValueError(f"Block must have shape ({self.n_signals}, n_samples)")
+        n_block = block.shape[1]
+        if n_block == 0:
+            return
 
+        block_mean = block.mean(axis=1)
+        centered = block - block_mean[:, None]
+        block_comoment = centered @ centered.T
+
+        total = self.count + n_block
+        delta = block_mean - self.mean
+        self.comoment += block_comoment + np.outer(delta, delta) * (self.count * n_block / total)
+        self.mean += delta * (n_block / total)
+        self.count = total
+
+    def correlation_matrix(self) -> np.ndarray:
+        """Correlation matrix of all samples seen so far"""
+        return _covariance_to_correlation(self.comoment)
+
+def _detrending_basis(window: int, order: int) -> np.ndarray:
+    """
+    Orthonormal basis of polynomials up to `order` sampled on a window
+
+    Projecting onto this basis is the closed-form least-squares polynomial fit
+    """
+    # Centre and scale the abscissa so the Vandermonde matrix stays well conditioned
+    x = np.linspace(-1.0, 1.0, window)
+    q, _ = np.linalg.qr(np.vander(x, order + 1))
+    return q
+
+@METRICS.timed(STAGE, 'fluctuation_analysis')
 def compute_fluctuation_analysis(data: np.ndarray, 
-                               window_sizes: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+                               window_sizes: Optional[np.ndarray] = None,
+                               order: int = 1,
+                               overlap: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
     """
     Perform Detrended Fluctuation Analysis (DFA)
+
+    Every scale is reshaped into an (n_windows, window) matrix and all windows
+    are detrended at once by projecting onto an orthonormal polynomial basis
+
+    Parameters:
+    -----------
+    data : np.ndarray
+        Input signal
+    window_sizes : Optional[np.ndarray]
+        Window sizes (scales) to evaluate
+    order : int
+        Order of the detrending polynomial (1 for DFA-1, 2 for DFA-2, ...)
+    overlap : float
+        Fraction of each window shared with the next one, in [0, 1)
+
+    Returns:
+    --------
+    window_sizes, fluctuations : np.ndarray
+        Scales and the mean RMS fluctuation at each scale
     """
+    if not 0.0 <= overlap < 1.0:
+        raise ValueError("overlap must be in [0, 1)")
+    if _is_capture(data):
+        if overlap:
+            raise ValueError("overlapping windows are not supported for capture files")
+        from core.capture_file import capture_fluctuation_analysis
+        return capture_fluctuation_analysis(data, window_sizes, order=order)
     if window_sizes is None:
         window_sizes = np.logspace(1, np.log10(len(data)/4), 20, dtype=int)
 
@@ -55,19 +197,17 @@ def compute_fluctuation_analysis(data: np.ndarray,
     fluctuations = np.zeros(len(window_sizes))
 
     for i, window in enumerate(window_sizes):
-        # Number of windows
-        n_windows = len(data) // window
-        windows_fluctuation = np.zeros(n_windows)
-
-        for j in range(n_windows):
-            start = j * window
-            end = start + window
-            segment = y[start:end]
-            x = np.arange(window)
-            coeffs = np.polyfit(x, segment, 1)
-            trend = np.polyval(coeffs, x)
-            windows_fluctuation[j] = np.sqrt(np.mean((segment - trend) ** 2))
+        window = int(window)
+        if window > len(y):
+            fluctuations[i] = np.nan
+            continue
+        # With no overlap the step equals the window, giving len(y) // window segments
+        step = max(1, int(round(window * (1.0 - overlap))))
+        segments = np.lib.stride_tricks.sliding_window_view(y, window)[::step]
 
+        basis = _detrending_basis(window, order)
+        residuals = segments - (segments @ basis) @ basis.T
+        windows_fluctuation = np.sqrt(np.mean(residuals ** 2, axis=1))
         fluctuations[i] = np.mean(windows_fluctuation)
 
     return window_sizes, fluctuations
@@ -0,0 +1,374 @@
+"""
+Streaming cyber threat analysis
+Incremental counterpart of CyberWarfareAnalyzer for continuously arriving
+sensor blocks, with bounded per-detector state
+"""
+
+import numpy as np
+import logging
+from collections import deque
+from typing import List, Optional, Sequence
+
+from core.cyber_analysis import HOPPING_WINDOW, CyberWarfareAnalyzer, CyberThreatIndicator
+from core.analysis_context import AnalysisContext
+from core.peak_tracking import peak_frequencies
+from core.replay_detection import ReplayMatch, find_replay_hits, label_replay_hits
+from core.jamming_detection import JammingStream
+from core.metrics import METRICS, DETECTOR
+
+
+class _StreamingDetector:
+    """Common plumbing for the per-detector streaming state"""
+
+    def __init__(self, analyzer: CyberWarfareAnalyzer, start_time: float):
+        self.analyzer = analyzer
+        self.sampling_rate = analyzer.sampling_rate
+        self.start_time = start_time
+
+    def _timestamp(self, index: int) -> float:
+        return float(self.start_time + index / self.sampling_rate)
+
+    def _indicator(self, threat_type: str, confidence: float, index: int,
+                   metadata: dict, recommendation: str) -> CyberThreatIndicator:
+        return CyberThreatIndicator(
+            threat_type=threat_type,
+            confidence=float(confidence),
+            timestamp=self._timestamp(index),
+            characteristics=self.analyzer.security_validator.sanitize_metadata(metadata),
+            recommendation=recommendation
+        )
+
+    def push(self, block: np.ndarray) -> List[CyberThreatIndicator]:
+        raise NotImplementedError
+
+    def flush(self) -> List[CyberThreatIndicator]:
+        """Report anything held back waiting for more samples"""
+        return []
+
+
+class _FrequencyHoppingStream(_StreamingDetector):
+    """
+    Spectrogram frames over the stream, carrying the frame overlap between blocks
+
+    The 75th-percentile baseline of the batch detector is taken over a
+    bounded history of recent frequency changes
+    """
+
+    def __init__(self, analyzer, start_time, nperseg: int = 256, history: int = 512):
+        super().__init__(analyzer, start_time)
+        self.nperseg = nperseg
+        self.step = nperseg // 2
+        self.pending = np.empty(0)        # Samples not yet consumed by a full frame
+        self.pending_start = 0            # Absolute index of pending[0]
+        self.last_peak: Optional[float] = None
+        self.changes = deque(maxlen=history)
+
+    def push(self, block):
+        buffer = np.concatenate((self.pending, block))
+        if len(buffer) < self.nperseg:
+            self.pending = buffer
+            return []
+
+        f, t, Sxx = AnalysisContext(buffer, self.sampling_rate).spectrogram(
+            nperseg=self.nperseg, noverlap=self.nperseg - self.step, window=HOPPING_WINDOW)
+        n_frames = Sxx.shape[1]
+        frame_start = self.pending_start
+
+        peak_freqs = peak_frequencies(f, Sxx, k=3, interpolate=self.analyzer.hopping_interpolation)
+
+        consumed = n_frames * self.step
+        self.pending = buffer[consumed:]
+        self.pending_start += consumed
+
+        previous = self.last_peak
+        self.last_peak = float(peak_freqs[-1])
+        # Like the batch detector, each change is stamped with its earlier frame
+        if previous is None:
+            freq_changes = np.abs(np.diff(peak_freqs))
+            frame_times = t[:-1]
+        else:
+            freq_changes = np.abs(np.diff(np.r_[previous, peak_freqs]))
+            frame_times = np.r_[t[0] - self.step / self.sampling_rate, t[:-1]]
+        self.changes.extend(freq_changes.tolist())
+        if len(self.changes) == 0:
+            return []
+
+        baseline_var = np.percentile(np.asarray(self.changes), 75)
+        threshold = max(baseline_var * 0.5, 0.05)
+        threats = []
+        for k in np.where(freq_changes > threshold)[0]:
+            change = float(freq_changes[k])
+            threats.append(self._indicator(
+                "Frequency Hopping",
+                min(0.95, change / baseline_var) if baseline_var > 0 else 0.95,
+                frame_start + int(round(frame_times[k] * self.sampling_rate)),
+                {'frequency_change': change,
+                 'duration': float(self.nperseg / self.sampling_rate)},
+                "Monitor frequency spectrum for unauthorized transmissions"))
+        return threats
+
+
+class _SignalInjectionStream(_StreamingDetector):
+    """
+    Undecimated wavelet details with carried filter state
+
+    Intervals are reported once their calibration segment is complete and
+    no later anomaly can extend them, or on flush
+    """
+
+    def __init__(self, analyzer, start_time):
+        super().__init__(analyzer, start_time)
+        self.stream = analyzer._injection_stream()
+
+    def push(self, block):
+        return [self._interval_indicator(interval) for interval in self.stream.push(block)]
+
+    def flush(self):
+        return [self._interval_indicator(interval) for interval in self.stream.flush()]
+
+    def _interval_indicator(self, interval):
+        return self.analyzer._injection_indicator(interval, self._timestamp(interval.start))
+
+
+class _JammingStream(_StreamingDetector):
+    """
+    Sliding-window power against the online baseline of the jamming engine
+
+    Episodes are reported once they end, or on flush
+    """
+
+    def __init__(self, analyzer, start_time):
+        super().__init__(analyzer, start_time)
+        self.stream = JammingStream(analyzer._jamming_tracker())
+
+    def push(self, block):
+        return [self._episode_indicator(episode) for episode in self.stream.push(block)]
+
+    def flush(self):
+        return [self._episode_indicator(episode) for episode in self.stream.flush()]
+
+    def _episode_indicator(self, episode):
+        return self.analyzer._jamming_indicator(episode, self._timestamp(episode.start))
+
+
+class _ReplayStream(_StreamingDetector):
+    """
+    Replay search against a bounded history window
+
+    Each (pattern, lag) pair is evaluated exactly once, in the block where
+    its replayed copy completes. Hit clusters that may still grow are kept
+    pending until no later block can extend them.
+    """
+
+    def __init__(self, analyzer, start_time, window_size: int = 500):
+        super().__init__(analyzer, start_time)
+        self.window_size = window_size
+        self.hop = analyzer.replay_hop or max(1, window_size // 8)
+        self.max_lag = analyzer.replay_max_lag or 4 * window_size
+        self.history = np.empty(0)
+        self.history_start = 0            # Absolute index of history[0], multiple of hop
+        self.hit_starts = np.empty(0, dtype=int)
+        self.hit_lags = np.empty(0, dtype=int)
+        self.hit_corr = np.empty(0)
+
+    def push(self, block):
+        w = self.window_size
+        buffer = np.concatenate((self.history, block))
+        n_old = len(self.history)
+        buffer_end = self.history_start + len(buffer)
+
+        starts, lags, corr = find_replay_hits(buffer, w, hop=self.hop, min_lag=w,
+                                              max_lag=self.max_lag,
+                                              first_start=n_old - self.max_lag - w + 1)
+        # Keep pairs whose replayed window completes inside this block
+        replay_end = starts + lags + w
+        new = (replay_end > n_old) & (replay_end <= len(buffer))
+        self.hit_starts = np.r_[self.hit_starts, starts[new] + self.history_start]
+        self.hit_lags = np.r_[self.hit_lags, lags[new]]
+        self.hit_corr = np.r_[self.hit_corr, corr[new]]
+
+        threats = self._emit_closed(buffer_end)
+
+        keep_from = buffer_end - (self.max_lag + w + self.hop)
+        keep_from = max((keep_from // self.hop) * self.hop, self.history_start)
+        self.history = buffer[keep_from - self.history_start:]
+        self.history_start = keep_from
+        return threats
+
+    def flush(self):
+        # No later block can extend the pending clusters
+        return self._emit_closed(np.iinfo(np.int64).max // 2)
+
+    def _emit_closed(self, buffer_end: int) -> List[CyberThreatIndicator]:
+        segment, n_segments = label_replay_hits(self.hit_starts, self.hit_lags, self.hop)
+        if n_segments == 0:
+            return []
+
+        # A cluster is closed once every neighbouring (start, lag) pair has been evaluated
+        reach = np.full(n_segments, -1)
+        np.maximum.at(reach, segment, self.hit_starts + self.hit_lags)
+        closed = reach + self.window_size + self.hop + 1 <= buffer_end
+
+        threats = []
+        for k in np.where(closed)[0]:
+            members = segment == k
+            peak = np.argmax(np.where(members, self.hit_corr, -1.0))
+            match = ReplayMatch(start=int(self.hit_starts[members].min()),
+                                end=int(self.hit_starts[members].max()) + self.window_size,
+                                lag=int(self.hit_lags[peak]),
+                                correlation=float(self.hit_corr[peak]))
+            threats.append(self.analyzer._replay_indicator(match, self.window_size,
+                                                           self._timestamp(match.start)))
+
+        still_open = ~closed[segment]
+        self.hit_starts = self.hit_starts[still_open]
+        self.hit_lags = self.hit_lags[still_open]
+        self.hit_corr = self.hit_corr[still_open]
+        return threats
+
+
+class _WindowedBatchStream(_StreamingDetector):
+    """
+    Batch detector without streaming support, run on consecutive windows
+
+    Blocks are buffered until `window` samples are available, which are
+    then analyzed on their own; flush analyzes the remainder. Memory is
+    bounded by the window, but a threat spanning a window boundary is seen
+    as two shorter ones.
+    """
+
+    def __init__(self, analyzer, start_time, name: str, window: int):
+        super().__init__(analyzer, start_time)
+        self.name = name
+        self.window = window
+        self.blocks: List[np.ndarray] = []  # Samples not yet analyzed
+        self.buffered = 0
+        self.window_start = 0               # Absolute index of the first buffered sample
+
+    def push(self, block):
+        self.blocks.append(block)
+        self.buffered += len(block)
+        if self.buffered < self.window:
+            return []
+        buffer = np.concatenate(self.blocks)
+        n_full = (len(buffer) // self.window) * self.window
+        threats = []
+        for start in range(0, n_full, self.window):
+            threats.extend(self._analyze(buffer[start:start + self.window]))
+        self.blocks = [buffer[n_full:]]
+        self.buffered = len(buffer) - n_full
+        return threats
+
+    def flush(self):
+        if self.buffered == 0:
+            return []
+        buffer = np.concatenate(self.blocks)
+        self.blocks, self.buffered = [], 0
+        return self._analyze(buffer)
+
+    def _analyze(self, window: np.ndarray) -> List[CyberThreatIndicator]:
+        time = self.start_time + (self.window_start + np.arange(len(window))) / self.sampling_rate
+        self.window_start += len(window)
+        detector = self.analyzer.attack_patterns[self.name]
+        return detector(window, time, context=AnalysisContext(window, self.sampling_rate))
+
+
+# Streaming counterparts of the built-in detectors
+_BUILTIN_STREAMS = {
+    'frequency_hopping': lambda s: _FrequencyHoppingStream(s.analyzer, s.start_time),
+    'signal_injection': lambda s: _SignalInjectionStream(s.analyzer, s.start_time),
+    'jamming': lambda s: _JammingStream(s.analyzer, s.start_time),
+    'replay_attack': lambda s: _ReplayStream(s.analyzer, s.start_time, s.replay_window)
+}
+
+
+class StreamingCyberAnalyzer:
+    """
+    Incremental threat analysis over a continuous sample stream
+
+    Each call to push() analyzes only the new block plus a bounded amount of
+    carried state per detector, and returns indicators that were not
+    reported for any earlier block. Detectors without streaming support
+    (such as anomaly) run as batch detectors on consecutive windows of
+    `batch_window` samples (default: security_validator.max_chunk_length);
+    their names are listed in `windowed`.
+    """
+
+    def __init__(self, analyzer: Optional[CyberWarfareAnalyzer] = None,
+                 sampling_rate: float = 1000.0, start_time: float = 0.0,
+                 replay_window: int = 500,
+                 detectors: Optional[Sequence[str]] = None,
+                 batch_window: Optional[int] = None):
+        self.analyzer = analyzer or CyberWarfareAnalyzer(sampling_rate=sampling_rate)
+        self.sampling_rate = self.analyzer.sampling_rate
+        self.start_time = start_time
+        self.replay_window = replay_window
+        self.batch_window = batch_window or self.analyzer.security_validator.max_chunk_length
+        # Subset of detector names to run; None runs all of them
+        self.enabled = None if detectors is None else set(detectors)
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all carried state and restart the sample counter"""
+        self.samples_seen = 0
+        self.detectors = {}
+        self.windowed = []
+        for name in self.analyzer.attack_patterns:
+            if self.enabled is not None and name not in self.enabled:
+                continue
+            spec = self.analyzer.registry.get(name)
+            if name in _BUILTIN_STREAMS:
+                self.detectors[name] = _BUILTIN_STREAMS[name](self)
+            elif spec is not None and spec.streaming and spec.stream_factory is not None:
+                self.detectors[name] = spec.stream_factory(self.analyzer, self.start_time)
+            else:
+                self.detectors[name] = _WindowedBatchStream(self.analyzer, self.start_time,
+                                                            name, self.batch_window)
+                self.windowed.append(name)
+
+    def push(self, block: np.ndarray) -> List[CyberThreatIndicator]:
+        """
+        Analyze the next block of samples and return newly detected threats
+        """
+        block = np.asarray(block, dtype=float)
+        if block.ndim != 1 or len(block) == 0:
+            return []
+
+        is_valid, error_msg = self.analyzer.security_validator.validate_uniform_signal(
+            block, self.start_time + self.samples_seen / self.sampling_rate, 1.0 / self.sampling_rate)
+        if not is_valid:
+            logging.error("Block validation failed: %s", error_msg)
+            return []
+
+        threats = []
+        for attack_type, detector in self.detectors.items():
+            try:
+                with METRICS.measure(DETECTOR, attack_type, len(block)) as measurement:
+                    found = detector.push(block)
+                    measurement.indicators = len(found)
+                threats.extend(found)
+            except Exception as e:
+                logging.error("Error in streaming %s detection: %s", attack_type, str(e))
+        self.samples_seen += len(block)
+
+        return sorted(threats, key=lambda x: x.confidence, reverse=True)
+
+    def flush(self) -> List[CyberThreatIndicator]:
+        """
+        Report threats held back at the end of the stream
+
+        Jamming episodes still in progress and replay clusters that could
+        still grow are emitted as they stand; call reset() before reusing
+        the analyzer for a new stream.
+        """
+        threats = []
+        for attack_type, detector in self.detectors.items():
+            try:
+                with METRICS.measure(DETECTOR, attack_type) as measurement:
+                    found = detector.flush()
+                    measurement.indicators = len(found)
+                threats.extend(found)
+            except Exception as e:
+                logging.error("Error in streaming %s detection: %s", attack_type, str(e))
+
+        return sorted(threats, key=lambda x: x.confidence, reverse=True)
@@ -0,0 +1,173 @@
+"""
+Columnar threat result container
+Holds detector output as NumPy columns so large result sets can be filled,
+sorted and filtered with vectorized operations, and only materializes
+CyberThreatIndicator objects when callers iterate
+"""
+
+import numpy as np
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from core.cyber_analysis import CyberThreatIndicator
+
+# Core per-threat fields; capture_index is -1 for single-capture analysis
+THREAT_DTYPE = np.dtype([
+    ('type_id', np.int32),
+    ('confidence', np.float64),
+    ('timestamp', np.float64),
+    ('capture_index', np.int64),
+])
+
+
+class ThreatStore:
+    """
+    Columnar collection of threat indicators
+
+    Each row references a threat type (name, recommendation and the names of
+    its characteristics). Characteristics are columns shared by all types,
+    float unless a converted indicator carried other values; a type's rows
+    only materialize the keys that type declares.
+    """
+
+    def __init__(self, records: Optional[np.ndarray] = None,
+                 characteristics: Optional[Dict[str, np.ndarray]] = None,
+                 types: Optional[List[Tuple[str, str, Tuple[str, ...]]]] = None):
+        self.records = records if records is not None else np.empty(0, dtype=THREAT_DTYPE)
+        self.characteristics = characteristics if characteristics is not None else {}
+        self.types = types if types is not None else []
+
+    @classmethod
+    def from_columns(cls, threat_type: str, recommendation: str,
+                     confidence: np.ndarray, timestamp: np.ndarray,
+                     characteristics: Dict[str, Union[np.ndarray, float]],
+                     capture_index: Optional[np.ndarray] = None) -> "ThreatStore":
+        """
+        Build a store of one threat type from column arrays
+
+        Scalar characteristics are broadcast to every row
+        """
+        confidence = np.asarray(confidence, dtype=np.float64)
+        n = len(confidence)
+        records = np.empty(n, dtype=THREAT_DTYPE)
+        records['type_id'] = 0
+        records['confidence'] = confidence
+        records['timestamp'] = timestamp
+        records['capture_index'] = -1 if capture_index is None else capture_index
+        columns = {key: np.broadcast_to(np.asarray(value, dtype=np.float64), (n,)).copy()
+                   for key, value in characteristics.items()}
+        return cls(records, columns, [(threat_type, recommendation, tuple(characteristics))])
+
+    @classmethod
+    def from_indicators(cls, indicators: Sequence[CyberThreatIndicator]) -> "ThreatStore":
+        """Convert a list of indicators, grouping rows by (type, recommendation, keys)"""
+        type_ids: Dict[Tuple[str, str, Tuple[str, ...]], int] = {}
+        keys = {key: None for t in indicators for key in t.characteristics}
+        # Keys holding anything but floats (e.g. plugin strings) keep an object column
+        numeric = {key: all(isinstance(t.characteristics[key], (float, np.floating))
+                            for t in indicators if key in t.characteristics)
+                   for key in keys}
+        records = np.empty(len(indicators), dtype=THREAT_DTYPE)
+        columns = {key: np.full(len(indicators), np.nan) if numeric[key]
+                   else np.full(len(indicators), None, dtype=object)
+                   for key in keys}
+        for row, threat in enumerate(indicators):
+            signature = (threat.threat_type, threat.recommendation, tuple(threat.characteristics))
+            records[row] = (type_ids.setdefault(signature, len(type_ids)), threat.confidence,
+                            threat.timestamp,
+                            -1 if threat.capture_index is None else threat.capture_index)
+            for key, value in threat.characteristics.items():
+                columns[key][row] = value
+        return cls(records, columns, list(type_ids))
+
+    @classmethod
+    def concat(cls, stores: Sequence["ThreatStore"]) -> "ThreatStore":
+        """Concatenate stores, merging their type tables and characteristic columns"""
+        stores = [s for s in stores if len(s)]
+        if not stores:
+            return cls()
+        types: List[Tuple[str, str, Tuple[str, ...]]] = []
+        keys = {key: None for s in stores for key in s.characteristics}
+        records, columns = [], {key: [] for key in keys}
+        for store in stores:
+            remap = np.empty(len(store.types), dtype=np.int32)
+            for i, signature in enumerate(store.types):
+                if signature not in types:
+                    types.append(signature)
+                remap[i] = types.index(signature)
+            part = store.records.copy()
+            part['type_id'] = remap[part['type_id']]
+            records.append(part)
+            for key in keys:
+                columns[key].append(store.characteristics.get(key, np.full(len(store), np.nan)))
+        return cls(np.concatenate(records),
+                   {key: np.concatenate(parts) for key, parts in columns.items()},
+                   types)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def take(self, indices: np.ndarray) -> "ThreatStore":
+        """Rows at the given indices (or boolean mask), in that order"""
+        return ThreatStore(self.records[indices],
+                           {key: column[indices] for key, column in self.characteristics.items()},
+                           self.types)
+
+    def sort_by_confidence(self, descending: bool = True) -> "ThreatStore":
+        """
+        Stable sort by confidence; equal confidences keep their current order,
+        matching sorted(..., key=confidence, reverse=True)
+        """
+        key = -self.records['confidence'] if descending else self.records['confidence']
+        return self.take(np.argsort(key, kind='stable'))
+
+    def top_k(self, k: int) -> "ThreatStore":
+        """The k most confident threats, most confident first"""
+        if k >= len(self):
+            return self.sort_by_confidence()
+        if k <= 0:
+            return self.take(np.empty(0, dtype=int))
+        confidence = self.records['confidence']
+        kth = -np.partition(-confidence, k - 1)[k - 1]
+        above = np.flatnonzero(confidence > kth)
+        # Ties at the boundary go to the earliest rows, as in a stable sort
+        ties = np.flatnonzero(confidence == kth)[:k - len(above)]
+        return self.take(np.sort(np.concatenate((above, ties)))).sort_by_confidence()
+
+    def filter_type(self, threat_type: str) -> "ThreatStore":
+        """Rows of a single threat type"""
+        ids = [i for i, (name, _, _) in enumerate(self.types) if name == threat_type]
+        return self.take(np.isin(self.records['type_id'], ids))
+
+    def _value(self, key: str, row: int):
+        column = self.characteristics[key]
+        return column[row] if column.dtype == object else float(column[row])
+
+    def _materialize(self, row: int) -> CyberThreatIndicator:
+        record = self.records[row]
+        threat_type, recommendation, keys = self.types[record['type_id']]
+        capture_index = int(record['capture_index'])
+        return CyberThreatIndicator(
+            threat_type=threat_type,
+            confidence=float(record['confidence']),
+            timestamp=float(record['timestamp']),
+            characteristics={key: self._value(key, row) for key in keys},
+            recommendation=recommendation,
+            capture_index=None if capture_index < 0 else capture_index
+        )
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("ThreatStore index out of range")
+            return self._materialize(index)
+        return self.take(index)
+
+    def __iter__(self) -> Iterator[CyberThreatIndicator]:
+        for row in range(len(self)):
+            yield self._materialize(row)
+
+    def to_list(self) -> List[CyberThreatIndicator]:
+        """Materialize every row as a CyberThreatIndicator"""
+        return list(self)
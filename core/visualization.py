@@ -97,6 +97,30 @@ def create_psd_plot(frequencies: np.ndarray, psd: np.ndarray) -> go.Figure:
     )
     return fig
 
+def create_spectrogram_plot(frequencies: np.ndarray, times: np.ndarray,
+                            power: np.ndarray) -> go.Figure:
+    """
+    Create an interactive spectrogram heatmap
+
+    Accepts the output of AnalysisContext.spectrogram, so the plot reuses
+    the STFT already computed for threat detection
+    """
+    fig = go.Figure(data=go.Heatmap(
+        x=times,
+        y=frequencies,
+        z=10 * np.log10(power + np.finfo(float).tiny),
+        colorscale='Viridis',
+        colorbar=dict(title='dB')
+    ))
+
+    fig.update_layout(
+        title="Spectrogram",
+        xaxis_title="Time (s)",
+        yaxis_title="Frequency (Hz)",
+        template="plotly_dark"
+    )
+    return fig
+
 def create_dfa_plot(window_sizes: np.ndarray, fluctuations: np.ndarray, 
                    hurst_exponent: float) -> go.Figure:
     """
@@ -12,9 +12,9 @@ def run_tests():
     try:
         logger.info("Starting test suite execution...")
         
-        # Run unit tests
+        # Run unit tests (benchmarks run in the performance step)
         logger.info("Running unit tests...")
-        subprocess.run([sys.executable, "-m", "pytest", "tests/", "-v"], check=True)
+        subprocess.run([sys.executable, "-m", "pytest", "tests/", "-v", "--benchmark-skip"], check=True)
         
         # Run performance tests
         logger.info("Running performance tests...")
@@ -0,0 +1,55 @@
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.batch_analysis import BatchCyberAnalyzer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def make_captures(n_captures, n_samples, sampling_rate, seed=0):
+    """Deterministic synthetic captures: a 1 Hz tone plus noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) / sampling_rate
+    signals = np.sin(2 * np.pi * t) + 0.1 * rng.standard_normal((n_captures, n_samples))
+    return t, signals
+
+def throughput(run, n_captures, repeats):
+    """Best-of-N captures per second for a callable analyzing the whole set"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return n_captures / best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare batch and per-capture threat analysis throughput")
+    parser.add_argument("--captures", type=int, default=500)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--sampling-rate", type=float, default=1000.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    t, signals = make_captures(args.captures, args.samples, args.sampling_rate)
+    analyzer = CyberWarfareAnalyzer(sampling_rate=args.sampling_rate)
+    batch_analyzer = BatchCyberAnalyzer(analyzer)
+
+    loop_rate = throughput(lambda: [analyzer.analyze_threats(s, t) for s in signals],
+                           args.captures, args.repeats)
+    batch_rate = throughput(lambda: batch_analyzer.analyze_batch(signals, t),
+                            args.captures, args.repeats)
+
+    logger.info("Captures: %d x %d samples", args.captures, args.samples)
+    logger.info("Per-capture loop: %.1f captures/s", loop_rate)
+    logger.info("Batch analysis:   %.1f captures/s (%.2fx)", batch_rate, batch_rate / loop_rate)
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,15 @@ from trello import TrelloClient
 import time
 import schedule
 import logging
-import yagmail
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.notification_manager import NotificationService, SMTPConnection
+
 # Load environment variables
 load_dotenv()
 
@@ -56,12 +61,17 @@ task_list = board.open_lists()[0]  # Use the first open list
 # Initialize Docker client
 docker_client = docker.from_env()
 
+# One SMTP session for all alerts; alerts within a minute go out as one digest
+notifications = NotificationService(
+    SMTPConnection(os.getenv('SMTP_HOST', "smtp.gmail.com"), int(os.getenv('SMTP_PORT', "465")),
+                   EMAIL_USER, EMAIL_PASS),
+    sender=EMAIL_USER, default_to=EMAIL_RECIPIENT, digest_window=60.0, max_per_minute=6)
+
 def send_email_alert(subject, body):
-    """Send email alerts with secure credentials"""
+    """Queue an email alert; sent by the notification service in the background"""
     try:
-        yag = yagmail.SMTP(EMAIL_USER, EMAIL_PASS)
-        yag.send(EMAIL_RECIPIENT, subject, body)
-        logging.info(f"Email alert sent: {subject}")
+        if notifications.notify(subject, body):
+            logging.info(f"Email alert queued: {subject}")
     except Exception as e:
         logging.error(f"Failed to send email alert: {e}")
 
@@ -187,6 +197,9 @@ def main():
         logging.error(error_msg)
         send_email_alert("Critical Error", error_msg)
         raise
+    finally:
+        # Send queued alerts, including the critical one above, before exiting
+        notifications.close(timeout=30)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,42 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.model_runtime import MODEL_DIR, ModelRuntime, prepare_variants
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description="Write int8 and ONNX variants of an offline model "
+                                                 "and select the fastest accurate one")
+    parser.add_argument("model", help="Model file name in the model directory, e.g. anomaly_detector.pt")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--input-shape", type=int, nargs="+", required=True,
+                        help="Shape of a representative input batch, e.g. 32 128")
+    parser.add_argument("--variants", nargs="+", default=["int8", "onnx"], choices=["int8", "onnx"])
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="Largest accepted output error relative to the fp32 output")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    runtime = ModelRuntime(args.model_dir)
+    example_input = torch.randn(*args.input_shape)
+    manifest = prepare_variants(runtime, args.model, example_input, variants=args.variants,
+                                tolerance=args.tolerance, repeats=args.repeats)
+
+    for variant, entry in manifest["variants"].items():
+        if entry["accepted"]:
+            logger.info("%-5s %-30s %8.3f ms  error %.4f", variant, entry["file"],
+                        entry["latency_ms"], entry["relative_error"])
+        else:
+            logger.info("%-5s %-30s rejected: %s", variant, entry["file"], entry.get("error"))
+    logger.info("run_local_model will use %s", manifest["fastest"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from core.alert_aggregation import IncidentAggregator, cluster_indicators
+from core.cyber_analysis import CyberThreatIndicator, CyberWarfareAnalyzer
+from core.threat_store import ThreatStore
+
+def indicator(threat_type, timestamp, confidence=0.5, capture_index=None):
+    return CyberThreatIndicator(threat_type=threat_type, confidence=confidence, timestamp=timestamp,
+                                characteristics={'timestamp': float(timestamp)},
+                                recommendation=f"Counter {threat_type}", capture_index=capture_index)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def burst():
+    """200 frequency hops within 2 s, a separate later hop and 50 replay hits"""
+    rng = np.random.default_rng(0)
+    hops = [indicator("Frequency Hopping", t, c) for t, c in zip(np.linspace(0, 2, 200), rng.random(200))]
+    hops.append(indicator("Frequency Hopping", 10.0, 0.1))
+    replays = [indicator("Replay Attack", 0.5 + 0.01 * k, 0.8) for k in range(50)]
+    return hops + replays
+
+def test_indicators_cluster_by_type_and_time(burst):
+    incidents = cluster_indicators(burst, gap=1.0)
+    assert [(i.threat_type, i.count) for i in incidents] == [
+        ("Frequency Hopping", 200), ("Replay Attack", 50), ("Frequency Hopping", 1)]
+    hopping = incidents[0]
+    peak = max(burst[:200], key=lambda t: t.confidence)
+    assert hopping.peak_confidence == peak.confidence
+    assert hopping.characteristics == peak.characteristics
+    assert hopping.first_seen == 0.0 and hopping.span == pytest.approx(2.0)
+    assert "200 indicators" in hopping.summary()
+
+def test_threat_store_and_list_give_same_incidents(burst):
+    assert cluster_indicators(ThreatStore.from_indicators(burst)) == cluster_indicators(burst)
+    assert cluster_indicators([]) == []
+
+def test_captures_are_clustered_separately():
+    indicators = [indicator("Jamming", 1.0, capture_index=k % 2) for k in range(10)]
+    incidents = cluster_indicators(indicators)
+    assert sorted((i.capture_index, i.count) for i in incidents) == [(0, 5), (1, 5)]
+
+def test_repeats_within_ttl_are_suppressed(burst):
+    clock = FakeClock()
+    sent = []
+    aggregator = IncidentAggregator(gap=1.0, ttl=60.0, sinks=[sent.append], clock=clock)
+    first = aggregator.process(burst)
+    assert [(i.threat_type, i.count) for i in first] == [("Frequency Hopping", 201), ("Replay Attack", 50)]
+    for _ in range(10):
+        clock.now += 5.0
+        assert aggregator.process(burst) == []
+    assert sent == first
+    # The late hop joins the open hopping incident of its own batch
+    assert aggregator.stats['suppressed'] == 10 * len(burst) + 1
+    assert first[0].count == 201  # Emitted incidents are not changed by later merges
+
+    # Past the TTL the open incidents close with their consolidated counts
+    clock.now += 61.0
+    final = aggregator.expire()
+    assert sorted((i.threat_type, i.count) for i in final) == [
+        ("Frequency Hopping", 11 * 201), ("Replay Attack", 11 * 50)]
+    assert aggregator.open_incidents == []
+    assert len(sent) == 4
+
+def test_expired_incident_is_reopened():
+    clock = FakeClock()
+    aggregator = IncidentAggregator(ttl=10.0, clock=clock)
+    assert len(aggregator.process([indicator("Jamming", 0.0)])) == 1
+    clock.now = 11.0
+    # Nothing was merged, so expiry emits no update; the new burst opens a new incident
+    reopened = aggregator.process([indicator("Jamming", 30.0)])
+    assert [(i.first_seen, i.count) for i in reopened] == [(30.0, 1)]
+
+def test_flush_reports_unsent_counts_and_max_open_bounds_cache():
+    aggregator = IncidentAggregator(max_open=2)
+    aggregator.process([indicator(name, 0.0) for name in ("A", "B", "C")])
+    assert len(aggregator.open_incidents) == 2
+    aggregator.process([indicator("C", 1.0)])
+    assert [(i.threat_type, i.count) for i in aggregator.flush()] == [("C", 2)]
+    assert aggregator.open_incidents == []
+
+def test_failing_sink_does_not_stop_others():
+    received = []
+
+    def broken(incident):
+        raise ConnectionError("broker down")
+
+    aggregator = IncidentAggregator(sinks=[broken, received.append])
+    aggregator.process([indicator("Jamming", 0.0)])
+    assert len(received) == 1
+
+def test_analyzer_output_collapses_to_few_incidents():
+    rng = np.random.default_rng(1)
+    t = np.arange(4000) / 1000.0
+    signal = np.sin(2 * np.pi * 50 * t) + 0.1 * rng.standard_normal(len(t))
+    signal[1500:2500] += 3.0 * rng.standard_normal(1000)
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    store = analyzer.analyze_threat_store(signal, t)
+    incidents = IncidentAggregator().process(store)
+    assert sum(i.count for i in incidents) == len(store)
+    assert 0 < len(incidents) * 10 < len(store)
+    assert len({i.threat_type for i in incidents}) == len(incidents)
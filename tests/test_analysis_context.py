@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+from scipy import signal
+from core.analysis_context import AnalysisContext
+from core.cyber_analysis import HOPPING_WINDOW, CyberWarfareAnalyzer
+from core.signal_processing import compute_psd
+
+@pytest.fixture
+def sample_signal():
+    t = np.linspace(0, 10, 10000)
+    return t, np.sin(2 * np.pi * t) + 0.1 * np.random.default_rng(0).standard_normal(len(t))
+
+def test_psd_matches_welch(sample_signal):
+    _, data = sample_signal
+    context = AnalysisContext(data, 1000.0)
+    f, psd = compute_psd(data, 1000.0, context=context)
+    f_ref, psd_ref = signal.welch(data, fs=1000.0, nperseg=256)
+    np.testing.assert_allclose(f, f_ref)
+    np.testing.assert_allclose(psd, psd_ref, rtol=1e-10)
+
+def test_representations_are_memoized(sample_signal):
+    _, data = sample_signal
+    context = AnalysisContext(data, 1000.0)
+    assert context.spectrogram(256) is context.spectrogram(256)
+    assert context.cumulative_energy() is context.cumulative_energy()
+    np.testing.assert_allclose(context.cumulative_energy()[1:], np.cumsum(data ** 2))
+
+def test_analyze_threats_shares_context(sample_signal, monkeypatch):
+    time, data = sample_signal
+    calls = []
+    original = signal.spectrogram
+    monkeypatch.setattr(signal, 'spectrogram', lambda *a, **k: calls.append(1) or original(*a, **k))
+
+    context = AnalysisContext(data, 1000.0)
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    analyzer.analyze_threats(data, time, context=context)
+    analyzer.track_carriers(data, context=context)
+    assert len(calls) == 1
+    # The Welch PSD needs a Hann window, computed once on first request
+    compute_psd(data, 1000.0, context=context)
+    compute_psd(data, 1000.0, context=context)
+    assert len(calls) == 2
+
+def test_hopping_spectrogram_keeps_scipy_default_window(sample_signal):
+    _, data = sample_signal
+    context = AnalysisContext(data, 1000.0)
+    CyberWarfareAnalyzer(sampling_rate=1000.0)._detect_frequency_hopping(data, None, context=context)
+    f, t, Sxx = signal.spectrogram(data, fs=1000.0, nperseg=256, noverlap=128)
+    ours = context.spectrogram(256, 128, window=HOPPING_WINDOW)
+    assert ('spectrogram', 256, 128, HOPPING_WINDOW) in context._cache
+    np.testing.assert_allclose(ours[2], Sxx)
+    assert context.spectrogram(256, 128) is not ours  # Hann is cached separately
+
+def test_compute_psd_rejects_mismatched_context(sample_signal):
+    _, data = sample_signal
+    context = AnalysisContext(data, 1000.0)
+    with pytest.raises(ValueError):
+        compute_psd(data, 500.0, context=context)
+    with pytest.raises(ValueError):
+        compute_psd(data[:5000], 1000.0, context=context)
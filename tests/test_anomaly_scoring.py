@@ -0,0 +1,118 @@
+import os
+import pickle
+import threading
+import pytest
+import numpy as np
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.anomaly_scoring import AnomalyScorer, load_scorer
+from core.feature_bank import FeatureBank
+
+FS = 1000.0
+
+def normal_traffic(n_samples, noise=0.1, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) / FS
+    return np.sin(2 * np.pi * 50 * t) + noise * rng.standard_normal(n_samples)
+
+@pytest.fixture(scope="module")
+def scorer():
+    return AnomalyScorer(FeatureBank(FS, window_size=250)).fit_signal(normal_traffic(100000))
+
+@pytest.fixture
+def disturbed():
+    data = normal_traffic(20000, seed=1)
+    data[10000:11000] += np.random.default_rng(2).standard_normal(1000)
+    return np.arange(len(data)) / FS, data
+
+def test_only_disturbed_windows_score_high(scorer, disturbed):
+    t, data = disturbed
+    starts, scores = scorer.score_signal(data)
+    flagged = starts[scores > scorer.threshold]
+    assert list(flagged) == list(range(10000, 11000, 250))
+
+def test_detector_reports_one_indicator_per_interval(scorer, disturbed):
+    t, data = disturbed
+    analyzer = CyberWarfareAnalyzer(sampling_rate=FS)
+    assert analyzer._detect_anomalies(data, t) == []  # No model configured
+    analyzer.anomaly_scorer = scorer
+    threats = analyzer._detect_anomalies(data, t)
+    assert len(threats) == 1
+    assert threats[0].threat_type == "Signal Anomaly"
+    assert threats[0].timestamp == pytest.approx(10.0)
+    assert threats[0].characteristics['end_time'] == pytest.approx(11.0)
+    assert "Signal Anomaly" in analyzer.generate_countermeasures(threats)
+
+def test_saved_model_is_cached(tmp_path, scorer, disturbed):
+    path = str(tmp_path / "anomaly.joblib")
+    scorer.save(path)
+    analyzer = CyberWarfareAnalyzer(sampling_rate=FS)
+    analyzer.anomaly_model_path = path
+    t, data = disturbed
+    assert len(analyzer._detect_anomalies(data, t)) == 1
+    cached = load_scorer(path)
+    assert load_scorer(path) is cached
+    np.testing.assert_allclose(cached.score_signal(data)[1], scorer.score_signal(data)[1])
+    # A newer file on disk replaces the cached scorer
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    assert load_scorer(path) is not cached
+
+def test_level_shift_retrains_in_background(tmp_path):
+    scorer = AnomalyScorer(FeatureBank(FS, window_size=250), drift_threshold=2.0,
+                           retrain_windows=256).fit_signal(normal_traffic(50000))
+    scorer.model_path = str(tmp_path / "anomaly.joblib")
+    # The noise floor rises by 30%: most windows are flagged until the model adapts
+    _, scores = scorer.score_signal(normal_traffic(40000, 0.13, seed=10))
+    assert np.mean(scores > scorer.threshold) > 0.5 and scorer.drift > 2.0
+    for k in range(3):
+        scorer.score_signal(normal_traffic(40000, 0.13, seed=11 + k))
+        scorer.wait()
+    assert scorer.generation >= 1 and scorer.drift < 2.0
+    _, scores = scorer.score_signal(normal_traffic(40000, 0.13, seed=20))
+    assert np.mean(scores > scorer.threshold) < 0.05
+    assert AnomalyScorer.load(scorer.model_path).generation == scorer.generation
+
+def test_scoring_continues_during_retraining(scorer):
+    scorer = AnomalyScorer(scorer.feature_bank, drift_threshold=0.0, retrain_windows=8)
+    scorer.fit_signal(normal_traffic(50000))
+    release = threading.Event()
+    scorer._retrain = lambda model, features: release.wait(10)
+    features = scorer.feature_bank.transform(normal_traffic(10000, 0.11, seed=3))
+    first = scorer.score(features)
+    assert scorer.retraining
+    # The current model keeps scoring while the retraining is blocked
+    np.testing.assert_array_equal(scorer.score(features), first)
+    release.set()
+    scorer.wait()
+    assert not scorer.retraining
+
+def test_warm_start_adds_trees():
+    scorer = AnomalyScorer(FeatureBank(FS, window_size=250), n_estimators=20, drift_threshold=2.0,
+                           retrain_windows=256, warm_start_estimators=10)
+    scorer.fit_signal(normal_traffic(50000))
+    for k in range(4):
+        scorer.score_signal(normal_traffic(40000, 0.13, seed=10 + k))
+        scorer.wait()
+    assert len(scorer.model.estimators_) == 20 + 10 * scorer.generation > 20
+
+def test_parallel_scoring_matches(scorer):
+    features = scorer.feature_bank.transform(normal_traffic(400000, seed=4))
+    parallel = AnomalyScorer(scorer.feature_bank, n_jobs=2)
+    parallel.model, parallel._baseline_mean = scorer.model, scorer._baseline_mean
+    parallel._baseline_std, parallel._drift_mean = scorer._baseline_std, scorer._baseline_mean.copy()
+    np.testing.assert_allclose(parallel.score(features), scorer.score(features))
+
+def test_scorer_pickles_without_its_threads(scorer, disturbed):
+    t, data = disturbed
+    scorer.score_signal(data)
+    copy = pickle.loads(pickle.dumps(scorer))
+    assert not copy.retraining
+    np.testing.assert_allclose(copy.score_signal(data)[1], scorer.score_signal(data)[1])
+
+def test_analyzer_with_scorer_pickles(scorer, disturbed):
+    # Process pools pickle the analyzer for their workers under spawn
+    t, data = disturbed
+    analyzer = CyberWarfareAnalyzer(sampling_rate=FS)
+    analyzer.anomaly_scorer = scorer
+    restored = pickle.loads(pickle.dumps(analyzer))
+    assert len(restored._detect_anomalies(data, t)) == 1
@@ -0,0 +1,49 @@
+import pytest
+import numpy as np
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.batch_analysis import BatchCyberAnalyzer
+
+@pytest.fixture
+def batch():
+    rng = np.random.default_rng(21)
+    t = np.linspace(0, 10, 10000)
+    signals = np.sin(2 * np.pi * t) + 0.1 * rng.standard_normal((6, len(t)))
+    signals[1, 1000:2000] *= 3.0
+    signals[2, 3000:3100] += 2.0
+    signals[3, 2500:3000] = signals[3, 500:1000]
+    return t, signals
+
+def key(threat):
+    return (threat.threat_type, round(threat.confidence, 9), round(threat.timestamp, 9))
+
+def test_matches_per_capture_loop(batch):
+    t, signals = batch
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    expected = [(i, key(x)) for i, s in enumerate(signals) for x in analyzer.analyze_threats(s, t)]
+    threats = BatchCyberAnalyzer(analyzer).analyze_batch(signals, t)
+    assert [(x.capture_index, key(x)) for x in threats] == expected
+
+def test_accepts_list_of_captures(batch):
+    t, signals = batch
+    threats = BatchCyberAnalyzer().analyze_batch(list(signals), t)
+    assert {x.capture_index for x in threats} <= set(range(len(signals)))
+    assert any(x.capture_index == 1 and x.threat_type == "Signal Jamming" for x in threats)
+
+def test_invalid_captures_are_skipped(batch):
+    t, signals = batch
+    signals = signals.copy()
+    signals[0, 10] = np.nan
+    threats = BatchCyberAnalyzer().analyze_batch(signals, t)
+    assert all(x.capture_index != 0 for x in threats)
+    assert any(x.capture_index == 1 for x in threats)
+
+def test_long_captures_are_analyzed_in_chunks(batch):
+    t, signals = batch
+    signals = signals.copy()
+    signals[0, 10] = np.nan
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    analyzer.security_validator.max_chunk_length = 4000
+    expected = [(i, key(x)) for i, s in enumerate(signals) if i > 0
+                for x in analyzer.analyze_threats(s, t)]
+    threats = BatchCyberAnalyzer(analyzer).analyze_batch(signals, t)
+    assert [(x.capture_index, key(x)) for x in threats] == expected
@@ -0,0 +1,88 @@
+import pytest
+import numpy as np
+from scipy import signal
+from core.capture_file import (CaptureFile, capture_statistics, capture_window_power,
+                               preprocess_capture, UniformTimeAxis)
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.signal_processing import preprocess_signal, compute_psd, compute_fluctuation_analysis
+
+CHUNK = 3001  # Deliberately not aligned to any window or segment size
+
+@pytest.fixture
+def recording(tmp_path):
+    rng = np.random.default_rng(9)
+    data = (np.sin(2 * np.pi * np.arange(20000) / 1000.0) + 0.2 * rng.standard_normal(20000))
+    data[12000:13000] *= 4.0
+    data = data.astype(np.float32)
+    raw_path = tmp_path / "capture.bin"
+    data.tofile(raw_path)
+    npy_path = tmp_path / "capture.npy"
+    np.save(npy_path, data)
+    return data.astype(float), str(raw_path), str(npy_path)
+
+def test_raw_and_npy_open_as_memmap(recording):
+    data, raw_path, npy_path = recording
+    for capture in (CaptureFile(raw_path, 1000.0), CaptureFile(npy_path, 1000.0)):
+        assert len(capture) == len(data)
+        assert isinstance(capture.data, np.memmap)
+        np.testing.assert_allclose(np.concatenate([c for _, c in capture.iter_chunks(CHUNK)]), data)
+
+def test_chunked_statistics_and_preprocessing(recording, tmp_path):
+    data, raw_path, _ = recording
+    capture = CaptureFile(raw_path, 1000.0)
+    mean, std = capture_statistics(capture, CHUNK)
+    assert mean == pytest.approx(np.mean(data))
+    assert std == pytest.approx(np.std(data))
+
+    processed = preprocess_signal(capture, 1000.0)
+    np.testing.assert_allclose(processed.data, preprocess_signal(data, 1000.0), atol=1e-10)
+
+def test_preprocessing_leaves_float64_capture_untouched(recording, tmp_path):
+    data = recording[0]
+    path = tmp_path / "capture64.npy"
+    np.save(path, data)
+    capture = CaptureFile(str(path), 1000.0)
+    assert not capture.data.flags.writeable
+    processed = preprocess_capture(capture, str(tmp_path / "out.npy"), CHUNK)
+    np.testing.assert_allclose(processed.data, preprocess_signal(data, 1000.0), atol=1e-10)
+    np.testing.assert_array_equal(np.load(path), data)
+
+def test_chunked_psd_matches_welch(recording):
+    data, raw_path, _ = recording
+    capture = CaptureFile(raw_path, 1000.0)
+    f, psd = compute_psd(capture, 1000.0)
+    f_ref, psd_ref = signal.welch(data, fs=1000.0, nperseg=256)
+    np.testing.assert_allclose(f, f_ref)
+    np.testing.assert_allclose(psd, psd_ref, rtol=1e-9)
+
+def test_chunked_window_power_and_dfa(recording):
+    data, raw_path, _ = recording
+    capture = CaptureFile(raw_path, 1000.0)
+    powers = capture_window_power(capture, 1000, chunk_size=CHUNK)
+    np.testing.assert_allclose(powers, [np.mean(data[i*1000:(i+1)*1000]**2) for i in range(20)])
+
+    window_sizes = np.array([10, 64, 500, 2000])
+    _, expected = compute_fluctuation_analysis(data, window_sizes)
+    _, fluctuations = compute_fluctuation_analysis(capture, window_sizes)
+    np.testing.assert_allclose(fluctuations, expected, rtol=1e-8)
+
+def test_capture_analysis_without_length_cap(recording):
+    data, raw_path, _ = recording
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    analyzer.security_validator.max_chunk_length = 5000  # Force chunked analysis
+    threats = analyzer.analyze_capture(CaptureFile(raw_path, 1000.0))
+    jamming = [t for t in threats if t.threat_type == "Signal Jamming"]
+    assert len(jamming) == 1
+    assert jamming[0].timestamp == pytest.approx(12.0)
+
+    in_memory = analyzer.analyze_threats(data, np.arange(len(data)) / 1000.0)
+    assert [t.threat_type for t in in_memory] == [t.threat_type for t in threats]
+
+def test_uniform_time_axis():
+    axis = UniformTimeAxis(2.0, 0.5, 10)
+    assert len(axis) == 10
+    assert axis[3] == pytest.approx(3.5)
+    np.testing.assert_allclose(axis[2:5], [3.0, 3.5, 4.0])
+    full = 2.0 + np.arange(10) * 0.5
+    for index in (slice(None), slice(-3, None), slice(8, 2, -2), slice(5, 50), slice(7, 3)):
+        np.testing.assert_allclose(axis[index], full[index])
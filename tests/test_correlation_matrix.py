@@ -0,0 +1,36 @@
+import pytest
+import numpy as np
+from core.signal_processing import compute_correlation_matrix, RunningCorrelation
+
+@pytest.fixture
+def signals():
+    rng = np.random.default_rng(0)
+    base = rng.standard_normal(2000)
+    return [base + rng.standard_normal(2000) * k for k in (0.1, 0.5, 1.0, 2.0)]
+
+def test_matches_pairwise_corrcoef(signals):
+    expected = np.array([[np.corrcoef(a, b)[0, 1] for b in signals] for a in signals])
+    np.testing.assert_allclose(compute_correlation_matrix(signals), expected, atol=1e-12)
+
+def test_accepts_2d_array(signals):
+    stacked = np.stack(signals)
+    np.testing.assert_allclose(compute_correlation_matrix(stacked), np.corrcoef(stacked), atol=1e-12)
+
+def test_unequal_lengths(signals):
+    ragged = [signals[0], signals[1][:1500]]
+    with pytest.raises(ValueError):
+        compute_correlation_matrix(ragged)
+    truncated = compute_correlation_matrix(ragged, length_mode='truncate')
+    np.testing.assert_allclose(truncated, np.corrcoef(signals[0][:1500], signals[1][:1500]), atol=1e-12)
+
+def test_running_correlation_matches_batch(signals):
+    stacked = np.stack(signals) + 5.0
+    running = RunningCorrelation(len(signals))
+    for start in range(0, stacked.shape[1], 300):
+        running.update(stacked[:, start:start + 300])
+    assert running.count == stacked.shape[1]
+    np.testing.assert_allclose(running.correlation_matrix(), np.corrcoef(stacked), atol=1e-10)
+
+def test_running_correlation_rejects_wrong_shape():
+    with pytest.raises(ValueError):
+        RunningCorrelation(3).update(np.zeros((2, 10)))
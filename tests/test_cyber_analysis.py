@@ -17,7 +17,7 @@ def sample_signal():
 
 def test_analyzer_initialization(analyzer):
     assert analyzer.sampling_rate == 1000.0
-    assert len(analyzer.attack_patterns) == 4  # Should have 4 detection methods
+    assert len(analyzer.attack_patterns) == 5  # Should have 5 detection methods
 
 def test_frequency_hopping_detection(analyzer, sample_signal):
     time, signal = sample_signal
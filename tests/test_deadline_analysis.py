@@ -0,0 +1,99 @@
+import time as _time
+import pytest
+import numpy as np
+from dataclasses import replace
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.analysis_context import AnalysisContext
+from core.deadline_analysis import DeadlineCyberAnalyzer, AnalysisReport, screen_regions
+
+@pytest.fixture
+def capture():
+    rng = np.random.default_rng(3)
+    data = rng.standard_normal(200000)
+    data[50000:50003] += 10.0
+    data[150000:152000] *= 4.0
+    return np.arange(len(data)) / 1000.0, data
+
+def test_screen_flags_energy_and_spectral_changes(capture):
+    t, data = capture
+    regions = screen_regions(AnalysisContext(data, 1000.0), margin=1000)
+    assert len(regions) == 2
+    assert regions[0][0] < 50000 < regions[0][1]
+    assert regions[1][0] < 150000 and 152000 < regions[1][1]
+    assert sum(end - start for start, end in regions) < len(data) // 10
+
+def test_stationary_capture_has_no_regions():
+    rng = np.random.default_rng(4)
+    assert screen_regions(AnalysisContext(rng.standard_normal(100000), 1000.0)) == []
+
+def test_generous_deadline_is_complete(capture):
+    t, data = capture
+    report = DeadlineCyberAnalyzer(deadline=30.0).analyze(data, t)
+    assert isinstance(report, AnalysisReport)
+    assert report.complete and report.skipped == []
+    injections = [x.timestamp for x in report.threats if x.threat_type == "Signal Injection"]
+    assert any(abs(ts - 50.0) < 0.01 for ts in injections)
+    jamming = [x for x in report.threats if x.threat_type == "Signal Jamming"]
+    assert [x.timestamp for x in jamming] == pytest.approx([150.0], abs=0.25)
+    confidences = [x.confidence for x in report.threats]
+    assert confidences == sorted(confidences, reverse=True)
+
+def test_expensive_detectors_only_see_screened_regions(capture):
+    t, data = capture
+    seen = []
+    analyzer = CyberWarfareAnalyzer()
+    analyzer.attack_patterns['replay_attack'] = lambda d, ts, context=None: seen.append(len(d)) or []
+    analyzer._registered['replay_attack'] = analyzer.attack_patterns['replay_attack']
+    report = DeadlineCyberAnalyzer(analyzer, deadline=30.0).analyze(data, t)
+    assert seen == [end - start for start, end in report.regions]
+
+def test_expired_deadline_returns_partial_report(capture):
+    t, data = capture
+    report = DeadlineCyberAnalyzer(deadline=0.0).analyze(data, t)
+    assert not report.complete
+    assert 'jamming' in report.skipped
+    assert any(s.startswith('replay_attack@') for s in report.skipped)
+    assert report.threats == []
+
+def test_partial_budget_runs_cheap_detectors_first(capture):
+    t, data = capture
+    analyzer = CyberWarfareAnalyzer()
+    analyzer.registry = analyzer.registry.copy()
+    # Replay never fits the budget
+    analyzer.registry.register(replace(analyzer.registry.get('replay_attack'), cost=1e6), replace=True)
+    report = DeadlineCyberAnalyzer(analyzer, deadline=30.0).analyze(data, t)
+    assert not report.complete
+    assert all(s.startswith('replay_attack@') for s in report.skipped)
+    assert any(x.threat_type == "Signal Jamming" for x in report.threats)
+
+def test_invalid_signal_is_not_complete():
+    t = np.linspace(0, 1, 1000)
+    report = DeadlineCyberAnalyzer().analyze(np.full(1000, np.nan), t)
+    assert report.threats == [] and not report.complete
+    assert report.error
+
+def test_long_capture_is_analyzed_in_chunks(capture):
+    t, data = capture
+    analyzer = CyberWarfareAnalyzer()
+    analyzer.security_validator.max_chunk_length = 50000
+    report = DeadlineCyberAnalyzer(analyzer, deadline=30.0).analyze(data, t)
+    assert report.complete and report.error is None
+    assert report.threats == analyzer._analyze_chunked(data, float(t[0]))
+    jamming = [x for x in report.threats if x.threat_type == "Signal Jamming"]
+    assert [x.timestamp for x in jamming] == pytest.approx([150.0], abs=0.25)
+
+def test_long_capture_stops_between_chunks(capture):
+    t, data = capture
+    analyzer = CyberWarfareAnalyzer(detectors=['jamming'])
+    analyzer.security_validator.max_chunk_length = 50000
+    report = DeadlineCyberAnalyzer(analyzer, deadline=0.0).analyze(data, t)
+    assert not report.complete and report.threats == []
+    assert report.skipped == ['jamming@0:200000']
+
+    # One chunk takes 0.15s, so a second one no longer fits into 0.25s
+    analyzer.attack_patterns['slow'] = lambda d, ts, context=None: _time.sleep(0.15) or []
+    started = _time.monotonic()
+    report = DeadlineCyberAnalyzer(analyzer, deadline=0.25).analyze(data, t)
+    assert _time.monotonic() - started < 0.4
+    assert not report.complete
+    assert report.skipped == ['jamming@50000:200000', 'slow@50000:200000']
@@ -0,0 +1,128 @@
+import pytest
+import numpy as np
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.detector_registry import DEFAULT_REGISTRY, DetectorRegistry, DetectorSpec
+from core.streaming_analysis import StreamingCyberAnalyzer
+from core.batch_analysis import BatchCyberAnalyzer
+from core.plugin_loader import load_plugins
+
+PLUGIN = '''
+from core.cyber_analysis import CyberThreatIndicator
+from core.detector_registry import DetectorSpec
+
+def detect_clipping(analyzer, data, time, context=None):
+    clipped = abs(data) >= 0.999 * abs(data).max()
+    if clipped.sum() < 10:
+        return []
+    return [CyberThreatIndicator("Clipping", 0.5, float(time[clipped.argmax()]),
+                                 {"samples": float(clipped.sum())}, "Check receiver gain")]
+
+class ClippingStream:
+    def __init__(self, analyzer, start_time):
+        self.seen = 0
+    def push(self, block):
+        self.seen += len(block)
+        return []
+    def flush(self):
+        return []
+
+def register(registry):
+    registry.register(DetectorSpec("clipping", detect_clipping, requires=("raw",), cost=0.001,
+                                   streaming=True, stream_factory=ClippingStream))
+'''
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(9)
+    t = np.arange(10000) / 1000.0
+    data = np.sin(2 * np.pi * t) + 0.1 * rng.standard_normal(len(t))
+    data[3000:4000] *= 3.0
+    return t, data
+
+def noop(analyzer, data, time, context=None):
+    return []
+
+def test_builtin_detectors_are_registered():
+    assert DEFAULT_REGISTRY.names()[:4] == ['frequency_hopping', 'signal_injection',
+                                           'jamming', 'replay_attack']
+    assert DEFAULT_REGISTRY.get('frequency_hopping').requires == ('stft',)
+    assert all(DEFAULT_REGISTRY.get(name).streaming for name in DEFAULT_REGISTRY.names()[:4])
+
+def test_schedule_counts_shared_inputs_once():
+    registry = DetectorRegistry([
+        DetectorSpec('a', noop, requires=('stft',), cost=0.01),
+        DetectorSpec('b', noop, requires=('raw',), cost=0.03),
+        DetectorSpec('c', noop, requires=('stft',), cost=0.001),
+        DetectorSpec('d', noop, requires=('power',), cost=0.5),
+    ])
+    order, skipped = registry.schedule(['a', 'b', 'c', 'd'], 1_000_000)
+    # b is cheapest alone; then c pays for the STFT that a reuses
+    assert order == ['b', 'c', 'a', 'd'] and skipped == []
+    order, skipped = registry.schedule(['a', 'b', 'c', 'd'], 1_000_000, budget=0.2)
+    assert order == ['b', 'c', 'a'] and skipped == ['d']
+
+def test_unknown_inputs_and_duplicates_are_rejected():
+    registry = DetectorRegistry()
+    with pytest.raises(ValueError):
+        DetectorSpec('x', noop, requires=('fft',))
+    registry.register(DetectorSpec('x', noop))
+    with pytest.raises(ValueError):
+        registry.register(DetectorSpec('x', noop))
+    registry.register(DetectorSpec('x', noop, cost=1.0), replace=True)
+    assert registry.get('x').cost == 1.0
+
+def test_only_enabled_detectors_are_bound(signal):
+    t, data = signal
+    analyzer = CyberWarfareAnalyzer(detectors=['jamming'])
+    assert list(analyzer.attack_patterns) == ['jamming']
+    assert {x.threat_type for x in analyzer.analyze_threats(data, t)} == {"Signal Jamming"}
+    with pytest.raises(ValueError):
+        CyberWarfareAnalyzer(detectors=['teleportation'])
+
+def test_latency_budget_skips_expensive_detectors(signal):
+    t, data = signal
+    calls = []
+    registry = DEFAULT_REGISTRY.copy()
+    registry.register(DetectorSpec('replay_attack', lambda *args, **kwargs: calls.append(1) or [],
+                                   requires=('power',), cost=1.6), replace=True)
+    analyzer = CyberWarfareAnalyzer(registry=registry)
+    analyzer.latency_budget = 0.005
+    assert analyzer.schedule_detectors(len(data))[-1] != 'replay_attack'
+    analyzer.analyze_threats(data, t)
+    assert calls == []
+    analyzer.latency_budget = None
+    analyzer.analyze_threats(data, t)
+    assert calls == [1]
+
+def test_plugins_register_detectors(tmp_path, signal):
+    (tmp_path / "clipping.fesmod").write_text(PLUGIN)
+    registry = DEFAULT_REGISTRY.copy()
+    assert load_plugins(registry, str(tmp_path)) == ['clipping']
+    assert 'clipping' in registry and 'clipping' not in DEFAULT_REGISTRY
+
+    t, data = signal
+    data = np.clip(data, -1.0, 1.0)
+    analyzer = CyberWarfareAnalyzer(registry=registry)
+    threats = analyzer.analyze_threats(data, t)
+    assert any(x.threat_type == "Clipping" for x in threats)
+
+    batch = BatchCyberAnalyzer(analyzer).analyze_batch(np.stack((data, data)), t)
+    assert sorted(x.capture_index for x in batch if x.threat_type == "Clipping") == [0, 1]
+
+    streaming = StreamingCyberAnalyzer(analyzer)
+    streaming.push(data[:5000])
+    assert streaming.detectors['clipping'].seen == 5000
+
+def test_empty_registry_is_not_replaced_by_default(tmp_path, signal):
+    t, data = signal
+    analyzer = CyberWarfareAnalyzer(registry=DetectorRegistry())
+    assert analyzer.attack_patterns == {}
+    assert analyzer.analyze_threats(data, t) == []
+
+    (tmp_path / "clipping.fesmod").write_text(PLUGIN)
+    registry = DetectorRegistry()
+    assert load_plugins(registry, str(tmp_path)) == ['clipping']
+    assert registry.names() == ['clipping'] and 'clipping' not in DEFAULT_REGISTRY
+
+def test_missing_plugin_directory(tmp_path):
+    assert load_plugins(DetectorRegistry(), str(tmp_path / "absent")) == []
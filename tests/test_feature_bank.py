@@ -0,0 +1,64 @@
+import pytest
+import numpy as np
+import pywt
+from scipy import signal, stats
+from core.feature_bank import FeatureBank, window_features
+from core.feature_extraction import extract_features
+
+@pytest.fixture
+def tones():
+    rng = np.random.default_rng(12)
+    t = np.arange(20000) / 1000.0
+    data = np.sin(2 * np.pi * 50 * t) + 0.1 * rng.standard_normal(len(t))
+    data[10000:] = np.sin(2 * np.pi * 300 * t[10000:]) + 0.1 * rng.standard_normal(10000)
+    return data
+
+def reference_features(window, bank):
+    # Straightforward single-window computation
+    f, p = signal.welch(window, fs=bank.sampling_rate, nperseg=min(len(window), 256))
+    df = f[1] - f[0]
+    edges = np.linspace(0, bank.sampling_rate / 2, bank.n_bands + 1)
+    bands = [p[(f >= lo) & ((f < hi) | (hi == edges[-1]))].sum() * df
+             for lo, hi in zip(edges[:-1], edges[1:])]
+    weights = p / p.sum()
+    centroid = np.sum(weights * f)
+    entropy = -np.sum(weights[weights > 0] * np.log(weights[weights > 0])) / np.log(len(f))
+    energies = [np.mean(c ** 2) for c in pywt.wavedec(window, bank.wavelet, level=bank.wavelet_level)]
+    zcr = np.mean(np.signbit(window[1:]) != np.signbit(window[:-1]))
+    return np.array(bands + [centroid, entropy] + energies +
+                    [np.sqrt(np.mean(window ** 2)), stats.kurtosis(window), zcr])
+
+def test_matches_per_window_computation(tones):
+    bank = FeatureBank(1000.0, window_size=1000, hop=700)
+    features = bank.transform(tones)
+    starts = bank.window_starts(len(tones))
+    assert features.shape == (len(starts), len(bank.feature_names))
+    for row, start in zip(features, starts):
+        np.testing.assert_allclose(row, reference_features(tones[start:start + 1000], bank), rtol=1e-5, atol=1e-6)
+
+def test_output_is_contiguous_float32(tones):
+    features = window_features(tones, 1000.0, window_size=500)
+    assert features.dtype == np.float32 and features.flags['C_CONTIGUOUS']
+    assert features.shape[0] == len(tones) // 500
+
+def test_features_track_the_signal(tones):
+    bank = FeatureBank(1000.0, window_size=1000)
+    features = bank.transform(tones)
+    centroid = features[:, bank.feature_names.index("spectral_centroid")]
+    assert np.all(np.abs(centroid[:10] - 50) < 15) and np.all(np.abs(centroid[10:] - 300) < 15)
+    low_band = features[:, bank.feature_names.index("band_power_0_62.5hz")]
+    assert low_band[:10].min() > 10 * low_band[10:].max()
+
+def test_blocks_do_not_change_results(tones):
+    full = FeatureBank(1000.0, window_size=256, hop=64).transform(tones)
+    blocked = FeatureBank(1000.0, window_size=256, hop=64, block_windows=7).transform(tones)
+    np.testing.assert_array_equal(full, blocked)
+
+def test_short_and_constant_input():
+    bank = FeatureBank(1000.0, window_size=1000)
+    assert bank.transform(np.zeros(500)).shape == (0, bank.n_features)
+    assert np.all(np.isfinite(bank.transform(np.ones(3000))))
+
+def test_feeds_extract_features(tones):
+    features = window_features(tones, 1000.0, window_size=200)
+    assert extract_features(features, n_components=3).shape == (100, 3)
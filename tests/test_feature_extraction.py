@@ -1,11 +1,77 @@
 
-import sys
-import os
 import numpy as np
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
-from feature_extraction import extract_features
+import pytest
+from core.feature_extraction import FeatureExtractor, extract_features
+
+@pytest.fixture
+def correlated():
+    rng = np.random.default_rng(8)
+    latent = rng.standard_normal((5000, 3))
+    mixing = rng.standard_normal((3, 12))
+    return latent @ mixing * np.arange(1, 13) + 0.1 * rng.standard_normal((5000, 12)) + 7.0
+
+def same_up_to_sign(a, b):
+    signs = np.sign(np.sum(a * b, axis=0))
+    np.testing.assert_allclose(a * signs, b, rtol=1e-6, atol=1e-6)
 
 def test_extract_features():
     data = np.random.randn(100, 10)
     components = extract_features(data, n_components=2)
     assert components.shape == (100, 2)
+
+def test_chunked_fit_matches_full_pca(correlated):
+    extractor = FeatureExtractor(n_components=3)
+    for start in range(0, len(correlated), 777):
+        extractor.partial_fit(correlated[start:start + 777])
+    assert extractor.n_samples_seen_ == len(correlated)
+    same_up_to_sign(extractor.transform(correlated), extract_features(correlated, n_components=3))
+
+def test_fit_reads_memmap_in_chunks(tmp_path, correlated):
+    path = tmp_path / "features.npy"
+    np.save(path, correlated)
+    extractor = FeatureExtractor(n_components=2, chunk_size=1000).fit(np.load(path, mmap_mode='r'))
+    same_up_to_sign(extractor.transform(correlated), extract_features(correlated))
+
+def test_constant_feature_is_not_scaled(correlated):
+    data = correlated.copy()
+    data[:, 4] = 3.0
+    extractor = FeatureExtractor().fit(data)
+    assert extractor.scale_[4] == 1.0
+    assert np.all(np.isfinite(extractor.transform(data)))
+
+def test_wide_data_uses_incremental_pca():
+    rng = np.random.default_rng(9)
+    data = rng.standard_normal((600, 40)) + np.outer(rng.standard_normal(600), np.linspace(1, 3, 40))
+    extractor = FeatureExtractor(n_components=2, max_covariance_features=16, chunk_size=150).fit(data)
+    assert extractor.wide
+    projected = extractor.transform(data)
+    reference = extract_features(data)
+    # The dominant direction agrees with the full PCA
+    assert abs(np.corrcoef(projected[:, 0], reference[:, 0])[0, 1]) > 0.99
+
+@pytest.mark.parametrize("max_covariance_features", [2048, 4])
+def test_saved_model_is_reused(tmp_path, correlated, max_covariance_features):
+    path = str(tmp_path / "model.npz")
+    extractor = FeatureExtractor(n_components=2, max_covariance_features=max_covariance_features)
+    extractor.partial_fit(correlated[:2500])
+    extractor.save(path)
+    loaded = FeatureExtractor.load(path)
+    np.testing.assert_allclose(loaded.transform(correlated), extractor.transform(correlated))
+    # Training continues from the saved state
+    extractor.partial_fit(correlated[2500:])
+    loaded.partial_fit(correlated[2500:])
+    np.testing.assert_allclose(loaded.transform(correlated), extractor.transform(correlated), atol=1e-8)
+
+def test_extract_features_skips_refit_with_model_path(tmp_path, correlated):
+    path = str(tmp_path / "model.npz")
+    first = extract_features(correlated[:1000], model_path=path)
+    # A later batch is projected with the stored model instead of being refitted
+    later = extract_features(correlated[1000:2000], model_path=path)
+    expected = FeatureExtractor.load(path).transform(correlated[1000:2000])
+    np.testing.assert_allclose(later, expected)
+    same_up_to_sign(first, extract_features(correlated[:1000]))
+
+def test_mismatched_features_are_rejected(correlated):
+    extractor = FeatureExtractor().partial_fit(correlated)
+    with pytest.raises(ValueError):
+        extractor.partial_fit(correlated[:, :5])
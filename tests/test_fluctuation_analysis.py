@@ -0,0 +1,43 @@
+import pytest
+import numpy as np
+from core.signal_processing import compute_fluctuation_analysis, compute_hurst_exponent
+
+@pytest.fixture
+def noise():
+    return np.random.default_rng(0).standard_normal(5000)
+
+def polyfit_dfa(data, window_sizes, order=1):
+    # Per-window polyfit DFA used as the reference implementation
+    y = np.cumsum(data - np.mean(data))
+    fluctuations = []
+    for window in window_sizes:
+        x = np.arange(window)
+        rms = []
+        for j in range(len(data) // window):
+            segment = y[j*window:(j+1)*window]
+            trend = np.polyval(np.polyfit(x, segment, order), x)
+            rms.append(np.sqrt(np.mean((segment - trend) ** 2)))
+        fluctuations.append(np.mean(rms))
+    return np.array(fluctuations)
+
+@pytest.mark.parametrize("order", [1, 2, 3])
+def test_matches_polyfit_reference(noise, order):
+    window_sizes, fluctuations = compute_fluctuation_analysis(noise, order=order)
+    expected = polyfit_dfa(noise, window_sizes, order=order)
+    np.testing.assert_allclose(fluctuations, expected, rtol=1e-6)
+
+def test_default_window_sizes_contract(noise):
+    window_sizes, fluctuations = compute_fluctuation_analysis(noise)
+    assert window_sizes.shape == fluctuations.shape == (20,)
+    # White noise has a Hurst exponent close to 0.5
+    assert compute_hurst_exponent(window_sizes, fluctuations) == pytest.approx(0.5, abs=0.1)
+
+def test_overlapping_windows(noise):
+    window_sizes = np.array([16, 64, 256])
+    _, plain = compute_fluctuation_analysis(noise, window_sizes)
+    _, overlapped = compute_fluctuation_analysis(noise, window_sizes, overlap=0.5)
+    np.testing.assert_allclose(overlapped, plain, rtol=0.15)
+
+def test_invalid_overlap(noise):
+    with pytest.raises(ValueError):
+        compute_fluctuation_analysis(noise, overlap=1.0)
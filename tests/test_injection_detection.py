@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+import pywt
+from scipy import signal
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.streaming_analysis import StreamingCyberAnalyzer
+from core.injection_detection import (InjectionStream, detail_filters, detect_injections,
+                                      robust_sigma)
+
+@pytest.fixture
+def injected():
+    rng = np.random.default_rng(17)
+    data = rng.standard_normal(60000)
+    data[10000:10003] += 10.0
+    data[30000:30500] += 4.0 * np.sin(np.arange(500) * 2.8)
+    data[52000] -= 12.0
+    return data
+
+def same_intervals(a, b):
+    assert [(i.start, i.end, i.level) for i in a] == [(i.start, i.end, i.level) for i in b]
+    assert [i.magnitude for i in a] == pytest.approx([i.magnitude for i in b])
+
+def test_detail_filters_match_swt():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(1024)
+    filters, delays = detail_filters('db4', 3)
+    swt = pywt.swt(x, 'db4', level=3, trim_approx=True, norm=False)
+    for j, band in enumerate(filters, 1):
+        ours = signal.lfilter(band, 1.0, np.tile(x, 2))[1024:]
+        # Same band energy as the periodic stationary transform, up to a circular shift
+        assert np.sum(ours ** 2) == pytest.approx(np.sum(swt[-j] ** 2), rel=1e-9)
+    assert list(delays) == sorted(delays)
+
+def test_robust_sigma_ignores_outliers():
+    rng = np.random.default_rng(1)
+    values = rng.standard_normal(10000)
+    values[:500] = 1000.0
+    assert robust_sigma(values) == pytest.approx(1.0, rel=0.1)
+
+def test_every_interval_is_reported(injected):
+    intervals = detect_injections(injected)
+    assert [i.start for i in intervals] == pytest.approx([10000, 30000, 52000], abs=5)
+    assert intervals[1].end == pytest.approx(30500, abs=5)
+    assert all(i.score > 5.0 for i in intervals)
+
+@pytest.mark.parametrize("length", [2500, 3000, 6000, 12000])
+def test_sustained_injection_does_not_hide_itself(length):
+    # Longer than half a calibration segment, so it would dominate the segment's own MAD
+    rng = np.random.default_rng(17)
+    data = rng.standard_normal(60000)
+    data[16384:16384 + length] += 4.0 * np.sin(np.arange(length) * 2.8)
+    intervals = detect_injections(data)
+    assert [(i.start, i.end) for i in intervals] == [
+        (pytest.approx(16384, abs=5), pytest.approx(16384 + length, abs=10))]
+
+def test_injection_in_first_segment_is_detected():
+    rng = np.random.default_rng(3)
+    data = rng.standard_normal(20000)
+    data[500:3000] += 4.0 * np.sin(np.arange(2500) * 2.8)
+    intervals = detect_injections(data)
+    assert len(intervals) == 1 and intervals[0].start == pytest.approx(500, abs=5)
+
+def test_clean_noise_has_no_intervals():
+    rng = np.random.default_rng(2)
+    assert detect_injections(rng.standard_normal(50000)) == []
+
+@pytest.mark.parametrize("block_size", [97, 1000, 4096, 9999])
+def test_results_do_not_depend_on_block_boundaries(injected, block_size):
+    stream = InjectionStream()
+    intervals = []
+    for start in range(0, len(injected), block_size):
+        intervals.extend(stream.push(injected[start:start + block_size]))
+    intervals.extend(stream.flush())
+    same_intervals(intervals, detect_injections(injected))
+
+def test_memmap_input_is_chunked(tmp_path, injected):
+    path = tmp_path / "capture.npy"
+    np.save(path, injected)
+    mapped = np.load(path, mmap_mode='r')
+    same_intervals(detect_injections(mapped, chunk_size=5000), detect_injections(injected))
+
+def test_detector_timestamps_are_sample_accurate(injected):
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    time = np.arange(len(injected)) / 1000.0
+    threats = analyzer._detect_signal_injection(injected, time)
+    # Within the wavelet filters' position uncertainty of a few samples
+    assert sorted(t.timestamp for t in threats) == pytest.approx([10.0, 30.0, 52.0], abs=0.005)
+    assert all(0 < t.confidence <= 0.85 for t in threats)
+
+def test_streaming_matches_single_pass(injected):
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    streaming = StreamingCyberAnalyzer(analyzer, detectors=['signal_injection'])
+    threats = []
+    for start in range(0, len(injected), 1234):
+        threats.extend(streaming.push(injected[start:start + 1234]))
+    threats.extend(streaming.flush())
+    expected = analyzer._detect_signal_injection(injected, np.arange(len(injected)) / 1000.0)
+    assert sorted(t.timestamp for t in threats) == pytest.approx(sorted(t.timestamp for t in expected))
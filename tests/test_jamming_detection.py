@@ -0,0 +1,104 @@
+import pytest
+import numpy as np
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.streaming_analysis import StreamingCyberAnalyzer
+from core.jamming_detection import (JammingTracker, JammingStream, sliding_power,
+                                    detect_jamming)
+
+@pytest.fixture
+def noise():
+    rng = np.random.default_rng(12)
+    return rng.standard_normal(40000)
+
+def test_sliding_power_matches_direct_windows(noise):
+    powers = sliding_power(noise[:5000], 400, hop=130)
+    expected = [np.mean(noise[s:s + 400] ** 2) for s in range(0, 4601, 130)]
+    np.testing.assert_allclose(powers, expected)
+
+    batch = np.stack((noise[:5000], noise[5000:10000]))
+    np.testing.assert_allclose(sliding_power(batch, 400, hop=130)[0], expected)
+
+def test_episodes_have_start_and_end(noise):
+    data = noise.copy()
+    data[12000:14000] *= 4.0
+    data[30000:30300] *= 6.0  # Short burst straddling non-overlapping windows
+    episodes = detect_jamming(data, 1000)
+    assert len(episodes) == 2
+    assert episodes[0].start == pytest.approx(12000, abs=250)
+    assert episodes[0].end == pytest.approx(14000, abs=250)
+    assert episodes[1].start == pytest.approx(30000, abs=250)
+    assert episodes[1].end == pytest.approx(30300, abs=250)
+    assert episodes[0].mean_power > 3 * episodes[0].baseline_power
+
+@pytest.mark.parametrize("power", [4.0, 5.0, 9.0])
+def test_single_window_burst_has_positive_duration(noise, power):
+    # Jams only one or two windows, too few to narrow the bounds to the rising and falling hops
+    data = noise.copy()
+    data[20000:21000] *= np.sqrt(power)
+    episodes = detect_jamming(data, 1000)
+    assert len(episodes) == 1
+    assert 19000 <= episodes[0].start < episodes[0].end <= 22000
+    assert episodes[0].start <= 20500 <= episodes[0].end
+
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    threats = analyzer._detect_jamming(data, np.arange(len(data)) / 1000.0)
+    assert len(threats) == 1
+    assert threats[0].characteristics['duration'] > 0
+    assert threats[0].characteristics['end_time'] > threats[0].timestamp
+
+@pytest.mark.parametrize("baseline", ['ewma', 'median'])
+def test_slow_drift_is_absorbed_by_baseline(noise, baseline):
+    drifting = noise * np.linspace(1.0, 3.0, len(noise))
+    assert detect_jamming(drifting, 1000, baseline=baseline) == []
+    # The same rise applied abruptly is jamming
+    stepped = noise.copy()
+    stepped[20000:] *= 3.0
+    assert len(detect_jamming(stepped, 1000, baseline=baseline)) == 1
+
+def test_jamming_at_start_is_found_after_warmup(noise):
+    data = noise.copy()
+    data[1000:2000] *= 4.0
+    episodes = detect_jamming(data, 1000)
+    assert len(episodes) == 1
+    assert episodes[0].start == pytest.approx(1000, abs=250)
+
+@pytest.mark.parametrize("block_size", [1, 777, 5000])
+def test_stream_matches_whole_signal(noise, block_size):
+    data = noise[:20000].copy()
+    data[8000:9500] *= 5.0
+    data[19500:] *= 5.0  # Still jammed at the end
+    stream = JammingStream(JammingTracker(500, 120, baseline='median'))
+    episodes = []
+    for start in range(0, len(data), block_size):
+        episodes.extend(stream.push(data[start:start + block_size]))
+    episodes.extend(stream.flush())
+    expected = detect_jamming(data, 500, 120, baseline='median')
+    assert [(e.start, e.end) for e in episodes] == [(e.start, e.end) for e in expected]
+    assert [e.mean_power for e in episodes] == pytest.approx([e.mean_power for e in expected])
+    assert len(episodes) == 2
+
+def test_unknown_baseline_is_rejected():
+    with pytest.raises(ValueError):
+        JammingTracker(100, baseline='mean')
+
+def test_detector_reports_one_indicator_per_episode(noise):
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    data = noise.copy()
+    data[5000:6000] *= 4.0
+    data[25000:27000] *= 4.0
+    threats = analyzer._detect_jamming(data, np.arange(len(data)) / 1000.0)
+    assert [t.timestamp for t in threats] == pytest.approx([5.0, 25.0], abs=0.25)
+    assert threats[1].characteristics['end_time'] == pytest.approx(27.0, abs=0.25)
+    assert all(0.5 < t.confidence <= 0.95 for t in threats)
+
+def test_streaming_flush_reports_open_episode(noise):
+    data = noise.copy()
+    data[35000:] *= 4.0
+    streaming = StreamingCyberAnalyzer(detectors=['jamming'])
+    threats = []
+    for start in range(0, len(data), 4000):
+        threats.extend(streaming.push(data[start:start + 4000]))
+    assert threats == []
+    threats = streaming.flush()
+    assert len(threats) == 1
+    assert threats[0].timestamp == pytest.approx(35.0, abs=0.25)
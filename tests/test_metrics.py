@@ -0,0 +1,101 @@
+import json
+import urllib.request
+import pytest
+import numpy as np
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.signal_processing import compute_psd, compute_fluctuation_analysis
+from core.metrics import METRICS, MetricsRegistry, collecting, serve_metrics
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(5)
+    t = np.arange(10000) / 1000.0
+    data = np.sin(2 * np.pi * t) + 0.1 * rng.standard_normal(len(t))
+    data[3000:4000] *= 3.0
+    return t, data
+
+def test_disabled_by_default_records_nothing(signal):
+    t, data = signal
+    METRICS.reset()
+    CyberWarfareAnalyzer().analyze_threats(data, t)
+    compute_psd(data, 1000.0)
+    assert not METRICS.enabled and METRICS.snapshot() == {}
+
+def test_detectors_and_stages_are_recorded(signal):
+    t, data = signal
+    analyzer = CyberWarfareAnalyzer()
+    with collecting() as metrics:
+        threats = analyzer.analyze_threats(data, t)
+        compute_psd(data, 1000.0)
+        compute_fluctuation_analysis(data)
+    assert not METRICS.enabled
+    snapshot = metrics.snapshot()
+    assert set(snapshot['detector']) == set(analyzer.attack_patterns)
+    assert set(snapshot['stage']) == {'validation', 'compute_psd', 'fluctuation_analysis'}
+    assert all(s['calls'] == 1 and s['samples'] == len(data) for s in snapshot['detector'].values())
+    assert sum(s['indicators'] for s in snapshot['detector'].values()) == len(threats)
+    assert snapshot['detector']['jamming']['indicators'] >= 1
+
+def test_allocation_tracking_nests():
+    registry = MetricsRegistry()
+    with collecting(registry, track_allocations=True):
+        with registry.measure('stage', 'outer'):
+            with registry.measure('stage', 'inner'):
+                inner = np.ones(1_000_000)
+            del inner
+    snapshot = registry.snapshot()['stage']
+    assert snapshot['inner']['peak_bytes'] >= 8_000_000
+    assert snapshot['outer']['peak_bytes'] >= snapshot['inner']['peak_bytes']
+
+def test_failing_block_is_still_timed():
+    registry = MetricsRegistry()
+    with collecting(registry):
+        with pytest.raises(RuntimeError):
+            with registry.measure('detector', 'broken', 10):
+                raise RuntimeError("boom")
+    assert registry.snapshot()['detector']['broken']['calls'] == 1
+
+def test_exports():
+    registry = MetricsRegistry()
+    registry.record('detector', 'jamming', 0.25, samples=1000, indicators=2)
+    registry.record('detector', 'jamming', 0.5, samples=1000)
+    text = registry.to_prometheus()
+    assert '# TYPE fes_analysis_seconds_total counter' in text
+    assert 'fes_analysis_seconds_total{kind="detector",name="jamming"} 0.75' in text
+    assert 'fes_analysis_max_seconds{kind="detector",name="jamming"} 0.5' in text
+    assert json.loads(registry.to_json())['detector']['jamming']['indicators'] == 2
+
+def test_served_for_scraping():
+    registry = MetricsRegistry()
+    registry.record('stage', 'compute_psd', 0.1)
+    server = serve_metrics(port=0, registry=registry)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert 'name="compute_psd"' in response.read().decode()
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics.json") as response:
+            assert json.load(response)['stage']['compute_psd']['calls'] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def test_chunked_analysis_is_recorded_per_detector(signal):
+    t, data = signal
+    analyzer = CyberWarfareAnalyzer()
+    analyzer.security_validator.max_chunk_length = 2500
+    with collecting() as metrics:
+        threats = analyzer._analyze_chunked(data, float(t[0]))
+    snapshot = metrics.snapshot()['detector']
+    assert snapshot and set(snapshot) <= set(analyzer.attack_patterns)
+    # Four chunks plus the final flush
+    assert all(s['calls'] == 5 and s['samples'] == len(data) for s in snapshot.values())
+    assert sum(s['indicators'] for s in snapshot.values()) == len(threats)
+
+def test_bind_address_comes_from_environment(monkeypatch):
+    monkeypatch.setenv("FES_METRICS_HOST", "0.0.0.0")
+    server = serve_metrics(port=0, registry=MetricsRegistry())
+    try:
+        assert server.server_address[0] == "0.0.0.0"
+    finally:
+        server.shutdown()
+        server.server_close()
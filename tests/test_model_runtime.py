@@ -0,0 +1,164 @@
+import os
+import json
+import threading
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from core.model_runtime import _Request, MicroBatcher, ModelRuntime, model_bytes, prepare_variants
+
+def make_model(seed=0, width=16):
+    torch.manual_seed(seed)
+    return torch.nn.Sequential(torch.nn.Linear(8, width), torch.nn.ReLU(), torch.nn.Linear(width, 2)).eval()
+
+@pytest.fixture
+def model_dir(tmp_path):
+    torch.save(make_model(), tmp_path / "detector.pt")
+    return tmp_path
+
+def bump_mtime(path):
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+def test_models_stay_loaded(model_dir):
+    runtime = ModelRuntime(str(model_dir))
+    x = torch.randn(4, 8)
+    first = runtime.get("detector.pt")
+    assert runtime.get("detector.pt") is first
+    with torch.no_grad():
+        expected = make_model()(x)
+    torch.testing.assert_close(runtime.run("detector.pt", x), expected)
+
+def test_changed_file_is_reloaded(model_dir):
+    runtime = ModelRuntime(str(model_dir))
+    first = runtime.get("detector.pt")
+    torch.save(make_model(seed=1), model_dir / "detector.pt")
+    bump_mtime(model_dir / "detector.pt")
+    assert runtime.get("detector.pt") is not first
+    assert runtime.cached_bytes == model_bytes(make_model())
+
+def test_memory_cap_evicts_least_recently_used(model_dir):
+    for name in ("a.pt", "b.pt", "c.pt"):
+        torch.save(make_model(), model_dir / name)
+    size = model_bytes(make_model())
+    runtime = ModelRuntime(str(model_dir), max_bytes=2 * size)
+    a = runtime.get("a.pt")
+    runtime.get("b.pt")
+    runtime.get("a.pt")
+    runtime.get("c.pt")  # Evicts b, the least recently used
+    assert runtime.cached_bytes == 2 * size
+    assert runtime.get("a.pt") is a
+    with pytest.raises(FileNotFoundError):
+        runtime.get("missing.pt")
+
+def test_torchscript_export_is_optimized(model_dir):
+    runtime = ModelRuntime(str(model_dir), num_threads=1)
+    path = runtime.export_torchscript("detector.pt")
+    assert path.endswith("detector.ts") and os.path.exists(path)
+    scripted = runtime.get("detector.ts")
+    assert isinstance(scripted, torch.jit.ScriptModule)
+    x = torch.randn(5, 8)
+    torch.testing.assert_close(runtime.run("detector.ts", x), runtime.run("detector.pt", x))
+    assert torch.get_num_threads() == 1
+
+def test_micro_batcher_coalesces_requests(model_dir):
+    runtime = ModelRuntime(str(model_dir))
+    calls = []
+    model = runtime.get("detector.pt")
+    original_run = runtime.run
+    runtime.run = lambda name, x: calls.append(len(x)) or original_run(name, x)
+    inputs = [torch.randn(1 + k % 3, 8) for k in range(24)]
+    results = [None] * len(inputs)
+    with MicroBatcher(runtime, "detector.pt", max_batch_size=64, max_wait=0.05) as batcher:
+        barrier = threading.Barrier(len(inputs))
+
+        def request(k):
+            barrier.wait()
+            results[k] = batcher.infer(inputs[k], timeout=10)
+
+        threads = [threading.Thread(target=request, args=(k,)) for k in range(len(inputs))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert sum(calls) == sum(len(x) for x in inputs)
+    assert len(calls) < len(inputs)
+    with torch.no_grad():
+        for x, result in zip(inputs, results):
+            torch.testing.assert_close(result, model(x))
+
+def test_micro_batcher_reports_errors(model_dir):
+    runtime = ModelRuntime(str(model_dir))
+    with MicroBatcher(runtime, "detector.pt") as batcher:
+        with pytest.raises(RuntimeError):
+            batcher.infer(torch.randn(2, 5), timeout=10)
+        # Still serving after a failed batch
+        assert batcher.infer(torch.randn(2, 8), timeout=10).shape == (2, 2)
+    with pytest.raises(RuntimeError):
+        batcher.submit(torch.randn(1, 8))
+
+def test_micro_batcher_survives_malformed_requests(model_dir):
+    runtime = ModelRuntime(str(model_dir))
+    with MicroBatcher(runtime, "detector.pt") as batcher:
+        with pytest.raises(ValueError):
+            batcher.submit(torch.tensor(1.0))
+        # A request that slips past the check fails on its own instead of stopping the worker
+        request = _Request(torch.tensor(1.0))
+        batcher._queue.put(request)
+        with pytest.raises(TypeError):
+            request.future.result(timeout=10)
+        assert batcher.infer(torch.randn(2, 8), timeout=10).shape == (2, 2)
+
+def test_run_local_model_uses_shared_runtime(model_dir, monkeypatch):
+    from core import offline_ai
+    monkeypatch.setattr(offline_ai, "RUNTIME", ModelRuntime(str(model_dir)))
+    x = torch.randn(3, 8)
+    first = offline_ai.run_local_model(x, "detector.pt")
+    assert offline_ai.RUNTIME.get("detector.pt") is offline_ai.RUNTIME.get("detector.pt")
+    torch.testing.assert_close(offline_ai.run_local_model(x, "detector.pt"), first)
+    assert offline_ai.run_local_model(x, "missing.pt") is None
+
+def test_int8_variant_is_checked_and_selected(model_dir):
+    runtime = ModelRuntime(str(model_dir))
+    x = torch.randn(16, 8)
+    manifest = prepare_variants(runtime, "detector.pt", x, variants=("int8",), repeats=3)
+    entry = manifest["variants"]["int8"]
+    assert entry["accepted"] and entry["relative_error"] < 0.05
+    assert (model_dir / "detector.int8.ts").exists()
+    assert json.loads((model_dir / "detector.variants.json").read_text()) == manifest
+    assert runtime.resolve("detector.pt") == manifest["fastest"]
+    with torch.no_grad():
+        expected = make_model()(x)
+    torch.testing.assert_close(runtime.run("detector.pt", x), expected, atol=0.05, rtol=0.05)
+
+def test_inaccurate_variant_is_rejected(model_dir):
+    runtime = ModelRuntime(str(model_dir))
+    manifest = prepare_variants(runtime, "detector.pt", torch.randn(16, 8), variants=("int8",),
+                                tolerance=0.0, repeats=3)
+    assert not manifest["variants"]["int8"]["accepted"]
+    assert manifest["fastest"] == "detector.pt"
+    assert not (model_dir / "detector.int8.ts").exists()
+
+def test_onnx_variant_matches_fp32(model_dir):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    runtime = ModelRuntime(str(model_dir))
+    manifest = prepare_variants(runtime, "detector.pt", torch.randn(16, 8), variants=("onnx",), repeats=3)
+    assert manifest["variants"]["onnx"]["accepted"]
+    x = torch.randn(5, 8)  # Batch size differs from the export example
+    with torch.no_grad():
+        expected = make_model()(x)
+    torch.testing.assert_close(runtime.get("detector.onnx")(x), expected, atol=1e-4, rtol=1e-4)
+
+def test_changed_model_ignores_stale_variants(model_dir):
+    runtime = ModelRuntime(str(model_dir))
+    prepare_variants(runtime, "detector.pt", torch.randn(16, 8), variants=("int8",), repeats=3)
+    (model_dir / "detector.variants.json").write_text(json.dumps({"fastest": "detector.int8.ts"}))
+    assert runtime.resolve("detector.pt") == "detector.int8.ts"
+    torch.save(make_model(seed=1), model_dir / "detector.pt")
+    bump_mtime(model_dir / "detector.pt")
+    assert runtime.resolve("detector.pt") == "detector.pt"
+    x = torch.randn(3, 8)
+    with torch.no_grad():
+        expected = make_model(seed=1)(x)
+    torch.testing.assert_close(runtime.run("detector.pt", x), expected)
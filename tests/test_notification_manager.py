@@ -0,0 +1,134 @@
+import email
+import socketserver
+import threading
+import time
+import pytest
+
+from core.notification_manager import NotificationManager, NotificationService, SMTPConnection
+
+class DebuggingSMTPServer(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server that records messages and connections"""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.messages = []
+        self.connections = 0
+        self.hang_up_after_message = False
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost ready")
+        for raw in self.rfile:
+            command = raw.decode().strip().upper()
+            if command.startswith("DATA"):
+                self.reply("354 end with <CRLF>.<CRLF>")
+                lines = []
+                for line in self.rfile:
+                    if line == b".\r\n":
+                        break
+                    lines.append(line)
+                self.server.messages.append(email.message_from_bytes(b"".join(lines)))
+                self.reply("250 queued")
+                if self.server.hang_up_after_message:
+                    return
+            elif command.startswith("QUIT"):
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+@pytest.fixture
+def smtp_server():
+    server = DebuggingSMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def connection(smtp_server):
+    return SMTPConnection("127.0.0.1", smtp_server.server_address[1], use_ssl=False)
+
+def test_notifications_share_one_session(smtp_server, connection):
+    with NotificationService(connection, "fes@localhost", digest_window=0,
+                             max_per_minute=1000) as service:
+        for k in range(5):
+            service.notify(f"Alert {k}", "body")
+            assert service.flush(timeout=10)
+    assert [m["Subject"] for m in smtp_server.messages] == [f"Alert {k}" for k in range(5)]
+    assert smtp_server.connections == connection.connects == 1
+
+def test_dropped_session_is_reconnected(smtp_server, connection):
+    smtp_server.hang_up_after_message = True
+    with NotificationService(connection, "fes@localhost", digest_window=0,
+                             max_per_minute=1000) as service:
+        for k in range(3):
+            service.notify(f"Alert {k}", "body")
+            assert service.flush(timeout=10)
+        stats = service.stats()
+    assert len(smtp_server.messages) == 3 and stats['failed'] == 0
+    assert connection.connects == 3
+
+def test_notifications_in_window_form_one_digest_per_recipient(smtp_server, connection):
+    with NotificationService(connection, "fes@localhost", default_to="ops@localhost",
+                             digest_window=0.3) as service:
+        for k in range(20):
+            service.notify(f"Jamming {k}", f"Burst {k}")
+        service.notify("Replay attack", "Offset 12", to="soc@localhost")
+        assert service.flush(timeout=10)
+        stats = service.stats()
+    by_recipient = {m["To"]: m for m in smtp_server.messages}
+    assert len(smtp_server.messages) == 2
+    assert by_recipient["ops@localhost"]["Subject"] == "20 notifications: Jamming 0"
+    body = by_recipient["ops@localhost"].get_payload().replace("\r\n", "\n")
+    assert "== Jamming 19 ==\nBurst 19" in body
+    assert by_recipient["soc@localhost"]["Subject"] == "Replay attack"
+    assert stats['emails'] == 2 and stats['notifications'] == 21
+
+def test_rate_limit_holds_back_emails(smtp_server, connection):
+    # 60/minute refills one token per second; start with a single token
+    with NotificationService(connection, "fes@localhost", digest_window=0,
+                             max_per_minute=60) as service:
+        service._tokens = 1.0
+        service.notify("First", "body")
+        assert service.flush(timeout=10)
+        started = time.monotonic()
+        service.notify("Second", "body")
+        service.notify("Third", "body")
+        assert not service.flush(timeout=0.3)  # Waiting for a token
+        assert service.flush(timeout=10)
+        elapsed = time.monotonic() - started
+    assert elapsed >= 0.5
+    # Held-back notifications are grouped into the next email
+    assert [m["Subject"] for m in smtp_server.messages] == ["First", "2 notifications: Second"]
+
+def test_close_sends_pending_digest(smtp_server, connection):
+    service = NotificationService(connection, "fes@localhost", digest_window=60)
+    service.notify("Jamming", "body")
+    service.close(timeout=10)
+    assert len(smtp_server.messages) == 1
+    with pytest.raises(RuntimeError):
+        service.notify("late", "body")
+
+def test_unreachable_server_is_counted_as_failure():
+    connection = SMTPConnection("127.0.0.1", 1, use_ssl=False, timeout=1)
+    with NotificationService(connection, "fes@localhost", digest_window=0) as service:
+        service.notify("Alert", "body")
+        assert service.flush(timeout=10)
+        assert service.stats()['failed'] == 1
+
+def test_notification_manager_queues_instead_of_sending(smtp_server, connection, monkeypatch):
+    monkeypatch.setenv("EMAIL_USER", "fes@localhost")
+    service = NotificationService(connection, "fes@localhost", digest_window=0)
+    manager = NotificationManager(service)
+    assert manager.send_email_notification("Daily Task Review", "Tasks due soon")
+    service.close(timeout=10)
+    assert smtp_server.messages[0]["To"] == "fes@localhost"
+    assert not manager.send_email_notification("late", "body")
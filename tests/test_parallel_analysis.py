@@ -0,0 +1,57 @@
+import time as _time
+import pytest
+import numpy as np
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.parallel_analysis import ParallelCyberAnalyzer
+
+@pytest.fixture
+def captures():
+    rng = np.random.default_rng(11)
+    t = np.linspace(0, 10, 10000)
+    result = []
+    for k in range(3):
+        data = np.sin(2 * np.pi * t) + 0.1 * rng.standard_normal(len(t))
+        data[3000 + 1000 * k:4000 + 1000 * k] *= 3.0
+        result.append((data, t))
+    return result
+
+def as_tuples(threats):
+    return [(t.threat_type, t.confidence, t.timestamp) for t in threats]
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_matches_sequential_analysis(captures, executor):
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    expected = [as_tuples(analyzer.analyze_threats(d, t)) for d, t in captures]
+    with ParallelCyberAnalyzer(analyzer, executor=executor, max_workers=2) as parallel:
+        results = parallel.analyze_many(captures)
+    assert [as_tuples(r) for r in results] == expected
+
+def test_slow_detector_times_out(captures):
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    analyzer.attack_patterns['replay_attack'] = lambda data, time, context=None: _time.sleep(2) or []
+    data, t = captures[0]
+    with ParallelCyberAnalyzer(analyzer, detector_timeout=0.5) as parallel:
+        start = _time.monotonic()
+        threats = parallel.analyze_threats(data, t)
+        assert _time.monotonic() - start < 1.5
+        assert parallel.abandoned == 1  # Still sleeping in its worker thread
+    assert any(x.threat_type == "Signal Jamming" for x in threats)
+
+def test_invalid_capture_returns_empty_list(captures):
+    data, t = captures[0]
+    with ParallelCyberAnalyzer() as parallel:
+        results = parallel.analyze_many([(np.array([]), np.array([])), (data, t)])
+    assert results[0] == []
+    assert len(results[1]) > 0
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_long_signal_is_analyzed_in_chunks(captures, executor):
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    analyzer.security_validator.max_chunk_length = 4000
+    data, t = captures[0]
+    expected = as_tuples(analyzer._analyze_chunked(data, float(t[0])))
+    assert expected == as_tuples(analyzer.analyze_threats(data, t))
+    with ParallelCyberAnalyzer(analyzer, executor=executor, max_workers=2) as parallel:
+        results = parallel.analyze_many([(data, t), captures[1]])
+    assert as_tuples(results[0]) == expected
+    assert len(results[1]) > 0
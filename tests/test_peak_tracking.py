@@ -0,0 +1,78 @@
+import pytest
+import numpy as np
+from scipy import signal
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.peak_tracking import (top_k_bins, peak_frequencies, spectral_peaks,
+                                track_carriers, carrier_hops)
+
+FS = 1000.0
+
+@pytest.fixture
+def spectrogram():
+    rng = np.random.default_rng(8)
+    return rng.uniform(0, 1, (129, 60)), np.linspace(0, 500, 129)
+
+@pytest.fixture
+def hopping_signal():
+    # A fixed 100 Hz carrier plus one hopping between 200 and 350 Hz every 0.5 s
+    t = np.arange(4000) / FS
+    hopper = np.where((t // 0.5) % 2 == 0, 200.0, 350.0)
+    phase = 2 * np.pi * np.cumsum(hopper) / FS
+    return t, np.sin(2 * np.pi * 100 * t) + 0.8 * np.sin(phase)
+
+def test_top_k_matches_argsort(spectrogram):
+    Sxx, f = spectrogram
+    expected = np.sort(np.argsort(Sxx, axis=0)[-3:], axis=0)
+    assert np.array_equal(np.sort(top_k_bins(Sxx, 3), axis=0), expected)
+
+def test_peak_frequencies_match_column_loop(spectrogram):
+    Sxx, f = spectrogram
+    expected = [np.mean(f[np.argsort(Sxx[:, i])[-3:]]) for i in range(Sxx.shape[1])]
+    assert np.allclose(peak_frequencies(f, Sxx), expected)
+    batch = np.stack((Sxx, Sxx[::-1]))
+    assert np.allclose(peak_frequencies(f, batch)[0], expected)
+
+def test_interpolation_finds_off_bin_tone():
+    t = np.arange(4096) / FS
+    tone = np.sin(2 * np.pi * 123.4 * t)
+    f, _, Sxx = signal.spectrogram(tone, fs=FS, window='hann', nperseg=256, noverlap=128)
+    coarse = peak_frequencies(f, Sxx, k=1)
+    fine = peak_frequencies(f, Sxx, k=1, interpolate=True)
+    assert np.max(np.abs(fine - 123.4)) < 0.5
+    assert np.max(np.abs(fine - 123.4)) < np.max(np.abs(coarse - 123.4))
+
+def test_spectral_peaks_pads_missing_peaks():
+    f = np.linspace(0, 500, 9)
+    Sxx = np.array([[0, 1, 5, 1, 0.5, 0.4, 0.3, 0.2, 0.1],
+                    [2, 1, 5, 1, 0.5, 0.4, 0.3, 0.2, 0.1]]).T
+    frequencies, powers = spectral_peaks(f, Sxx, n_peaks=2, interpolate=False)
+    assert frequencies[0].tolist() == [f[2], f[2]]
+    assert np.isnan(frequencies[1, 0]) and powers[1, 0] == 0
+    assert frequencies[1, 1] == f[0] and powers[1, 1] == 2
+
+def test_tracker_follows_hopping_carrier(hopping_signal):
+    t, data = hopping_signal
+    f, times, Sxx = signal.spectrogram(data, fs=FS, window='hann', nperseg=256, noverlap=128)
+    frequencies, powers = track_carriers(f, Sxx, n_carriers=2)
+    steady, hopper = (0, 1) if np.nanstd(frequencies[0]) < np.nanstd(frequencies[1]) else (1, 0)
+    assert np.allclose(frequencies[steady], 100, atol=2)
+    assert set(np.round(frequencies[hopper][[5, 25]], -1)) <= {200, 350}
+
+    hops = carrier_hops(frequencies, threshold=50)
+    assert len(hops[steady]) == 0
+    hop_times = times[hops[hopper]]
+    # One hop per half second, seen within a frame of the switch
+    assert len(hop_times) == 7
+    assert np.allclose(hop_times, np.arange(1, 8) * 0.5, atol=0.26)
+
+def test_analyzer_track_carriers(hopping_signal):
+    t, data = hopping_signal
+    times, frequencies, powers = CyberWarfareAnalyzer(sampling_rate=FS).track_carriers(data, n_carriers=2)
+    assert frequencies.shape == powers.shape == (2, len(times))
+
+def test_interpolated_hopping_detection_runs(hopping_signal):
+    t, data = hopping_signal
+    analyzer = CyberWarfareAnalyzer(sampling_rate=FS)
+    analyzer.hopping_interpolation = True
+    threats = analyzer._detect_frequency_hopping(data, t)
+    assert len(threats) > 0
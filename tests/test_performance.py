@@ -0,0 +1,204 @@
+"""
+Performance regression suite for the analysis core
+
+Run with pytest-benchmark installed:
+    python -m pytest tests/test_performance.py
+
+Every benchmark reports throughput (samples/s) and peak traced memory in
+its extra_info, and its fastest round is compared with
+tests/performance_baseline.json. Times are normalized by a fixed NumPy
+calibration workload so the baseline carries across machines; a benchmark
+slower than the baseline by more than FES_BENCHMARK_THRESHOLD (default 1.0,
+i.e. twice as slow; shared CI runners are noisy) fails. Set
+FES_UPDATE_BASELINE=1 to rewrite the baseline from the current run.
+"""
+
+import os
+import json
+import time
+import functools
+from pathlib import Path
+import pytest
+import numpy as np
+
+pytest.importorskip("pytest_benchmark")
+
+from core.analysis_context import AnalysisContext
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.feature_extraction import extract_features
+from core.metrics import MetricsRegistry, collecting
+from core.security_validator import SecurityValidator
+from core.signal_processing import (compute_correlation_matrix, compute_fluctuation_analysis,
+                                    compute_psd)
+
+BASELINE_PATH = Path(__file__).with_name("performance_baseline.json")
+THRESHOLD = float(os.environ.get("FES_BENCHMARK_THRESHOLD", "1.0"))
+UPDATE_BASELINE = os.environ.get("FES_UPDATE_BASELINE") == "1"
+
+SAMPLING_RATE = 1000.0
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+CHANNELS = [2, 8, 32]
+DETECTORS = ['frequency_hopping', 'signal_injection', 'jamming', 'replay_attack']
+
+@functools.lru_cache(maxsize=None)
+def make_signal(n_samples, n_channels=1, seed=0):
+    """Deterministic 1 Hz tone plus noise with a jamming burst and an injected spike"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_samples) / SAMPLING_RATE
+    data = np.sin(2 * np.pi * t) + 0.1 * rng.standard_normal((n_channels, n_samples))
+    data[:, n_samples // 3:n_samples // 3 + n_samples // 10] *= 3.0
+    data[:, n_samples // 2] += 5.0
+    data.setflags(write=False)
+    return t, data
+
+def run_benchmark(benchmark, n_samples, func, *args):
+    """Auto-calibrated rounds for small inputs, three rounds for large ones"""
+    if n_samples >= 100_000:
+        return benchmark.pedantic(func, args=args, rounds=3, warmup_rounds=1)
+    return benchmark(func, *args)
+
+def peak_memory(func, *args, **kwargs):
+    """Peak traced allocation in bytes of one call"""
+    registry = MetricsRegistry()
+    with collecting(registry, track_allocations=True):
+        with registry.measure('stage', 'benchmark'):
+            func(*args, **kwargs)
+    return registry.snapshot()['stage']['benchmark']['peak_bytes']
+
+@pytest.fixture(scope="session")
+def calibration():
+    """Fastest of several runs of a fixed FFT and sort workload on this machine"""
+    data = np.random.default_rng(0).standard_normal(1 << 20)
+    timings = []
+    for _ in range(7):
+        start = time.perf_counter()
+        np.fft.rfft(data)
+        np.sort(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+@pytest.fixture(scope="session")
+def baseline(calibration):
+    stored = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    current = {"calibration": calibration, "benchmarks": {}}
+    yield stored, current
+    if UPDATE_BASELINE and current["benchmarks"]:
+        merged = dict(stored.get("benchmarks", {}))
+        # Keep existing entries comparable by expressing them in this run's calibration
+        scale = calibration / stored["calibration"] if stored else 1.0
+        merged = {name: {**entry, "min": entry["min"] * scale} for name, entry in merged.items()}
+        merged.update(current["benchmarks"])
+        BASELINE_PATH.write_text(json.dumps({"calibration": calibration,
+                                             "benchmarks": dict(sorted(merged.items()))},
+                                            indent=2) + "\n")
+
+@pytest.fixture
+def check(benchmark, baseline):
+    """Record throughput and memory, then compare the fastest round with the baseline"""
+    stored, current = baseline
+
+    def compare(n_samples, func, *args, **kwargs):
+        if benchmark.stats is None:  # --benchmark-disable
+            return
+        # The fastest round is the least disturbed by other load on the machine
+        best = benchmark.stats.stats.min
+        benchmark.extra_info["throughput"] = n_samples / best
+        benchmark.extra_info["peak_bytes"] = peak_memory(func, *args, **kwargs)
+        current["benchmarks"][benchmark.name] = {"min": best, "samples": n_samples}
+        reference = stored.get("benchmarks", {}).get(benchmark.name)
+        if UPDATE_BASELINE or reference is None:
+            return
+        expected = reference["min"] * current["calibration"] / stored["calibration"]
+        assert best <= expected * (1.0 + THRESHOLD), (
+            f"{benchmark.name}: {best * 1e3:.3f} ms exceeds baseline "
+            f"{expected * 1e3:.3f} ms by more than {THRESHOLD:.0%}")
+    return compare
+
+@pytest.mark.parametrize("n_samples", SIZES)
+@pytest.mark.parametrize("detector", DETECTORS)
+def test_detector(benchmark, check, detector, n_samples):
+    t, data = make_signal(n_samples)
+    signal = data[0]
+    analyzer = CyberWarfareAnalyzer(sampling_rate=SAMPLING_RATE)
+    detect = analyzer.attack_patterns[detector]
+
+    def run():
+        # Fresh context per call, so shared inputs are part of the cost
+        return detect(signal, t, context=AnalysisContext(signal, SAMPLING_RATE))
+
+    run_benchmark(benchmark, n_samples, run)
+    check(n_samples, run)
+
+@pytest.mark.parametrize("n_samples", SIZES)
+def test_analyze_threats(benchmark, check, n_samples):
+    t, data = make_signal(n_samples)
+    analyzer = CyberWarfareAnalyzer(sampling_rate=SAMPLING_RATE)
+    run_benchmark(benchmark, n_samples, analyzer.analyze_threats, data[0], t)
+    check(n_samples, analyzer.analyze_threats, data[0], t)
+
+@pytest.mark.parametrize("n_samples", SIZES)
+def test_validate_signal(benchmark, check, n_samples):
+    t, data = make_signal(n_samples)
+    validator = SecurityValidator()
+    run_benchmark(benchmark, n_samples, validator.validate_signal, data[0], t)
+    check(n_samples, validator.validate_signal, data[0], t)
+
+@pytest.mark.parametrize("n_samples", SIZES)
+def test_compute_psd(benchmark, check, n_samples):
+    t, data = make_signal(n_samples)
+    run_benchmark(benchmark, n_samples, compute_psd, data[0], SAMPLING_RATE)
+    check(n_samples, compute_psd, data[0], SAMPLING_RATE)
+
+@pytest.mark.parametrize("n_samples", SIZES)
+def test_fluctuation_analysis(benchmark, check, n_samples):
+    t, data = make_signal(n_samples)
+    run_benchmark(benchmark, n_samples, compute_fluctuation_analysis, data[0])
+    check(n_samples, compute_fluctuation_analysis, data[0])
+
+@pytest.mark.parametrize("n_samples", SIZES[:-1])
+@pytest.mark.parametrize("n_channels", CHANNELS)
+def test_correlation_matrix(benchmark, check, n_channels, n_samples):
+    t, data = make_signal(n_samples, n_channels)
+    signals = list(data)
+    run_benchmark(benchmark, n_samples, compute_correlation_matrix, signals)
+    check(n_samples * n_channels, compute_correlation_matrix, signals)
+
+@pytest.mark.parametrize("n_samples", SIZES[:-1])
+@pytest.mark.parametrize("n_channels", CHANNELS)
+def test_extract_features(benchmark, check, n_channels, n_samples):
+    t, data = make_signal(n_samples, n_channels)
+    # Observations in rows, channels as features
+    observations = np.ascontiguousarray(data.T)
+    run_benchmark(benchmark, n_samples, extract_features, observations)
+    check(n_samples * n_channels, extract_features, observations)
+
+@pytest.fixture(scope="session")
+def model_variants(tmp_path_factory):
+    """Small MLP detector with its prepared int8 and ONNX variants"""
+    torch = pytest.importorskip("torch")
+    from core.model_runtime import ModelRuntime, prepare_variants
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(torch.nn.Linear(128, 256), torch.nn.ReLU(),
+                                torch.nn.Linear(256, 256), torch.nn.ReLU(), torch.nn.Linear(256, 2))
+    model_dir = tmp_path_factory.mktemp("models")
+    torch.save(model.eval(), model_dir / "detector.pt")
+    runtime = ModelRuntime(str(model_dir))
+    manifest = prepare_variants(runtime, "detector.pt", torch.randn(64, 128), repeats=10)
+    return runtime, manifest
+
+@pytest.mark.parametrize("variant", ["fp32", "int8", "onnx", "selected"])
+def test_local_model(benchmark, check, model_variants, variant):
+    import torch
+    runtime, manifest = model_variants
+    if variant == "selected":
+        name = "detector.pt"  # As run_local_model calls it; the runtime picks the variant
+    else:
+        entry = manifest["variants"].get(variant)
+        if entry is None or not entry["accepted"]:
+            pytest.skip(f"{variant} variant unavailable: {entry and entry.get('error')}")
+        name = entry["file"]
+    runtime.prefer_variants = variant == "selected"
+    x = torch.randn(64, 128)
+    benchmark.extra_info["variant"] = runtime.resolve(name) if runtime.prefer_variants else name
+    run_benchmark(benchmark, len(x), runtime.run, name, x)
+    check(len(x), runtime.run, name, x)
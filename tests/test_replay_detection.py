@@ -0,0 +1,94 @@
+import pytest
+import numpy as np
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.replay_detection import sliding_energy, find_replay_hits, detect_replays
+
+WINDOW = 100
+
+@pytest.fixture
+def analyzer():
+    return CyberWarfareAnalyzer(sampling_rate=1000.0)
+
+@pytest.fixture
+def replay_signal():
+    # White noise has no self-similarity, so only the copied segment can match
+    rng = np.random.default_rng(42)
+    data = rng.standard_normal(4 * WINDOW + 400)
+    data[300:300 + WINDOW] = data[100:100 + WINDOW]  # Replay at lag 2 * WINDOW
+    time = np.arange(len(data)) / 1000.0
+    return time, data
+
+def test_sliding_energy_matches_direct_sum():
+    data = np.random.default_rng(0).standard_normal(1000)
+    expected = np.array([np.sum(data[i:i+50]**2) for i in range(len(data) - 49)])
+    np.testing.assert_allclose(sliding_energy(data, 50), expected, rtol=1e-9, atol=1e-9)
+
+def test_hits_match_direct_correlation():
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal(600)
+    starts, lags, corr = find_replay_hits(data, 40, min_lag=40, max_lag=120, threshold=0.0)
+    inside = starts + lags + 40 <= len(data)
+    starts, lags, corr = starts[inside], lags[inside], corr[inside]
+    for s, lag, c in zip(starts[::97], lags[::97], corr[::97]):
+        p, q = data[s:s+40], data[s+lag:s+lag+40]
+        expected = abs(np.dot(p, q)) / np.sqrt(np.dot(p, p) * np.dot(q, q))
+        assert c == pytest.approx(expected, abs=1e-9)
+
+def test_replay_merged_into_single_match(replay_signal):
+    _, data = replay_signal
+    matches = detect_replays(data, WINDOW, hop=1)
+    assert len(matches) == 1
+    # Partially overlapping windows still correlate strongly with the copy
+    assert abs(matches[0].start - 100) <= 5
+    assert abs(matches[0].end - (100 + WINDOW)) <= 5
+    assert matches[0].lag == 2 * WINDOW
+    assert matches[0].correlation == pytest.approx(1.0)
+
+def test_equivalent_to_reference_detector(analyzer):
+    rng = np.random.default_rng(3)
+    data = rng.standard_normal(2000)
+    time = np.arange(len(data)) / 1000.0
+    window = min(500, len(data) // 4)
+    # The reference detector only compares a window with the one directly after it
+    data[200 + window:200 + 2 * window] = data[200:200 + window]
+
+    analyzer.replay_hop = 1
+    reference = analyzer._detect_replay_attack_reference(data, time)
+    fast = analyzer._detect_replay_attack(data, time)
+
+    assert len(reference) > 0
+    assert len(fast) == 1
+    assert fast[0].characteristics['lag'] == pytest.approx(window / 1000.0)
+    # Both paths flag the same run of offsets around the replayed segment;
+    # edges differ by a few samples because of the energy normalization
+    first = fast[0].timestamp
+    last = first + fast[0].characteristics['segment_duration'] - window / 1000.0
+    assert abs(min(t.timestamp for t in reference) - first) <= 0.01
+    assert abs(max(t.timestamp for t in reference) - last) <= 0.01
+    assert first <= 0.2 <= last
+
+def test_default_hop_miss_window(analyzer):
+    rng = np.random.default_rng(1)
+    base = rng.standard_normal(4000)
+    time = np.arange(len(base)) / 1000.0
+    window, hop = 500, 500 // 8
+
+    def replayed(start, length):
+        data = base.copy()
+        data[start + 1000:start + 1000 + length] = data[start:start + length]
+        return data
+
+    # Long enough to contain a whole pattern on the hop grid at any alignment
+    for offset in range(hop):
+        assert len(analyzer._detect_replay_attack(replayed(1000 + offset, window + hop - 1), time)) == 1
+    # A single window copied halfway between grid points is missed unless hop is 1
+    assert analyzer._detect_replay_attack(replayed(1023, window), time) == []
+    analyzer.replay_hop = 1
+    assert len(analyzer._detect_replay_attack(replayed(1023, window), time)) == 1
+
+def test_no_replay_in_noise():
+    data = np.random.default_rng(7).standard_normal(5000)
+    assert detect_replays(data, 200, hop=25) == []
+
+def test_short_signal_returns_empty():
+    assert detect_replays(np.ones(10), 8) == []
@@ -0,0 +1,115 @@
+import threading
+import pytest
+
+from core import secure_alert
+from core.secure_alert import AlertDispatcher
+
+class LocalBroker:
+    """Stand-in for the MQTT connection: records publishes, optionally held back by a gate"""
+
+    def __init__(self, fail=False):
+        self.messages = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail = fail
+        self.closed = False
+
+    def publish(self, topic, payload, qos=1):
+        self.gate.wait(10)
+        if self.fail:
+            raise ConnectionError("broker unavailable")
+        self.messages.append((topic, payload, qos))
+
+    def close(self):
+        self.closed = True
+
+    def alerts(self):
+        return [line for _, payload, _ in self.messages for line in payload.decode().split("\n")]
+
+def reverse(payload):
+    return payload[::-1]
+
+@pytest.fixture
+def broker():
+    return LocalBroker()
+
+def test_alerts_are_batched_and_coalesced(broker):
+    encrypted = []
+    with AlertDispatcher(encrypt=lambda p: encrypted.append(p) or p, publisher=broker,
+                         max_wait=0.2) as dispatcher:
+        for k in range(100):
+            assert dispatcher.submit(f"Jamming on channel {k % 10}")
+        assert dispatcher.flush(timeout=10)
+        stats = dispatcher.stats()
+    assert sorted(broker.alerts()) == sorted(f"[x10] Jamming on channel {k}" for k in range(10))
+    assert len(broker.messages) == len(encrypted) == stats['batches'] < 10
+    assert all(topic == "fes/alert" and qos == 1 for topic, _, qos in broker.messages)
+    assert stats['submitted'] == 100 and stats['coalesced'] == 90 and stats['sent'] == 10
+    assert broker.closed
+
+def test_payloads_are_encrypted(broker):
+    with AlertDispatcher(encrypt=reverse, publisher=broker, qos=2) as dispatcher:
+        dispatcher.submit("Replay attack")
+    assert broker.messages == [("fes/alert", b"kcatta yalpeR", 2)]
+
+def test_full_queue_applies_backpressure(broker):
+    broker.gate.clear()
+    dispatcher = AlertDispatcher(encrypt=reverse, publisher=broker, max_pending=2,
+                                 batch_size=1, max_wait=0)
+    assert dispatcher.submit("a")
+    assert dispatcher.flush(timeout=0.2) is False  # "a" is held at the broker
+    assert dispatcher.submit("b") and dispatcher.submit("c")
+    assert dispatcher.submit("d", timeout=0.05) is False
+    assert dispatcher.submit("b", timeout=0)  # Duplicates still coalesce into the full queue
+    broker.gate.set()
+    assert dispatcher.flush(timeout=10)
+    dispatcher.close()
+    assert [payload[::-1].decode() for _, payload, _ in broker.messages] == ["a", "[x2] b", "c"]
+    assert dispatcher.stats()['dropped'] == 1
+
+def test_blocked_submit_resumes_when_worker_drains(broker):
+    broker.gate.clear()
+    dispatcher = AlertDispatcher(encrypt=reverse, publisher=broker, max_pending=1,
+                                 batch_size=1, max_wait=0)
+    dispatcher.submit("a")
+    dispatcher.flush(timeout=0.2)
+    dispatcher.submit("b")
+    release = threading.Timer(0.1, broker.gate.set)
+    release.start()
+    assert dispatcher.submit("c", timeout=10)
+    dispatcher.close()
+    assert len(broker.messages) == 3
+
+def test_publish_failures_are_counted():
+    broker = LocalBroker(fail=True)
+    with AlertDispatcher(encrypt=reverse, publisher=broker) as dispatcher:
+        dispatcher.submit("Signal injection")
+        assert dispatcher.flush(timeout=10)
+        broker.fail = False
+        dispatcher.submit("Signal injection")
+        assert dispatcher.flush(timeout=10)
+        stats = dispatcher.stats()
+    assert stats['failed'] == 1 and stats['sent'] == 1
+
+def test_close_drains_queue_and_rejects_new_alerts(broker):
+    dispatcher = AlertDispatcher(encrypt=reverse, publisher=broker, max_wait=1.0)
+    for k in range(5):
+        dispatcher.submit(f"alert {k}")
+    dispatcher.close()
+    assert len(broker.alerts()) == 5
+    with pytest.raises(RuntimeError):
+        dispatcher.submit("late")
+
+def test_send_encrypted_alert_queues_on_shared_dispatcher(broker, monkeypatch, capsys):
+    dispatcher = AlertDispatcher(encrypt=reverse, publisher=broker)
+    monkeypatch.setitem(secure_alert._DISPATCHERS, "KEY", dispatcher)
+    secure_alert.send_encrypted_alert("FES launched successfully.", recipient_key="KEY")
+    assert secure_alert.get_dispatcher("KEY") is dispatcher
+    dispatcher.close()
+    assert broker.messages[0][1] == reverse(b"FES launched successfully.")
+    assert "queued" in capsys.readouterr().out
+
+def test_gpg_keeps_key_validation_unless_opted_out():
+    assert "--trust-model" not in secure_alert.GpgEncryptor("KEY").command
+    command = secure_alert.GpgEncryptor("KEY", trust_all_keys=True).command
+    assert command[command.index("--trust-model") + 1] == "always"
@@ -0,0 +1,66 @@
+import pytest
+import numpy as np
+from core.security_validator import SecurityValidator
+
+@pytest.fixture
+def validator():
+    validator = SecurityValidator()
+    validator.chunk_size = 1000  # Force several chunks on small inputs
+    return validator
+
+@pytest.fixture
+def capture():
+    t = np.arange(5000) / 1000.0
+    return np.sin(2 * np.pi * t), t
+
+def test_valid_signal(validator, capture):
+    data, t = capture
+    assert validator.validate_signal(data, t) == (True, "")
+
+@pytest.mark.parametrize("index", [0, 999, 1000, 4999])
+def test_non_finite_values(validator, capture, index):
+    data, t = capture
+    for bad in (np.nan, np.inf, -np.inf):
+        corrupted = data.copy()
+        corrupted[index] = bad
+        assert validator.validate_signal(corrupted, t) == (False, "Signal contains invalid values (inf/nan)")
+
+def test_invalid_values_take_precedence_over_amplitude(validator, capture):
+    data, t = capture
+    data = data.copy()
+    data[10] = -5000.0
+    assert "amplitude" in validator.validate_signal(data, t)[1]
+    data[4500] = np.nan
+    assert "invalid values" in validator.validate_signal(data, t)[1]
+
+def test_time_order_across_chunk_boundary(validator, capture):
+    data, t = capture
+    t = t.copy()
+    t[1000] = t[999]
+    assert validator.validate_signal(data, t) == (False, "Time values must be strictly increasing")
+
+def test_length_mismatch(validator, capture):
+    data, t = capture
+    assert validator.validate_signal(data, t[:-1]) == (False, "Time and signal arrays must have same length")
+
+def test_uniform_time_fast_path(validator, capture):
+    data, _ = capture
+    assert validator.validate_uniform_signal(data, 0.0, 0.001) == (True, "")
+    assert validator.validate_uniform_signal(data, 0.0, 0.0)[0] is False
+    assert validator.validate_uniform_signal(data, np.nan, 0.001)[0] is False
+
+def test_matches_full_pass_semantics(capture):
+    data, t = capture
+    validator = SecurityValidator()
+    assert validator.validate_signal(np.array([]), np.array([])) == (False, "Signal data cannot be empty")
+    assert validator.validate_signal(data * 2000, t)[0] is False
+
+def test_list_time_axis_is_compared_numerically(validator):
+    data = [0.0, 1.0, 2.0, 3.0]
+    assert validator.validate_signal(data, [0.0, 0.1, 0.05, 0.3]) == (
+        False, "Time values must be strictly increasing")
+    assert validator.validate_signal(data, [0.0, 0.1, 0.2, 0.3]) == (True, "")
+    # Decrease straddling a chunk boundary of a list time axis
+    time = [k / 1000.0 for k in range(5000)]
+    time[1000] = time[998]
+    assert validator.validate_signal(np.zeros(5000), time)[0] is False
@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+from core.cyber_analysis import CyberWarfareAnalyzer
+from core.streaming_analysis import StreamingCyberAnalyzer
+
+@pytest.fixture
+def replay_stream():
+    rng = np.random.default_rng(5)
+    data = rng.standard_normal(20000)
+    data[9000:9500] = data[8000:8500]  # Replay at lag 1000
+    return data
+
+def push_all(streaming, data, block_sizes):
+    threats, start = [], 0
+    for size in block_sizes:
+        threats.extend(streaming.push(data[start:start + size]))
+        start += size
+    return threats
+
+@pytest.mark.parametrize("block_sizes", [[1000] * 20, [333] * 60 + [20], [7000, 13000]])
+def test_replay_reported_once_regardless_of_blocks(replay_stream, block_sizes):
+    threats = push_all(StreamingCyberAnalyzer(), replay_stream, block_sizes)
+    replays = [t for t in threats if t.threat_type == "Replay Attack"]
+    assert len(replays) == 1
+    assert replays[0].timestamp == pytest.approx(8.0, abs=0.1)
+    assert replays[0].characteristics['lag'] == pytest.approx(1.0)
+
+def test_replay_matches_batch_detector(replay_stream):
+    analyzer = CyberWarfareAnalyzer()
+    time = np.arange(len(replay_stream)) / 1000.0
+    batch = analyzer._detect_replay_attack(replay_stream, time)
+    streamed = push_all(StreamingCyberAnalyzer(analyzer), replay_stream, [1000] * 20)
+    streamed = [t for t in streamed if t.threat_type == "Replay Attack"]
+    assert [t.timestamp for t in streamed] == pytest.approx([t.timestamp for t in batch])
+    assert [t.confidence for t in streamed] == pytest.approx([t.confidence for t in batch])
+    for s, b in zip(streamed, batch):
+        assert s.characteristics == pytest.approx(b.characteristics)
+
+def test_jamming_detected_in_stream():
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal(30000)
+    data[20000:22000] *= 5.0
+    threats = push_all(StreamingCyberAnalyzer(), data, [500] * 60)
+    jamming = [t for t in threats if t.threat_type == "Signal Jamming"]
+    assert len(jamming) > 0
+    assert all(20.0 <= t.timestamp < 22.0 for t in jamming)
+
+def test_injection_detected_in_stream():
+    t = np.arange(20000) / 1000.0
+    data = np.sin(2 * np.pi * t) + 0.1 * np.random.default_rng(2).standard_normal(len(t))
+    data[12000:12100] += 2.0
+    threats = push_all(StreamingCyberAnalyzer(), data, [700] * 29)
+    injection = [x for x in threats if x.threat_type == "Signal Injection"]
+    assert any(abs(x.timestamp - 12.0) < 0.2 for x in injection)
+
+def test_state_is_bounded():
+    streaming = StreamingCyberAnalyzer()
+    rng = np.random.default_rng(3)
+    for _ in range(100):
+        streaming.push(rng.standard_normal(1000))
+    replay = streaming.detectors['replay_attack']
+    assert len(replay.history) <= replay.max_lag + replay.window_size + replay.hop + 1000
+    injection = streaming.detectors['signal_injection'].stream
+    assert all(len(p) < injection.calibration for p in injection.pending)
+    assert len(streaming.detectors['frequency_hopping'].pending) < 1000 + 256
+    assert streaming.samples_seen == 100000
+
+def test_non_streaming_detector_runs_on_windows():
+    analyzer = CyberWarfareAnalyzer()
+    seen = []
+
+    def detect(data, time, context=None):
+        seen.append((len(data), float(time[0])))
+        return []
+
+    analyzer.attack_patterns['custom'] = detect
+    streaming = StreamingCyberAnalyzer(analyzer, start_time=5.0, batch_window=3000)
+    assert 'anomaly' in streaming.windowed and 'custom' in streaming.windowed
+    push_all(streaming, np.zeros(10000), [700] * 14 + [200])
+    assert seen == [(3000, 5.0), (3000, 8.0), (3000, 11.0)]
+    streaming.flush()
+    assert seen[-1] == (1000, 14.0)
@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+from core.cyber_analysis import CyberWarfareAnalyzer, CyberThreatIndicator
+from core.threat_store import ThreatStore
+
+@pytest.fixture
+def store():
+    rng = np.random.default_rng(4)
+    hopping = ThreatStore.from_columns(
+        "Frequency Hopping", "Monitor",
+        confidence=np.round(rng.uniform(0, 1, 50), 1),
+        timestamp=np.arange(50) * 0.1,
+        characteristics={'frequency_change': rng.uniform(0, 5, 50), 'duration': 0.256})
+    jamming = ThreatStore.from_columns(
+        "Signal Jamming", "Spread spectrum",
+        confidence=np.round(rng.uniform(0, 1, 20), 1),
+        timestamp=np.arange(20) * 1.0,
+        characteristics={'power_level': rng.uniform(0, 5, 20)},
+        capture_index=np.arange(20))
+    return ThreatStore.concat([hopping, jamming])
+
+@pytest.fixture
+def test_signal():
+    t = np.linspace(0, 10, 10000)
+    signal = np.sin(2 * np.pi * t) * (1 + 0.5 * np.sin(2 * np.pi * 2 * t))
+    signal[2000:2500] *= 3.0
+    signal[5000:5100] += 2.0
+    return t, signal
+
+def key(threat):
+    return (threat.threat_type, threat.confidence, threat.timestamp, threat.capture_index,
+            threat.characteristics, threat.recommendation)
+
+def test_materialized_rows_keep_their_type_keys(store):
+    threats = store.to_list()
+    assert len(threats) == 70
+    assert set(threats[0].characteristics) == {'frequency_change', 'duration'}
+    assert threats[0].characteristics['duration'] == pytest.approx(0.256)
+    assert threats[0].capture_index is None
+    assert set(threats[-1].characteristics) == {'power_level'}
+    assert threats[-1].capture_index == 19
+
+def test_from_indicators_round_trip(store):
+    threats = store.to_list()
+    threats.append(CyberThreatIndicator("Plugin", 0.5, 1.0, {'label': 'burst'}, "Inspect"))
+    assert [key(x) for x in ThreatStore.from_indicators(threats)] == [key(x) for x in threats]
+
+def test_sort_is_stable_like_sorted(store):
+    expected = sorted(store.to_list(), key=lambda x: x.confidence, reverse=True)
+    assert [key(x) for x in store.sort_by_confidence()] == [key(x) for x in expected]
+
+@pytest.mark.parametrize("k", [0, 1, 7, 70, 100])
+def test_top_k_matches_sorted_prefix(store, k):
+    expected = store.sort_by_confidence().to_list()[:k]
+    assert [key(x) for x in store.top_k(k)] == [key(x) for x in expected]
+
+def test_filter_type(store):
+    jamming = store.filter_type("Signal Jamming")
+    assert len(jamming) == 20
+    assert all(x.threat_type == "Signal Jamming" for x in jamming)
+
+def test_analyze_threats_is_a_view_of_the_store(test_signal):
+    t, signal = test_signal
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    store = analyzer.analyze_threat_store(signal, t)
+    threats = analyzer.analyze_threats(signal, t)
+    assert len(store) == len(threats) > 0
+    assert [key(x) for x in store] == [key(x) for x in threats]
+    confidences = [x.confidence for x in threats]
+    assert confidences == sorted(confidences, reverse=True)
+
+def test_columnar_hopping_matches_indicator_fields(test_signal):
+    t, signal = test_signal
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    store = analyzer._frequency_hopping_store(signal, t)
+    assert len(store) > 0
+    for threat in store:
+        assert threat.threat_type == "Frequency Hopping"
+        assert 0 < threat.confidence <= 0.95
+        assert threat.characteristics['duration'] == pytest.approx(0.256)
+
+def test_invalid_signal_gives_empty_store():
+    analyzer = CyberWarfareAnalyzer(sampling_rate=1000.0)
+    t = np.linspace(0, 1, 1000)
+    signal = np.full(1000, np.nan)
+    assert len(analyzer.analyze_threat_store(signal, t)) == 0
+    assert analyzer.analyze_threats(signal, t) == []